@@ -0,0 +1,148 @@
+"""Move stale tickets out of the hot dedup collection.
+
+Every dedup query pays for every vector in the collection it searches,
+and a bug resolved long ago should not block new reports. Compaction
+keeps the hot collection to what dedup should match: resolved tickets
+whose resolution is older than the retention period, and, with a cap,
+the oldest tickets beyond it, move to a cold ``<name>_cold`` collection
+(or are dropped with ``archive=False``). Cold tickets keep their
+embeddings, so they can be searched or restored later.
+
+Stores filled before tickets carried ``created_at``/``status`` need a
+one-off ``--backfill`` first: without it the dedup window never matches
+those tickets and the hot-set cap moves them out first.
+
+Usage: python -m agents.compaction [--retention-days N] [--max-hot N] [--evict]
+       python -m agents.compaction --backfill
+"""
+import argparse
+import os
+import time
+
+from agents.dedup import (
+    COLLECTION_NAME,
+    STATUS_RESOLVED,
+    delete_tickets,
+    get_collection,
+    lifecycle_metadata,
+    upsert_tickets,
+)
+
+# Resolved tickets older than this (by resolution time) leave the hot set
+DEDUP_RETENTION_DAYS = float(os.getenv("DEDUP_RETENTION_DAYS", "90"))
+# Cap on hot tickets, oldest moved out first; unset for no cap
+_max_hot = os.getenv("DEDUP_MAX_HOT", "").strip()
+DEDUP_MAX_HOT = int(_max_hot) if _max_hot else None
+
+_PAGE = 5000
+_MOVE_CHUNK = 1000
+
+
+def cold_name(name: str = COLLECTION_NAME) -> str:
+    return f"{name}_cold"
+
+
+def stale_ids(metadatas: dict, now: float, retention_days: float = None, max_hot: int = None) -> list:
+    """Ids to move out of the hot set, given ``{id: metadata}``."""
+    stale = set()
+    if retention_days is not None:
+        cutoff = now - retention_days * 86400
+        for id_, metadata in metadatas.items():
+            metadata = metadata or {}
+            resolved_at = metadata.get("resolved_at", metadata.get("created_at", 0))
+            if metadata.get("status") == STATUS_RESOLVED and resolved_at < cutoff:
+                stale.add(id_)
+    if max_hot is not None:
+        remaining = [i for i in metadatas if i not in stale]
+        if len(remaining) > max_hot:
+            # Tickets stored without created_at are treated as the oldest
+            remaining.sort(key=lambda i: (metadatas[i] or {}).get("created_at", 0))
+            stale.update(remaining[:len(remaining) - max_hot])
+    return sorted(stale)
+
+
+def _all_metadatas(collection) -> dict:
+    metadatas = {}
+    for offset in range(0, collection.count(), _PAGE):
+        page = collection.get(include=["metadatas"], limit=_PAGE, offset=offset)
+        metadatas.update(zip(page["ids"], page["metadatas"]))
+    return metadatas
+
+
+def backfill(persist_dir: str = None, name: str = COLLECTION_NAME, now: float = None) -> int:
+    """Add ``created_at``/``status`` to tickets stored without them; returns how many.
+
+    Their real creation time is unknown, so the backfill time stands in:
+    they stay matchable for a full dedup window and are not the first
+    moved out by the cap. Status stays open unless the stored metadata
+    says otherwise.
+    """
+    hot = get_collection(persist_dir, name)
+    now = int(now or time.time())
+    missing = [
+        id_ for id_, metadata in _all_metadatas(hot).items()
+        if "created_at" not in (metadata or {}) or "status" not in (metadata or {})
+    ]
+    for start in range(0, len(missing), _MOVE_CHUNK):
+        stored = hot.get(ids=missing[start:start + _MOVE_CHUNK], include=["documents", "metadatas", "embeddings"])
+        metadatas = [
+            {**(m or {}), **lifecycle_metadata((m or {}).get("created_at", now), (m or {}).get("resolved_at"),
+                                               (m or {}).get("status"))}
+            for m in stored["metadatas"]
+        ]
+        upsert_tickets(hot, stored["ids"], stored["documents"], metadatas, embeddings=stored["embeddings"])
+    return len(missing)
+
+
+def compact(
+    persist_dir: str = None,
+    name: str = COLLECTION_NAME,
+    retention_days: float = DEDUP_RETENTION_DAYS,
+    max_hot: int = DEDUP_MAX_HOT,
+    archive: bool = True,
+    now: float = None,
+) -> dict:
+    """Move (or with ``archive=False`` delete) stale tickets; returns counts."""
+    hot = get_collection(persist_dir, name)
+    metadatas = _all_metadatas(hot)
+    stale = stale_ids(metadatas, now or time.time(), retention_days, max_hot)
+    cold = get_collection(persist_dir, cold_name(name)) if archive else None
+    for start in range(0, len(stale), _MOVE_CHUNK):
+        chunk = stale[start:start + _MOVE_CHUNK]
+        if cold is not None:
+            moved = hot.get(ids=chunk, include=["documents", "metadatas", "embeddings"])
+            cold.upsert(
+                ids=moved["ids"],
+                documents=moved["documents"],
+                metadatas=moved["metadatas"],
+                embeddings=moved["embeddings"],
+            )
+        delete_tickets(hot, chunk, [metadatas[i] for i in chunk])
+    if stale and hasattr(hot, "vacuum"):
+        hot.vacuum()  # The exact index keeps scoring deleted rows until rewritten
+    return {
+        "moved" if archive else "evicted": len(stale),
+        "hot": hot.count(),
+        "cold": cold.count() if cold is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retention-days", type=float, default=DEDUP_RETENTION_DAYS)
+    parser.add_argument("--max-hot", type=int, default=DEDUP_MAX_HOT)
+    parser.add_argument("--evict", action="store_true", help="Delete stale tickets instead of archiving them")
+    parser.add_argument("--backfill", action="store_true",
+                        help="Only add created_at/status to tickets stored without them")
+    args = parser.parse_args()
+
+    if args.backfill:
+        print(f"backfilled: {backfill()}")
+        return
+
+    result = compact(retention_days=args.retention_days, max_hot=args.max_hot, archive=not args.evict)
+    print(", ".join(f"{k}: {v}" for k, v in result.items() if v is not None))
+
+
+if __name__ == "__main__":
+    main()
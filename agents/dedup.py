@@ -1,15 +1,74 @@
+import asyncio
+import contextvars
+import functools
 import json
 import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import chromadb
+from agents.lexical import LexicalIndex
+from agents.telemetry import record, timed
 from schema.state import TriageState
 from schema.ticket import DedupResult
 
 SIMILARITY_THRESHOLD = 0.95  # High threshold — only exact duplicates blocked
 
+# Word-shingle Jaccard at which a near-verbatim copy is a duplicate without
+# embedding it; "off" always goes to the vector query
+_lexical_threshold = os.getenv("LEXICAL_DUP_THRESHOLD", "0.8").strip().lower()
+LEXICAL_DUP_THRESHOLD = None if _lexical_threshold == "off" else float(_lexical_threshold)
+
 _DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 
+COLLECTION_NAME = "tickets"
+
+# Embedding + Chroma calls from async callers run on this many threads
+DEDUP_EXECUTOR_WORKERS = 4
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
+
+# Nearest-neighbour index: "hnsw" (Chroma, approximate), "exact" (NumPy brute
+# force) or "int8" / "binary" (quantized codes scanned from memory-mapped
+# files, top candidates reranked in float32)
+DEDUP_INDEX = os.getenv("DEDUP_INDEX", "hnsw").strip().lower()
+DEDUP_INDEXES = ("hnsw", "exact", "int8", "binary")
+
+# HNSW graph parameters (Chroma's defaults). M and ef_construction only apply
+# when a collection is created; a changed ef_search is saved to existing ones
+# and takes effect the next time a process loads the index.
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "100"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "100"))
+
+# Which stored tickets a dedup query searches: "global" (all of them),
+# "component" (a where filter on the ticket's component) or "partition" (a
+# separate collection per component). Tickets without a component always
+# search globally. Chroma evaluates where filters outside the HNSW graph, so
+# on large corpora "partition" is the fast way to scope.
+DEDUP_SCOPE = os.getenv("DEDUP_SCOPE", "global").strip().lower()
+DEDUP_SCOPES = ("global", "component", "partition")
+
+# Which tickets are old news: with DEDUP_WINDOW_DAYS only tickets created in
+# that many days are searched (tickets stored without created_at fall
+# outside any window); DEDUP_STATUS=open skips resolved tickets.
+_window_days = os.getenv("DEDUP_WINDOW_DAYS", "").strip()
+DEDUP_WINDOW_DAYS = float(_window_days) if _window_days else None
+DEDUP_STATUS = os.getenv("DEDUP_STATUS", "any").strip().lower()
+
+STATUS_OPEN = "open"
+STATUS_RESOLVED = "resolved"
+_RESOLVED_STATUSES = {"resolved", "done", "closed", "fixed", "won't fix", "wont fix", "duplicate", "cancelled"}
+
 # Lazy-initialized embedding function (avoids model download at import time)
 _embedding_fn = None
+# Cache in front of _embedding_fn for dedup queries and indexing
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
 
 
 def _get_embedding_fn():
@@ -18,80 +77,418 @@ def _get_embedding_fn():
     if _embedding_fn is None:
         from chromadb.utils import embedding_functions
         _embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
+            model_name=EMBEDDING_MODEL
         )
     return _embedding_fn
 
 
-def init_vector_store(persist_dir: str = None) -> chromadb.Collection:
-    """Initialize or load ChromaDB collection."""
+def _get_embedding_cache():
+    """Cached wrapper around the current embedding function.
+
+    Set EMBEDDING_CACHE_DIR to persist embeddings in a memory-mapped store
+    that survives restarts.
+    """
+    global _embedding_cache
+    from agents.embeddings import CachedEmbeddingFunction, MmapEmbeddingStore
+    inner = _get_embedding_fn()
+    with _embedding_cache_lock:
+        if _embedding_cache is None or _embedding_cache.inner is not inner:
+            cache_dir = os.getenv("EMBEDDING_CACHE_DIR", "").strip()
+            _embedding_cache = CachedEmbeddingFunction(
+                inner,
+                disk_store=MmapEmbeddingStore(cache_dir, EMBEDDING_DIM) if cache_dir else None,
+            )
+        return _embedding_cache
+
+
+def embed_texts(texts: list[str]) -> list:
+    """Embed texts through the cache; identical texts are embedded once."""
+    with timed("embed_s"):
+        return _get_embedding_cache()(texts)
+
+
+def warm_up_embeddings() -> float:
+    """Load the embedding model now instead of on the first ticket.
+
+    Returns the seconds spent; call once at process startup.
+    """
+    return _get_embedding_cache().warm_up()
+
+
+def embedding_stats() -> dict:
+    """Hit ratio and per-call embed time of the embedding cache."""
+    cache = _embedding_cache
+    return cache.stats() if cache is not None else {}
+
+
+def _default_persist_dir() -> str:
+    return os.path.join(_DATA_DIR, "chroma_db")
+
+
+def hnsw_metadata(m: int = None, ef_construction: int = None, ef_search: int = None) -> dict:
+    """Collection metadata for a cosine HNSW index (module defaults for None)."""
+    return {
+        "hnsw:space": "cosine",
+        "hnsw:M": m or HNSW_M,
+        "hnsw:construction_ef": ef_construction or HNSW_EF_CONSTRUCTION,
+        "hnsw:search_ef": ef_search or HNSW_EF_SEARCH,
+    }
+
+
+def init_vector_store(
+    persist_dir: str = None,
+    name: str = COLLECTION_NAME,
+    embedding_function=None,
+    index: str = None,
+    hnsw: dict = None,
+):
+    """Open a fresh store and return the collection (unpooled).
+
+    ``index`` picks the backend (default DEDUP_INDEX): a ChromaDB HNSW
+    collection, an ExactCollection stored under ``<persist_dir>/<name>.exact``
+    that answers the same queries by brute force, or a QuantizedCollection
+    under ``<persist_dir>/<name>.int8`` (or ``.binary``). ``hnsw`` overrides
+    ``hnsw_metadata`` keyword arguments.
+    """
     if persist_dir is None:
-        persist_dir = os.path.join(_DATA_DIR, "chroma_db")
+        persist_dir = _default_persist_dir()
+    index = index or DEDUP_INDEX
+    if index not in DEDUP_INDEXES:
+        raise ValueError(f"Unknown dedup index {index!r}; expected one of {DEDUP_INDEXES}")
+    if index == "exact":
+        from agents.vector_index import ExactCollection
+        return ExactCollection(os.path.join(persist_dir, f"{name}.exact"), EMBEDDING_DIM)
+    if index in ("int8", "binary"):
+        from agents.vector_index import QuantizedCollection
+        return QuantizedCollection(os.path.join(persist_dir, f"{name}.{index}"), EMBEDDING_DIM, quantization=index)
+
+    metadata = hnsw_metadata(**(hnsw or {}))
     client = chromadb.PersistentClient(path=persist_dir)
     collection = client.get_or_create_collection(
-        name="tickets",
-        embedding_function=_get_embedding_fn(),
-        metadata={"hnsw:space": "cosine"},
+        name=name,
+        embedding_function=embedding_function or _get_embedding_fn(),
+        metadata=metadata,
     )
+    # Existing collections keep their build parameters, but search breadth can change
+    if collection.configuration_json["hnsw"]["ef_search"] != metadata["hnsw:search_ef"]:
+        collection.modify(configuration={"hnsw": {"ef_search": metadata["hnsw:search_ef"]}})
     return collection
 
 
+# Process-wide collection registry keyed by (persist_dir, name)
+_collections: dict[tuple[str, str], chromadb.Collection] = {}
+_collections_lock = threading.Lock()
+
+
+def _registry_key(persist_dir: str, name: str) -> tuple[str, str]:
+    return (os.path.abspath(persist_dir or _default_persist_dir()), name)
+
+
+def get_collection(
+    persist_dir: str = None,
+    name: str = COLLECTION_NAME,
+    embedding_function=None,
+) -> chromadb.Collection:
+    """Return the pooled collection, opening it once per process."""
+    key = _registry_key(persist_dir, name)
+    collection = _collections.get(key)
+    if collection is not None:
+        return collection
+    with _collections_lock:
+        collection = _collections.get(key)
+        if collection is None:
+            collection = init_vector_store(key[0], name, embedding_function)
+            _collections[key] = collection
+        return collection
+
+
+# Lexical indexes mirroring pooled collections, same keys as _collections
+_lexical_indexes: dict[tuple[str, str], LexicalIndex] = {}
+_GET_PAGE = 5000
+
+
+def get_lexical_index(persist_dir: str = None, name: str = COLLECTION_NAME) -> LexicalIndex:
+    """Return the lexical index for a pooled collection, built from its documents on first use.
+
+    Call ``warm_up_lexical_index`` at startup so no request pays for the build.
+    """
+    key = _registry_key(persist_dir, name)
+    index = _lexical_indexes.get(key)
+    if index is not None:
+        return index
+    collection = get_collection(persist_dir, name)
+    with _collections_lock:
+        index = _lexical_indexes.get(key)
+        if index is not None:
+            return index
+        # Registered before the scan, so tickets upserted meanwhile land in it too
+        index = _lexical_indexes[key] = LexicalIndex()
+    # Scan without the registry lock so upserts and indexer flushes are not blocked;
+    # until it finishes a lexical miss just falls back to the embedding query
+    for offset in range(0, collection.count(), _GET_PAGE):
+        # Paged: one unbounded get() exceeds SQLite's variable limit
+        stored = collection.get(include=["documents", "metadatas"], limit=_GET_PAGE, offset=offset)
+        index.add_many(stored["ids"], stored["documents"], [(m or {}).get("title") for m in stored["metadatas"]])
+    return index
+
+
+def warm_up_lexical_index() -> float:
+    """Build the lexical index of the default collection now; returns the seconds spent."""
+    start = time.perf_counter()
+    if LEXICAL_DUP_THRESHOLD is not None:
+        get_lexical_index()
+    return time.perf_counter() - start
+
+
+def component_key(component: str) -> str:
+    """Normalized component stored in metadata and used to scope queries."""
+    return (component or "").strip().lower()
+
+
+def _epoch(value) -> int:
+    """Epoch seconds from a number or an ISO 8601 string (Jira's ``+0000`` offsets included)."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def lifecycle_metadata(created_at=None, resolved_at=None, status: str = None) -> dict:
+    """created_at/resolved_at (epoch seconds) and open/resolved status for a stored ticket.
+
+    ``created_at`` defaults to now; a ticket with a resolution time or a
+    closed-type status counts as resolved.
+    """
+    created = _epoch(created_at)
+    resolved = _epoch(resolved_at)
+    is_resolved = resolved is not None or (status or "").strip().lower() in _RESOLVED_STATUSES
+    metadata = {
+        "created_at": created if created is not None else int(time.time()),
+        "status": STATUS_RESOLVED if is_resolved else STATUS_OPEN,
+    }
+    if resolved is not None:
+        metadata["resolved_at"] = resolved
+    return metadata
+
+
+def partition_name(name: str, component: str) -> str:
+    """Collection holding one component's tickets, e.g. ``tickets.checkout``."""
+    slug = re.sub(r"[^a-z0-9]+", "-", component_key(component)).strip("-")
+    return f"{name}.{slug}" if slug else None
+
+
+def upsert_tickets(collection, ids: list, documents: list, metadatas: list, embeddings=None):
+    """Embed and upsert tickets, keeping the lexical index and partitions in step.
+
+    Derived indexes only follow pooled collections; ``embeddings`` skips
+    embedding when the vectors are already known.
+    """
+    if embeddings is None:
+        embeddings = embed_texts(documents)
+    collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+    with _collections_lock:
+        keys = [k for k, c in _collections.items() if c is collection]
+        indexes = [_lexical_indexes[k] for k in keys if k in _lexical_indexes]
+    for index in indexes:
+        index.add_many(ids, documents, [(m or {}).get("title") for m in metadatas])
+    if DEDUP_SCOPE == "partition":
+        for persist_dir, name in keys:
+            if "." not in name:  # Partitions are not partitioned again
+                _upsert_partitions(persist_dir, name, ids, documents, metadatas, embeddings)
+
+
+def _upsert_partitions(persist_dir: str, name: str, ids: list, documents: list, metadatas: list, embeddings):
+    rows = defaultdict(list)
+    for i, metadata in enumerate(metadatas):
+        partition = partition_name(name, (metadata or {}).get("component"))
+        if partition:
+            rows[partition].append(i)
+    for partition, picked in rows.items():
+        get_collection(persist_dir, partition).upsert(
+            ids=[ids[i] for i in picked],
+            documents=[documents[i] for i in picked],
+            metadatas=[metadatas[i] for i in picked],
+            embeddings=[embeddings[i] for i in picked],
+        )
+
+
+def delete_tickets(collection, ids: list, metadatas: list = None):
+    """Delete tickets from a collection, its lexical index and (given metadatas) its partitions."""
+    collection.delete(ids=ids)
+    with _collections_lock:
+        keys = [k for k, c in _collections.items() if c is collection]
+        indexes = [_lexical_indexes[k] for k in keys if k in _lexical_indexes]
+    for index in indexes:
+        index.remove_many(ids)
+    if DEDUP_SCOPE == "partition" and metadatas:
+        for persist_dir, name in keys:
+            if "." in name:
+                continue
+            rows = defaultdict(list)
+            for id_, metadata in zip(ids, metadatas):
+                partition = partition_name(name, (metadata or {}).get("component"))
+                if partition:
+                    rows[partition].append(id_)
+            for partition, picked in rows.items():
+                get_collection(persist_dir, partition).delete(ids=picked)
+
+
+def build_partitions(persist_dir: str = None, name: str = COLLECTION_NAME) -> int:
+    """Copy a collection's stored tickets into per-component partitions.
+
+    For stores filled before DEDUP_SCOPE=partition; new tickets are
+    partitioned as they are upserted. Returns the number of tickets read.
+    """
+    key = _registry_key(persist_dir, name)
+    collection = get_collection(*key)
+    total = collection.count()
+    for offset in range(0, total, _GET_PAGE):
+        stored = collection.get(include=["documents", "metadatas", "embeddings"], limit=_GET_PAGE, offset=offset)
+        _upsert_partitions(key[0], name, stored["ids"], stored["documents"], stored["metadatas"], stored["embeddings"])
+    return total
+
+
+def close_vector_store(persist_dir: str = None, name: str = None):
+    """Drop pooled handles for a persist dir (all collections if name is None)."""
+    persist_key = _registry_key(persist_dir, "")[0]
+    with _collections_lock:
+        for key in list(_collections):
+            if key[0] == persist_key and (name is None or key[1] == name):
+                del _collections[key]
+                _lexical_indexes.pop(key, None)
+
+
+def reload_vector_store(
+    persist_dir: str = None,
+    name: str = COLLECTION_NAME,
+    embedding_function=None,
+) -> chromadb.Collection:
+    """Reopen a pooled collection, e.g. after the on-disk store was rebuilt."""
+    close_vector_store(persist_dir, name)
+    return get_collection(persist_dir, name, embedding_function)
+
+
 def seed_vector_store(
     collection: chromadb.Collection,
     seed_file: str = None,
 ):
-    """Load seed tickets into ChromaDB. Run once."""
+    """Load seed tickets into ChromaDB. Safe to call on every startup."""
     if seed_file is None:
         seed_file = os.path.join(_DATA_DIR, "seed_tickets.json")
 
     with open(seed_file) as f:
         tickets = json.load(f)
 
-    # Skip if already seeded
-    if collection.count() >= len(tickets):
+    # Only embed tickets not stored yet, or stored before lifecycle metadata existed
+    stored = collection.get(ids=[t["id"] for t in tickets], include=["metadatas"])
+    current = {id_ for id_, m in zip(stored["ids"], stored["metadatas"]) if "created_at" in (m or {})}
+    tickets = [t for t in tickets if t["id"] not in current]
+    if not tickets:
         return
 
-    documents = [f"{t['title']}. {t['description']}" for t in tickets]
+    documents = [ticket_document(t["title"], t["description"]) for t in tickets]
     ids = [t["id"] for t in tickets]
     metadatas = [
         {
             "title": t["title"],
-            "component": t.get("component", ""),
+            "component": component_key(t.get("component")),
             "severity": t.get("severity", ""),
             "team": t.get("team", ""),
+            **lifecycle_metadata(t.get("created_at"), t.get("resolved_at"), t.get("status")),
         }
         for t in tickets
     ]
 
-    collection.add(documents=documents, ids=ids, metadatas=metadatas)
+    upsert_tickets(collection, ids, documents, metadatas)
 
 
-def dedup_agent(state: TriageState) -> dict:
-    """Check if a similar ticket exists in the vector store."""
-    parsed = state.get("parsed_ticket")
-    if not parsed or not parsed.is_valid:
-        return {
-            "dedup_result": DedupResult(is_duplicate=False),
-            "trace": state.get("trace", []) + ["DEDUP: Skipped (invalid ticket)"],
-        }
+def ticket_document(title: str, description: str) -> str:
+    """Text embedded for a ticket — shared by indexing and dedup queries."""
+    return f"{title}. {description}"
 
-    collection = init_vector_store()
 
-    query_text = f"{parsed.title}. {parsed.description}"
+def _query_text(parsed) -> str:
+    return ticket_document(parsed.title, parsed.description)
 
-    results = collection.query(
-        query_texts=[query_text],
-        n_results=3,
-        include=["documents", "metadatas", "distances"],
-    )
 
+def _freshness_filters(now: float = None) -> list:
+    filters = []
+    if DEDUP_WINDOW_DAYS:
+        filters.append({"created_at": {"$gte": int((now or time.time()) - DEDUP_WINDOW_DAYS * 86400)}})
+    if DEDUP_STATUS == STATUS_OPEN:
+        # $ne also matches tickets stored before status was recorded
+        filters.append({"status": {"$ne": STATUS_RESOLVED}})
+    return filters
+
+
+def _where(filters: list) -> dict:
+    if not filters:
+        return None
+    return filters[0] if len(filters) == 1 else {"$and": filters}
+
+
+def dedup_scope(component: str = None, now: float = None) -> tuple:
+    """(collection, where) a dedup query for a ticket in ``component`` searches."""
+    if DEDUP_SCOPE not in DEDUP_SCOPES:
+        raise ValueError(f"Unknown dedup scope {DEDUP_SCOPE!r}; expected one of {DEDUP_SCOPES}")
+    component = component_key(component)
+    collection, filters = get_collection(), _freshness_filters(now)
+    if DEDUP_SCOPE == "component" and component:
+        # The component is free text from the LLM; one no stored ticket carries would match nothing
+        if collection.get(where={"component": component}, limit=1, include=[])["ids"]:
+            filters.append({"component": component})
+    elif DEDUP_SCOPE == "partition" and component:
+        partition = partition_name(COLLECTION_NAME, component)
+        local = get_collection(name=partition) if partition else None
+        # A component nothing was filed under yet has nothing to match locally
+        if local is not None and local.count():
+            collection = local
+    return collection, _where(filters)
+
+
+def _skip_update(state: TriageState) -> dict:
+    return {
+        "dedup_result": DedupResult(is_duplicate=False),
+        "trace": ["DEDUP: Skipped (invalid ticket)"],
+    }
+
+
+def _lexical_update(state: TriageState, document: str, component: str = None, now: float = None) -> dict:
+    """Duplicate update from the lexical index alone; None when inconclusive."""
+    if LEXICAL_DUP_THRESHOLD is None:
+        return None
+    match = get_lexical_index().query(document)
+    if match is None or match[2] < LEXICAL_DUP_THRESHOLD:
+        return None
+    top_id, top_title, overlap = match
+    # The lexical index is global and misses deletes made by other processes (compaction):
+    # the hit must still be stored and in the ticket's dedup scope
+    collection, where = dedup_scope(component, now)
+    if not collection.get(ids=[top_id], where=where, include=[])["ids"]:
+        return None  # Gone, outside the scope, too old or resolved: let the vector query decide
+    record("lexical_dups", 1)
+    return {
+        "dedup_result": DedupResult(
+            is_duplicate=True,
+            similar_ticket_id=top_id,
+            similar_ticket_title=top_title or "Unknown",
+            similarity_score=round(overlap, 4),
+        ),
+        "decision": "duplicate",
+        "trace": [f"DEDUP: Duplicate of {top_id} (lexical overlap: {overlap:.3f}, embedding skipped)"],
+    }
+
+
+def _dedup_update(state: TriageState, ids: list, distances: list, metadatas: list) -> dict:
+    """Turn one query's nearest neighbours into a dedup state update."""
     decision = None
 
-    if results["distances"] and results["distances"][0]:
-        top_distance = results["distances"][0][0]
+    if distances:
+        top_distance = distances[0]
         top_similarity = 1 - top_distance
-        top_id = results["ids"][0][0]
-        top_title = results["metadatas"][0][0].get("title", "Unknown")
+        top_id = ids[0]
+        top_title = (metadatas[0] or {}).get("title", "Unknown")
 
         is_dup = top_similarity >= SIMILARITY_THRESHOLD
 
@@ -114,5 +511,98 @@ def dedup_agent(state: TriageState) -> dict:
     return {
         "dedup_result": dedup_result,
         "decision": decision,
-        "trace": state.get("trace", []) + [trace_msg],
+        "trace": [trace_msg],
     }
+
+
+def dedup_agent(state: TriageState) -> dict:
+    """Check if a similar ticket exists in the vector store."""
+    parsed = state.get("parsed_ticket")
+    if not parsed or not parsed.is_valid:
+        return _skip_update(state)
+
+    document = _query_text(parsed)
+    update = _lexical_update(state, document, parsed.component)
+    if update is not None:
+        return update
+
+    collection, where = dedup_scope(parsed.component)
+
+    query_embeddings = embed_texts([document])
+    with timed("query_s"):
+        results = collection.query(
+            query_embeddings=query_embeddings,
+            n_results=3,
+            where=where,
+            include=["documents", "metadatas", "distances"],
+        )
+
+    return _dedup_update(
+        state,
+        results["ids"][0],
+        results["distances"][0] if results["distances"] else [],
+        results["metadatas"][0],
+    )
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Lazily create the bounded executor for blocking dedup work."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DEDUP_EXECUTOR_WORKERS, thread_name_prefix="dedup"
+            )
+        return _executor
+
+
+async def adedup_agent(state: TriageState) -> dict:
+    """Async dedup: embedding and vector query run off the event loop."""
+    loop = asyncio.get_running_loop()
+    # Run in a copy of the caller's context so telemetry lands in the node's span
+    call = functools.partial(contextvars.copy_context().run, dedup_agent, state)
+    return await loop.run_in_executor(_get_executor(), call)
+
+
+def dedup_many(states: list[TriageState]) -> list[dict]:
+    """Dedup a batch of tickets with one embedding call and one query per scope."""
+    updates = [None] * len(states)
+    pending, now = [], time.time()
+    for i, state in enumerate(states):
+        parsed = state.get("parsed_ticket")
+        if not parsed or not parsed.is_valid:
+            updates[i] = _skip_update(state)
+            continue
+        updates[i] = _lexical_update(state, _query_text(parsed), parsed.component, now)
+        if updates[i] is None:
+            pending.append(i)
+
+    if pending:
+        query_embeddings = embed_texts([_query_text(states[i]["parsed_ticket"]) for i in pending])
+        scopes = {}
+        for i, embedding in zip(pending, query_embeddings):
+            collection, where = dedup_scope(states[i]["parsed_ticket"].component, now)
+            scope = scopes.setdefault((id(collection), json.dumps(where)), (collection, where, [], []))
+            scope[2].append(i)
+            scope[3].append(embedding)
+        for collection, where, indices, embeddings in scopes.values():
+            with timed("query_s"):
+                results = collection.query(
+                    query_embeddings=embeddings,
+                    n_results=3,
+                    where=where,
+                    include=["metadatas", "distances"],
+                )
+            for row, i in enumerate(indices):
+                updates[i] = _dedup_update(
+                    states[i],
+                    results["ids"][row],
+                    results["distances"][row] if results["distances"] else [],
+                    results["metadatas"][row],
+                )
+
+    return updates
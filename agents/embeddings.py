@@ -0,0 +1,207 @@
+import contextlib
+import fcntl
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+class MmapEmbeddingStore:
+    """Append-only on-disk embedding store read through a memory map.
+
+    ``keys.txt`` holds one text hash per line; row i of ``vectors.f32`` is
+    the float32 vector for line i. Appends are written with plain file I/O
+    and the map is reopened, so readers never see a partial row.
+
+    Several processes may share a store: appends hold an exclusive
+    ``flock`` on ``store.lock`` and first pick up rows other processes
+    added, so rows are always placed after what is on disk. Rows another
+    process added become visible here at this process's next append.
+    """
+
+    def __init__(self, path: str, dim: int):
+        self.path = path
+        self.dim = dim
+        os.makedirs(path, exist_ok=True)
+        self._keys_path = os.path.join(path, "keys.txt")
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._lock_path = os.path.join(path, "store.lock")
+        self._lock = threading.Lock()
+        self._rows: dict[str, int] = {}
+        self._size = 0       # Rows on disk this process has read
+        self._keys_end = 0   # Bytes of keys.txt this process has read
+        self._map = None
+        with self._file_lock():
+            self._sync()
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        with self._lock, open(self._lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _sync(self):
+        """Read keys appended since the last sync; call with the file lock held.
+
+        A key without a vector (e.g. a crash mid-append) is cut off here,
+        and a vector without a key is overwritten by the next append.
+        """
+        if not os.path.exists(self._keys_path):
+            return
+        stored = os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_end)
+            tail = f.read()
+        rows, size, end = dict(self._rows), self._size, self._keys_end
+        for line in tail.splitlines(keepends=True):
+            if size >= stored or not line.endswith(b"\n"):
+                break
+            rows.setdefault(line.decode().strip(), size)
+            size += 1
+            end += len(line)
+        if end < self._keys_end + len(tail):
+            with open(self._keys_path, "ab") as f:
+                f.truncate(end)
+        # Map the grown file before publishing the new rows to readers
+        self._map = self._open_map(size)
+        self._rows, self._size, self._keys_end = rows, size, end
+
+    def _open_map(self, n: int):
+        if not n:
+            return None
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, key: str):
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        return np.array(self._map[row])
+
+    def put_many(self, keys: list[str], vectors: list):
+        with self._file_lock():
+            self._sync()
+            new = {}
+            for k, v in zip(keys, vectors):
+                if k not in self._rows and k not in new:
+                    new[k] = v
+            if not new:
+                return
+            block = np.asarray(list(new.values()), dtype=np.float32).reshape(len(new), self.dim)
+            # Truncate stray bytes from an interrupted append before writing
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(self._size * self.dim * 4)
+                f.write(block.tobytes())
+            with open(self._keys_path, "a") as f:
+                f.writelines(f"{k}\n" for k in new)
+            self._sync()
+
+
+class CachedEmbeddingFunction(EmbeddingFunction):
+    """Chroma embedding function that memoizes another one by text hash.
+
+    Lookups go through an in-memory LRU, then the optional on-disk store;
+    only misses reach the wrapped model. Dedup calls it directly and hands
+    Chroma precomputed vectors, so collections keep the wrapped model's
+    embedding config on disk.
+    """
+
+    def __init__(self, inner: EmbeddingFunction, max_entries: int = 10_000, disk_store: MmapEmbeddingStore = None):
+        self.inner = inner
+        self.max_entries = max_entries
+        self.disk_store = disk_store
+        self._lru: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.embed_calls = 0
+        self.embed_s = 0.0
+
+    def __call__(self, input: Documents) -> Embeddings:
+        keys = [text_hash(text) for text in input]
+        vectors = [None] * len(input)
+        with self._lock:
+            for i, key in enumerate(keys):
+                vec = self._lru.get(key)
+                if vec is None and self.disk_store is not None:
+                    vec = self.disk_store.get(key)
+                    if vec is not None:
+                        self._remember(key, vec)
+                if vec is not None:
+                    self._lru.move_to_end(key)
+                    vectors[i] = vec
+            missing = [i for i, v in enumerate(vectors) if v is None]
+            self.hits += len(input) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            start = time.perf_counter()
+            computed = self.inner([input[i] for i in missing])
+            elapsed = time.perf_counter() - start
+            computed = [np.asarray(v, dtype=np.float32) for v in computed]
+            with self._lock:
+                self.embed_calls += 1
+                self.embed_s += elapsed
+                for i, vec in zip(missing, computed):
+                    vectors[i] = vec
+                    self._remember(keys[i], vec)
+            if self.disk_store is not None:
+                self.disk_store.put_many([keys[i] for i in missing], computed)
+
+        return vectors
+
+    def _remember(self, key: str, vec: np.ndarray):
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def warm_up(self) -> float:
+        """Load the wrapped model with one throwaway embedding; returns seconds taken."""
+        start = time.perf_counter()
+        self.inner(["warm-up"])
+        return time.perf_counter() - start
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "embed_calls": self.embed_calls,
+                "avg_embed_ms": round(1000 * self.embed_s / self.embed_calls, 2) if self.embed_calls else 0.0,
+            }
+
+    @staticmethod
+    def name() -> str:
+        return "sentinel_cached"
+
+    def get_config(self) -> dict:
+        config = {"inner_name": self.inner.name(), "inner_config": self.inner.get_config(), "max_entries": self.max_entries}
+        if self.disk_store is not None:
+            config["disk_store"] = {"path": self.disk_store.path, "dim": self.disk_store.dim}
+        return config
+
+    @staticmethod
+    def build_from_config(config: dict) -> "CachedEmbeddingFunction":
+        from chromadb.utils.embedding_functions import known_embedding_functions
+        inner = known_embedding_functions[config["inner_name"]].build_from_config(config["inner_config"])
+        disk = config.get("disk_store")
+        return CachedEmbeddingFunction(
+            inner,
+            max_entries=config.get("max_entries", 10_000),
+            disk_store=MmapEmbeddingStore(disk["path"], disk["dim"]) if disk else None,
+        )
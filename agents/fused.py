@@ -0,0 +1,89 @@
+import os
+from agents._client import client
+from agents.intake import SYSTEM_PROMPT, _intake_input
+from agents.labeler import LABELER_PROMPT
+from agents.llm_cache import cached_call, acached_call, with_cache_trace
+from agents.structured import generate_structured, agenerate_structured, strip_code_fences
+from schema.ticket import FusedTicket
+from schema.state import TriageState
+
+_PROMPT_PATH = os.path.join(os.path.dirname(__file__), "..", "prompts", "fused_system.md")
+
+def _load_prompt() -> str:
+    with open(_PROMPT_PATH) as f:
+        template = f.read()
+    # The fused prompt embeds both agents' prompts so their rules stay in one place
+    return template.replace("{{INTAKE_PROMPT}}", SYSTEM_PROMPT.strip()).replace(
+        "{{LABELER_PROMPT}}", LABELER_PROMPT.strip()
+    )
+
+FUSED_PROMPT = _load_prompt()
+
+
+def _fused_contents(raw: str) -> str:
+    return f"{FUSED_PROMPT}\n\nParse and classify this bug report:\n\n{raw}"
+
+
+def _generate(raw: str) -> str:
+    return generate_structured(client, FusedTicket, _fused_contents(raw), context=raw)
+
+
+async def _agenerate(raw: str) -> str:
+    return await agenerate_structured(client, FusedTicket, _fused_contents(raw), context=raw)
+
+
+def _fused_update(state: TriageState, response_text: str) -> dict:
+    fused = FusedTicket.model_validate_json(strip_code_fences(response_text))
+    parsed, labeled = fused.parsed, fused.labeled
+
+    if not parsed.is_valid:
+        return {
+            "parsed_ticket": parsed,
+            "decision": "needs_clarification",
+            "trace": [f"FUSED: Needs clarification — {parsed.clarification_reason}"],
+        }
+
+    return {
+        "parsed_ticket": parsed,
+        "labeled_ticket": labeled,
+        "decision": None,
+        "trace": [
+            f"FUSED: Parsed as '{parsed.title}'; {labeled.severity.value}/{labeled.priority.value} "
+            f"({labeled.issue_type.value}) confidence={labeled.confidence:.2f}"
+        ],
+    }
+
+
+def _fused_fallback(state: TriageState, e: Exception) -> dict:
+    # No parsed_ticket in the update sends the graph down the two-step path
+    return {"trace": [f"FUSED FALLBACK: {(str(e).splitlines() or [type(e).__name__])[0]}"]}
+
+
+def fused_agent(state: TriageState) -> dict:
+    """Parse and label in one LLM call; falls back to intake + labeler on bad output."""
+    try:
+        raw = _intake_input(state)
+        update, hit = cached_call(
+            FUSED_PROMPT,
+            raw,
+            lambda: _generate(raw),
+            lambda text: _fused_update(state, text),
+        )
+        return with_cache_trace(update, "fused", hit)
+
+    except Exception as e:
+        return _fused_fallback(state, e)
+
+
+async def afused_agent(state: TriageState) -> dict:
+    """Async fused intake+label."""
+    try:
+        raw = _intake_input(state)
+
+        update, hit = await acached_call(
+            FUSED_PROMPT, raw, lambda: _agenerate(raw), lambda text: _fused_update(state, text)
+        )
+        return with_cache_trace(update, "fused", hit)
+
+    except Exception as e:
+        return _fused_fallback(state, e)
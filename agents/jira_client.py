@@ -1,56 +1,176 @@
 import base64
 import os
+import threading
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from schema.ticket import JiraCreateResult
 
 load_dotenv(override=True)
 
+BULK_CHUNK_SIZE = 50  # Jira's limit for /rest/api/3/issue/bulk
 
-def create_jira_ticket(payload: dict) -> JiraCreateResult:
-    """Create a ticket in Jira Cloud and return the ticket URL."""
-    jira_url = os.getenv("JIRA_URL", "").strip()
-    email = os.getenv("JIRA_EMAIL", "").strip()
-    token = os.getenv("JIRA_API_TOKEN", "").strip()
-
-    if not all([jira_url, email, token]):
-        return JiraCreateResult(
-            success=False,
-            error="Jira credentials not configured. Set JIRA_URL, JIRA_EMAIL, and JIRA_API_TOKEN in .env",
-        )
+_MISSING_CREDENTIALS = (
+    "Jira credentials not configured. Set JIRA_URL, JIRA_EMAIL, and JIRA_API_TOKEN in .env"
+)
+
+
+class _RefusedRetry(Retry):
+    """Retry-After is only honored on statuses where Jira refused the request outright."""
 
-    # Strip trailing slash from URL
-    jira_url = jira_url.rstrip("/")
+    RETRY_AFTER_STATUS_CODES = frozenset({429, 503})
 
-    auth = base64.b64encode(f"{email}:{token}".encode()).decode()
 
-    try:
-        response = requests.post(
-            f"{jira_url}/rest/api/3/issue",
-            json=payload,
-            headers={
+class JiraClient:
+    """Jira Cloud client with a persistent, retrying HTTP session.
+
+    Auth headers are encoded once and connections are kept alive and pooled.
+    Creating issues is not idempotent, so a POST is only retried when Jira
+    cannot have acted on it: connection errors, and 429/503 responses with
+    Retry-After (with exponential backoff). A read timeout or other 5xx may
+    follow a created issue and is returned as a failure instead.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        email: str,
+        token: str,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        timeout: float = 15,
+    ):
+        self.base_url = (base_url or "").strip().rstrip("/")
+        self.configured = all([self.base_url, (email or "").strip(), (token or "").strip()])
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        retry = _RefusedRetry(
+            total=max_retries,
+            read=0,
+            other=0,
+            backoff_factor=backoff_factor,
+            allowed_methods=["GET", "POST"],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        if self.configured:
+            auth = base64.b64encode(f"{email.strip()}:{token.strip()}".encode()).decode()
+            self.session.headers.update({
                 "Authorization": f"Basic {auth}",
                 "Content-Type": "application/json",
-            },
-            timeout=15,
+            })
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "JiraClient":
+        return cls(
+            os.getenv("JIRA_URL", ""),
+            os.getenv("JIRA_EMAIL", ""),
+            os.getenv("JIRA_API_TOKEN", ""),
+            **kwargs,
         )
 
-        if response.status_code == 201:
-            data = response.json()
-            key = data["key"]
-            return JiraCreateResult(
-                success=True,
-                key=key,
-                url=f"{jira_url}/browse/{key}",
+    def _result_for_key(self, key: str) -> JiraCreateResult:
+        return JiraCreateResult(success=True, key=key, url=f"{self.base_url}/browse/{key}")
+
+    def create(self, payload: dict) -> JiraCreateResult:
+        """Create one ticket and return its key and URL."""
+        if not self.configured:
+            return JiraCreateResult(success=False, error=_MISSING_CREDENTIALS)
+
+        try:
+            response = self.session.post(
+                f"{self.base_url}/rest/api/3/issue",
+                json=payload,
+                timeout=self.timeout,
             )
-        else:
+
+            if response.status_code == 201:
+                return self._result_for_key(response.json()["key"])
+            else:
+                return JiraCreateResult(
+                    success=False,
+                    error=f"Jira API returned {response.status_code}: {response.text}",
+                )
+
+        except requests.RequestException as e:
             return JiraCreateResult(
                 success=False,
-                error=f"Jira API returned {response.status_code}: {response.text}",
+                error=f"Failed to connect to Jira: {str(e)}",
             )
 
-    except requests.RequestException as e:
-        return JiraCreateResult(
-            success=False,
-            error=f"Failed to connect to Jira: {str(e)}",
-        )
+    def create_many(self, payloads: list[dict]) -> list[JiraCreateResult]:
+        """Create tickets via the bulk endpoint in chunks, preserving input order."""
+        if not self.configured:
+            return [JiraCreateResult(success=False, error=_MISSING_CREDENTIALS) for _ in payloads]
+
+        results = []
+        for start in range(0, len(payloads), BULK_CHUNK_SIZE):
+            results.extend(self._create_chunk(payloads[start:start + BULK_CHUNK_SIZE]))
+        return results
+
+    def _create_chunk(self, chunk: list[dict]) -> list[JiraCreateResult]:
+        try:
+            response = self.session.post(
+                f"{self.base_url}/rest/api/3/issue/bulk",
+                json={"issueUpdates": chunk},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            error = f"Failed to connect to Jira: {str(e)}"
+            return [JiraCreateResult(success=False, error=error) for _ in chunk]
+
+        if response.status_code not in (200, 201):
+            error = f"Jira API returned {response.status_code}: {response.text}"
+            return [JiraCreateResult(success=False, error=error) for _ in chunk]
+
+        data = response.json()
+        # Created issues come back in request order, skipping failed elements
+        failures = {
+            e["failedElementNumber"]: f"Jira rejected issue: {e.get('elementErrors', {})}"
+            for e in data.get("errors", [])
+        }
+        created = iter(data.get("issues", []))
+        results = []
+        for i in range(len(chunk)):
+            if i in failures:
+                results.append(JiraCreateResult(success=False, error=failures[i]))
+            else:
+                issue = next(created, None)
+                if issue is None:
+                    results.append(JiraCreateResult(success=False, error="Jira returned no issue for this element"))
+                else:
+                    results.append(self._result_for_key(issue["key"]))
+        return results
+
+    def close(self):
+        self.session.close()
+
+
+# Shared client, built from the environment on first use
+_client: JiraClient = None
+_client_lock = threading.Lock()
+
+
+def get_jira_client() -> JiraClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = JiraClient.from_env()
+        return _client
+
+
+def create_jira_ticket(payload: dict) -> JiraCreateResult:
+    """Create a ticket in Jira Cloud and return the ticket URL."""
+    return get_jira_client().create(payload)
+
+
+def create_jira_tickets(payloads: list[dict]) -> list[JiraCreateResult]:
+    """Create many tickets through Jira's bulk endpoint."""
+    return get_jira_client().create_many(payloads)
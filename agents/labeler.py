@@ -1,5 +1,9 @@
 import os
-from agents._client import client, MODEL
+from agents._client import client
+from agents.llm_cache import cached_call, acached_call, with_cache_trace
+from agents.rules import rule_label
+from agents.telemetry import record
+from agents.structured import generate_structured, agenerate_structured, strip_code_fences
 from schema.ticket import LabeledTicket
 from schema.state import TriageState
 
@@ -12,18 +16,7 @@ def _load_prompt() -> str:
 LABELER_PROMPT = _load_prompt()
 
 
-def _strip_code_fences(text: str) -> str:
-    """Remove markdown code fences from LLM output."""
-    text = text.strip()
-    if text.startswith("```"):
-        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
-    if text.endswith("```"):
-        text = text.rsplit("```", 1)[0]
-    return text.strip()
-
-
-def labeler_agent(state: TriageState) -> dict:
-    """Classify a parsed ticket with severity, priority, type, labels."""
+def _ticket_text(state: TriageState) -> str:
     parsed = state["parsed_ticket"]
 
     ticket_text = f"Title: {parsed.title}\nDescription: {parsed.description}"
@@ -34,25 +27,90 @@ def labeler_agent(state: TriageState) -> dict:
     if parsed.environment:
         ticket_text += f"\nEnvironment: {parsed.environment}"
 
+    return ticket_text
+
+
+def _labeler_contents(ticket_text: str) -> str:
+    return f"{LABELER_PROMPT}\n\n{ticket_text}"
+
+
+def _generate(ticket_text: str) -> str:
+    return generate_structured(client, LabeledTicket, _labeler_contents(ticket_text), context=ticket_text)
+
+
+async def _agenerate(ticket_text: str) -> str:
+    return await agenerate_structured(client, LabeledTicket, _labeler_contents(ticket_text), context=ticket_text)
+
+
+def _labeler_update(state: TriageState, response_text: str) -> dict:
+    content = strip_code_fences(response_text)
+    labeled = LabeledTicket.model_validate_json(content)
+
+    return {
+        "labeled_ticket": labeled,
+        "trace": [
+            f"LABELER: {labeled.severity.value}/{labeled.priority.value} "
+            f"({labeled.issue_type.value}) confidence={labeled.confidence:.2f}"
+        ],
+    }
+
+
+def _rules_update(ticket_text: str) -> dict:
+    """Label from the keyword rules when they are confident; None escalates to the LLM."""
+    result = rule_label(ticket_text)
+    if result is None:
+        return None
+    labeled, rule_names = result
+    record("rule_labels", 1)
+    return {
+        "labeled_ticket": labeled,
+        "trace": [
+            f"LABELER: {labeled.severity.value}/{labeled.priority.value} "
+            f"({labeled.issue_type.value}) confidence={labeled.confidence:.2f} "
+            f"via rules ({', '.join(rule_names)}; LLM call skipped)"
+        ],
+    }
+
+
+def _labeler_error(state: TriageState, e: Exception) -> dict:
+    return {
+        "error": f"Labeler failed: {str(e)}",
+        "trace": [f"LABELER ERROR: {str(e)}"],
+    }
+
+
+def labeler_agent(state: TriageState) -> dict:
+    """Classify a parsed ticket with severity, priority, type, labels."""
     try:
-        response = client.models.generate_content(
-            model=MODEL,
-            contents=f"{LABELER_PROMPT}\n\n{ticket_text}",
+        ticket_text = _ticket_text(state)
+        update = _rules_update(ticket_text)
+        if update is not None:
+            return update
+
+        update, hit = cached_call(
+            LABELER_PROMPT,
+            ticket_text,
+            lambda: _generate(ticket_text),
+            lambda text: _labeler_update(state, text),
         )
+        return with_cache_trace(update, "labeler", hit)
+
+    except Exception as e:
+        return _labeler_error(state, e)
 
-        content = _strip_code_fences(response.text)
-        labeled = LabeledTicket.model_validate_json(content)
 
-        return {
-            "labeled_ticket": labeled,
-            "trace": state.get("trace", []) + [
-                f"LABELER: {labeled.severity.value}/{labeled.priority.value} "
-                f"({labeled.issue_type.value}) confidence={labeled.confidence:.2f}"
-            ],
-        }
+async def alabeler_agent(state: TriageState) -> dict:
+    """Async labeler: awaits the Gemini call instead of blocking a thread."""
+    try:
+        ticket_text = _ticket_text(state)
+        update = _rules_update(ticket_text)
+        if update is not None:
+            return update
+
+        update, hit = await acached_call(
+            LABELER_PROMPT, ticket_text, lambda: _agenerate(ticket_text), lambda text: _labeler_update(state, text)
+        )
+        return with_cache_trace(update, "labeler", hit)
 
     except Exception as e:
-        return {
-            "error": f"Labeler failed: {str(e)}",
-            "trace": state.get("trace", []) + [f"LABELER ERROR: {str(e)}"],
-        }
+        return _labeler_error(state, e)
@@ -0,0 +1,119 @@
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Optional
+import numpy as np
+
+SHINGLE_WORDS = 3
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: pairs at Jaccard 0.8 collide with p > 0.999
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PRIME = np.uint64(4294967311)  # Smallest prime above 2**32
+
+
+def shingles(text: str, k: int = SHINGLE_WORDS) -> np.ndarray:
+    """Sorted unique 32-bit hashes of the word k-grams of ``text``."""
+    words = _TOKEN_RE.findall(text.lower())
+    if len(words) <= k:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + k]) for i in range(len(words) - k + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams)))
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    if not len(a) or not len(b):
+        return 0.0
+    inter = len(np.intersect1d(a, b, assume_unique=True))
+    return inter / (len(a) + len(b) - inter)
+
+
+class MinHasher:
+    """MinHash signatures from universal hashes ``(a * x + b) mod p``."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # a, b < 2**31 and x < 2**32 keep a * x + b inside uint64
+        self.a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2**31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_hashes: np.ndarray) -> np.ndarray:
+        if not len(shingle_hashes):
+            return np.full(len(self.a), np.iinfo(np.uint64).max, dtype=np.uint64)
+        hashed = (np.outer(shingle_hashes, self.a) + self.b) % _PRIME
+        return hashed.min(axis=0)
+
+
+class LexicalIndex:
+    """MinHash/LSH index for exact and near-verbatim duplicate tickets.
+
+    Tickets sharing any LSH band with the query are candidates; candidates
+    are then scored by exact shingle Jaccard, so the index never reports a
+    similarity it didn't measure. No embedding is needed on either side.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets = [defaultdict(set) for _ in range(bands)]
+        self._shingles: dict[str, np.ndarray] = {}
+        self._signatures: dict[str, np.ndarray] = {}
+        self._titles: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add_many(self, ids: list, documents: list, titles: list = None):
+        """Index tickets; re-adding an id replaces its previous text."""
+        prepared = []
+        for i, (id_, document) in enumerate(zip(ids, documents)):
+            sh = shingles(document or "")
+            prepared.append((id_, sh, self.hasher.signature(sh), titles[i] if titles else None))
+        with self._lock:
+            for id_, sh, signature, title in prepared:
+                self._remove(id_)
+                for band, key in enumerate(self._band_keys(signature)):
+                    self._buckets[band][key].add(id_)
+                self._shingles[id_] = sh
+                self._signatures[id_] = signature
+                self._titles[id_] = title
+
+    def remove_many(self, ids: list):
+        with self._lock:
+            for id_ in ids:
+                self._remove(id_)
+
+    def _remove(self, id_: str):
+        signature = self._signatures.pop(id_, None)
+        if signature is None:
+            return
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band][key]
+            bucket.discard(id_)
+            if not bucket:
+                del self._buckets[band][key]
+        del self._shingles[id_]
+        del self._titles[id_]
+
+    def query(self, document: str) -> Optional[tuple[str, Optional[str], float]]:
+        """Best (id, title, Jaccard) among LSH candidates, or None without candidates."""
+        sh = shingles(document)
+        keys = self._band_keys(self.hasher.signature(sh))
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(keys):
+                candidates.update(self._buckets[band].get(key, ()))
+            scored = [(jaccard(sh, self._shingles[c]), c) for c in candidates]
+            if not scored:
+                return None
+            score, best = max(scored, key=lambda s: (s[0], s[1]))
+            return best, self._titles[best], score
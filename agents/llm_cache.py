@@ -0,0 +1,287 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Optional
+from agents._client import MODEL
+from agents.telemetry import record
+
+_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+_UNSET = object()
+
+
+@lru_cache(maxsize=16)
+def prompt_hash(prompt: str) -> str:
+    """Fingerprint of a system prompt; editing a prompt file changes every key."""
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+
+def normalize_input(text: str) -> str:
+    """Collapse whitespace so trivially re-pasted copies share a key."""
+    return " ".join(text.split())
+
+
+def cache_key(prompt: str, text: str, model: str = MODEL) -> str:
+    """Content address for one LLM call: (model, prompt hash, normalized input)."""
+    material = "\0".join([model, prompt_hash(prompt), normalize_input(text)])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Base class for LLM response caches with hit/miss accounting."""
+
+    def __init__(self, max_entries: int = 1024, ttl_s: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._set(key, value)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": self._size()}
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_s is not None and time.time() - created > self.ttl_s
+
+    # Backend hooks, called with the lock held
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def _set(self, key: str, value: str):
+        ...
+
+    @abstractmethod
+    def _delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def _clear(self):
+        ...
+
+    @abstractmethod
+    def _size(self) -> int:
+        ...
+
+
+class MemoryCache(ResponseCache):
+    """In-process LRU cache."""
+
+    def __init__(self, max_entries: int = 1024, ttl_s: Optional[float] = None):
+        super().__init__(max_entries, ttl_s)
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created, value = entry
+        if self._expired(created):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: str, value: str):
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def _clear(self):
+        self._entries.clear()
+
+    def _size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(ResponseCache):
+    """On-disk cache that survives restarts; evicts least recently used rows."""
+
+    def __init__(
+        self,
+        path: str = None,
+        max_entries: int = 100_000,
+        ttl_s: Optional[float] = None,
+    ):
+        super().__init__(max_entries, ttl_s)
+        if path is None:
+            path = os.path.join(_DATA_DIR, "llm_cache.sqlite3")
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value, created FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if self._expired(created):
+            self._delete(key)
+            return None
+        self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return value
+
+    def _set(self, key: str, value: str):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+            (key, value, now, now),
+        )
+        overflow = self._size() - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (overflow,),
+            )
+        self._conn.commit()
+
+    def _delete(self, key: str):
+        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def _clear(self):
+        self._conn.execute("DELETE FROM responses")
+        self._conn.commit()
+
+    def _size(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+# Process-wide cache, configured from the environment on first use
+_cache = _UNSET
+_cache_lock = threading.Lock()
+
+
+def _cache_from_env() -> Optional[ResponseCache]:
+    backend = os.getenv("LLM_CACHE", "memory").strip().lower()
+    ttl = os.getenv("LLM_CACHE_TTL_S", "").strip()
+    ttl_s = float(ttl) if ttl else None
+    max_entries = os.getenv("LLM_CACHE_MAX_ENTRIES", "").strip()
+
+    if backend == "memory":
+        return MemoryCache(int(max_entries or 1024), ttl_s)
+    if backend == "sqlite":
+        return SQLiteCache(os.getenv("LLM_CACHE_PATH") or None, int(max_entries or 100_000), ttl_s)
+    return None  # "off", "none" or anything unrecognised disables caching
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache (None when disabled)."""
+    global _cache
+    if _cache is _UNSET:
+        with _cache_lock:
+            if _cache is _UNSET:
+                _cache = _cache_from_env()
+    return _cache
+
+
+def set_cache(cache: Optional[ResponseCache]):
+    """Install a cache instance (or None to disable caching)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def cached_call(prompt: str, text: str, call: Callable[[], str], parse: Callable[[str], dict]):
+    """Serve ``parse(response)`` from the cache, calling the LLM on a miss.
+
+    Only responses that parse successfully are stored. Returns
+    ``(parsed, hit)`` where hit is None when caching is disabled.
+    """
+    cache = get_cache()
+    if cache is None:
+        return parse(call()), None
+
+    key = cache_key(prompt, text)
+    cached = cache.get(key)
+    if cached is not None:
+        try:
+            return parse(cached), True
+        except Exception:
+            cache.delete(key)  # Stale entry no longer validates; refetch
+
+    response_text = call()
+    parsed = parse(response_text)
+    cache.set(key, response_text)
+    return parsed, False
+
+
+async def acached_call(prompt: str, text: str, acall, parse: Callable[[str], dict]):
+    """Async counterpart of ``cached_call``; ``acall`` is a coroutine function."""
+    cache = get_cache()
+    if cache is None:
+        return parse(await acall()), None
+
+    key = cache_key(prompt, text)
+    cached = cache.get(key)
+    if cached is not None:
+        try:
+            return parse(cached), True
+        except Exception:
+            cache.delete(key)
+
+    response_text = await acall()
+    parsed = parse(response_text)
+    cache.set(key, response_text)
+    return parsed, False
+
+
+def with_cache_trace(update: dict, agent: str, hit: Optional[bool]) -> dict:
+    """Append a CACHE line with the running hit/miss counters to the trace."""
+    cache = get_cache()
+    if hit is None or cache is None:
+        return update
+    record("llm_cache_hits" if hit else "llm_cache_misses", 1)
+    stats = cache.stats()
+    update["trace"] = update["trace"] + [
+        f"CACHE: {agent} {'hit' if hit else 'miss'} "
+        f"(hits={stats['hits']}, misses={stats['misses']})"
+    ]
+    return update
@@ -1,5 +1,6 @@
 import json
 import os
+import threading
 from schema.ticket import TeamAssignment, JiraPayload
 from schema.state import TriageState
 
@@ -11,23 +12,65 @@ def load_team_skills() -> dict:
         return json.load(f)
 
 
-def router_agent(state: TriageState) -> dict:
-    """Route ticket to the correct team based on skills matrix and labels."""
+class SkillsIndex:
+    """Precomputed routing tables for one version of the skills matrix."""
+
+    def __init__(self, teams: dict, mtime_ns: int = 0):
+        self.teams = teams
+        self.mtime_ns = mtime_ns
+        # Inverted skill -> teams map so scoring only touches matching skills
+        self.skill_teams: dict[str, list[str]] = {}
+        for team_name, info in teams.items():
+            for skill in set(info["skills"]):
+                self.skill_teams.setdefault(skill, []).append(team_name)
+        # Penalize full teams slightly
+        self.penalties = {
+            team_name: 0.1 * max(0, 5 - info["capacity"])
+            for team_name, info in teams.items()
+        }
+
+    def score(self, ticket_signals: set) -> dict:
+        """Return {team: (score, matched skills)} in skills-matrix order."""
+        overlaps: dict[str, set] = {}
+        for signal in ticket_signals:
+            for team_name in self.skill_teams.get(signal, ()):
+                overlaps.setdefault(team_name, set()).add(signal)
+        return {
+            team_name: (len(overlaps.get(team_name, ())) - penalty, overlaps.get(team_name, set()))
+            for team_name, penalty in self.penalties.items()
+        }
+
+
+_index: SkillsIndex = None
+_index_lock = threading.Lock()
+
+
+def get_skills_index() -> SkillsIndex:
+    """Return the cached skills index, rebuilding it when the file changes."""
+    global _index
+    mtime_ns = os.stat(_SKILLS_PATH).st_mtime_ns
+    index = _index
+    if index is not None and index.mtime_ns == mtime_ns:
+        return index
+    with _index_lock:
+        if _index is None or _index.mtime_ns != mtime_ns:
+            _index = SkillsIndex(load_team_skills(), mtime_ns)
+        return _index
+
+
+def _route(state: TriageState, index: SkillsIndex) -> dict:
+    """Score, assign and build the Jira payload for one ticket."""
     parsed = state["parsed_ticket"]
     labeled = state["labeled_ticket"]
-    teams = load_team_skills()
+    teams = index.teams
 
     # Score each team based on keyword overlap with ticket labels + component
     ticket_signals = set(labeled.labels)
     if parsed.component:
         ticket_signals.add(parsed.component.lower())
 
-    team_scores = {}
-    for team_name, info in teams.items():
-        overlap = ticket_signals.intersection(set(info["skills"]))
-        # Weight by overlap count, penalize full teams slightly
-        score = len(overlap) - (0.1 * max(0, 5 - info["capacity"]))
-        team_scores[team_name] = (score, overlap)
+    # Weight by overlap count minus the capacity penalty
+    team_scores = index.score(ticket_signals)
 
     # Pick the best match
     best_team = max(team_scores, key=lambda t: team_scores[t][0])
@@ -85,7 +128,23 @@ def router_agent(state: TriageState) -> dict:
         "team_assignment": assignment,
         "jira_payload": jira,
         "decision": "create_ticket",
-        "trace": state.get("trace", []) + [
+        "trace": [
             f"ROUTER: Assigned to {best_team} ({team_info['lead']}) — {reasoning}"
         ],
     }
+
+
+def router_agent(state: TriageState) -> dict:
+    """Route ticket to the correct team based on skills matrix and labels."""
+    return _route(state, get_skills_index())
+
+
+async def arouter_agent(state: TriageState) -> dict:
+    """Async router: scoring is CPU-only and cheap, so it runs inline."""
+    return router_agent(state)
+
+
+def route_many(states: list[TriageState]) -> list[dict]:
+    """Route a batch of labeled tickets against one snapshot of the skills index."""
+    index = get_skills_index()
+    return [_route(state, index) for state in states]
@@ -0,0 +1,147 @@
+import json
+import os
+import re
+import threading
+from typing import Optional
+from agents.router import get_skills_index, SkillsIndex
+from schema.enums import Severity, Priority, IssueType
+from schema.ticket import LabeledTicket
+
+_RULES_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "label_rules.json")
+
+# Minimum rule confidence for labeling without the LLM; "off" disables the fast path
+_threshold = os.getenv("LABEL_RULE_THRESHOLD", "0.85").strip().lower()
+RULE_CONFIDENCE_THRESHOLD: Optional[float] = None if _threshold == "off" else float(_threshold)
+
+# Confidence multiplier when matched rules disagree on a field
+_CONFLICT_PENALTY = 0.5
+
+# A rule phrase right after one of these words ("no outage", "not a typo") is not evidence
+_NEGATIONS = {"no", "not", "never", "without", "nor", "isn't", "wasn't", "aren't", "weren't",
+              "don't", "doesn't", "didn't"}
+_NEGATION_WINDOW = 3  # Words before a phrase checked for a negation
+
+
+def load_rules(path: str = None) -> list[dict]:
+    with open(path or _RULES_PATH) as f:
+        rules = json.load(f)["rules"]
+    for rule in rules:
+        # Fail at load time on values the schema would reject
+        Severity(rule["severity"])
+        Priority(rule["priority"])
+        IssueType(rule["issue_type"])
+    return rules
+
+
+class LabelRules:
+    """Keyword rules and skills vocabulary compiled into one regex.
+
+    One ``finditer`` pass over the ticket finds every rule phrase, veto
+    phrase and skill keyword. Each distinct phrase is independent evidence
+    for its rule, so agreeing phrases combine as ``1 - prod(1 - confidence)``
+    and a single phrase never scores above its rule's confidence. A rule's
+    ``unless`` phrases (e.g. an error next to "typo") and a negation right
+    before a phrase discard that evidence, leaving the ticket to the LLM.
+    """
+
+    def __init__(self, rules: list[dict], skills: SkillsIndex, mtime_ns: int = 0):
+        self.rules = rules
+        self.skills = skills
+        self.mtime_ns = mtime_ns
+        self.phrase_rules: dict[str, list[int]] = {}
+        self.veto_rules: dict[str, list[int]] = {}
+        for i, rule in enumerate(rules):
+            for phrase in rule["phrases"]:
+                self.phrase_rules.setdefault(phrase.lower(), []).append(i)
+            for phrase in rule.get("unless", ()):
+                self.veto_rules.setdefault(phrase.lower(), []).append(i)
+        self.vocab = set(skills.skill_teams)
+
+        terms = set(self.phrase_rules) | set(self.veto_rules) | self.vocab
+        # Longest first so multi-word phrases win over their prefixes
+        alternation = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+        self.pattern = re.compile(rf"(?<![\w-])(?:{alternation})(?![\w-])", re.IGNORECASE)
+
+    def _hits(self, text: str) -> tuple[dict[int, set], set]:
+        """Return ({rule index: distinct phrases matched}, matched skill keywords)."""
+        hits, vetoed, keywords = {}, set(), set()
+        for m in self.pattern.finditer(text):
+            term = m.group(0).lower()
+            if term in self.vocab:
+                keywords.add(term)
+            vetoed.update(self.veto_rules.get(term, ()))
+            rule_ids = self.phrase_rules.get(term, ())
+            if rule_ids and not _negated(text, m.start()):
+                for i in rule_ids:
+                    hits.setdefault(i, set()).add(term)
+        return {i: phrases for i, phrases in hits.items() if i not in vetoed}, keywords
+
+    def match(self, text: str) -> tuple[list[dict], set]:
+        """Return (matched rules in file order, matched skill keywords)."""
+        hits, keywords = self._hits(text)
+        return [self.rules[i] for i in sorted(hits)], keywords
+
+    def label(self, text: str) -> Optional[tuple[LabeledTicket, list[str]]]:
+        """Label ``text`` from rules alone; None when no rule matched."""
+        hits, keywords = self._hits(text)
+        if not hits:
+            return None
+
+        # Chance every phrase behind each (severity, priority, type) verdict is wrong
+        doubt: dict[tuple, float] = {}
+        for i, phrases in hits.items():
+            rule = self.rules[i]
+            verdict = (rule["severity"], rule["priority"], rule["issue_type"])
+            doubt[verdict] = doubt.get(verdict, 1.0) * (1 - rule["confidence"]) ** len(phrases)
+        verdict = min(doubt, key=doubt.get)
+        confidence = 1 - doubt[verdict]
+        # Disagreement on any field lowers confidence
+        if len(doubt) > 1:
+            confidence *= _CONFLICT_PENALTY
+
+        matched = [self.rules[i] for i in sorted(hits)]
+        labels = set(keywords)
+        for rule in matched:
+            labels.update(rule["labels"])
+        labeled = LabeledTicket(
+            severity=verdict[0],
+            priority=verdict[1],
+            issue_type=verdict[2],
+            labels=sorted(labels),
+            confidence=confidence,
+        )
+        return labeled, [r["name"] for r in matched]
+
+
+def _negated(text: str, start: int) -> bool:
+    before = re.findall(r"[\w']+", text[max(0, start - 40):start].lower())
+    return any(word in _NEGATIONS for word in before[-_NEGATION_WINDOW:])
+
+
+_rules: LabelRules = None
+_rules_lock = threading.Lock()
+
+
+def get_label_rules() -> LabelRules:
+    """Return the compiled rules, rebuilding when the rules or skills file changes."""
+    global _rules
+    mtime_ns = os.stat(_RULES_PATH).st_mtime_ns
+    skills = get_skills_index()
+    rules = _rules
+    if rules is not None and rules.mtime_ns == mtime_ns and rules.skills is skills:
+        return rules
+    with _rules_lock:
+        if _rules is None or _rules.mtime_ns != mtime_ns or _rules.skills is not skills:
+            _rules = LabelRules(load_rules(), skills, mtime_ns)
+        return _rules
+
+
+def rule_label(text: str, threshold: float = None) -> Optional[tuple[LabeledTicket, list[str]]]:
+    """Fast-path label for ``text`` if the rules are confident enough, else None."""
+    threshold = RULE_CONFIDENCE_THRESHOLD if threshold is None else threshold
+    if threshold is None:
+        return None
+    result = get_label_rules().label(text)
+    if result is None or result[0].confidence < threshold:
+        return None
+    return result
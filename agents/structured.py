@@ -0,0 +1,196 @@
+import json
+import threading
+from functools import lru_cache
+from typing import Optional
+from google.genai import types
+from pydantic import BaseModel, ValidationError, create_model
+from agents._client import MODEL
+from agents.telemetry import record, record_llm_usage
+
+MAX_REPAIRS = 1
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove markdown code fences from LLM output."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+    if text.endswith("```"):
+        text = text.rsplit("```", 1)[0]
+    return text.strip()
+
+
+@lru_cache(maxsize=32)
+def response_config(model: type[BaseModel]) -> types.GenerateContentConfig:
+    """Ask Gemini to decode straight into ``model``'s JSON schema."""
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_json_schema=model.model_json_schema(),
+    )
+
+
+@lru_cache(maxsize=64)
+def _repair_model(model: type[BaseModel], fields: tuple) -> type[BaseModel]:
+    """Sub-model holding only ``fields`` of ``model``, for the repair schema."""
+    return create_model(
+        f"{model.__name__}Repair",
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields},
+    )
+
+
+class _Check:
+    """Outcome of validating one response against a model, field by field."""
+
+    __slots__ = ("value", "data", "errors", "exc")
+
+    def __init__(self, model: type[BaseModel], data):
+        self.value: Optional[BaseModel] = None
+        self.data: dict = data if isinstance(data, dict) else {}
+        self.errors: dict[str, str] = {}
+        self.exc: Optional[Exception] = None
+        if not isinstance(data, dict):
+            # Undecodable or non-object output: every field needs repair
+            self.exc = ValueError(f"Response is not a JSON object: {str(data)[:80]!r}")
+            self.errors = {name: "missing" for name in model.model_fields}
+            return
+        try:
+            self.value = model.model_validate(data)
+        except ValidationError as e:
+            self.exc = e
+            for err in e.errors():
+                if not err["loc"]:
+                    # Cross-field rule: no single field to re-ask for
+                    self.errors = {}
+                    return
+                self.errors.setdefault(str(err["loc"][0]), err["msg"])
+
+
+def _decode(text: str):
+    try:
+        return json.loads(strip_code_fences(text or ""))
+    except ValueError:
+        return text
+
+
+def _repair_contents(check: _Check, context: str) -> str:
+    lines = [
+        "Some fields of a JSON response were invalid. Return ONLY a JSON object "
+        "with corrected values for exactly these fields:",
+    ]
+    for name, msg in check.errors.items():
+        got = json.dumps(check.data[name]) if name in check.data else "missing"
+        lines.append(f"- {name}: {msg} (got {got})")
+    lines += ["", "Source:", context]
+    return "\n".join(lines)
+
+
+class StructuredStats:
+    """Counters for structured calls: response sizes, repairs and failures."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.response_bytes = 0
+        self.repaired = 0
+        self.repair_calls = 0
+        self.failures = 0
+
+    def add(self, response_bytes: int, repair_calls: int, ok: bool):
+        with self._lock:
+            self.calls += 1
+            self.response_bytes += response_bytes
+            self.repair_calls += repair_calls
+            self.repaired += 1 if repair_calls and ok else 0
+            self.failures += 0 if ok else 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "avg_response_bytes": round(self.response_bytes / self.calls, 1) if self.calls else 0.0,
+                "repair_rate": round(self.repair_calls / self.calls, 3) if self.calls else 0.0,
+                "repaired": self.repaired,
+                "failures": self.failures,
+            }
+
+
+stats = StructuredStats()
+
+
+def _merge_repair(model: type[BaseModel], check: _Check, text: str) -> _Check:
+    fields = tuple(check.errors)
+    fixed = _Check(_repair_model(model, fields), _decode(text))
+    data = dict(check.data)
+    data.update({k: v for k, v in fixed.data.items() if k in fields})
+    return _Check(model, data)
+
+
+def _finish(check: _Check, response_bytes: int, repairs: int) -> str:
+    if repairs:
+        record("llm_repairs", repairs)
+    stats.add(response_bytes, repairs, check.value is not None)
+    if check.value is None:
+        raise check.exc
+    return check.value.model_dump_json()
+
+
+def generate_structured(
+    client,
+    model: type[BaseModel],
+    contents: str,
+    context: str,
+    max_repairs: int = MAX_REPAIRS,
+) -> str:
+    """Generate JSON for ``model`` with schema-constrained decoding.
+
+    Fields that fail validation are re-asked with a compact repair prompt
+    (the failing fields plus ``context``, not the full system prompt).
+    Returns the validated object as JSON; raises if it never validates.
+    """
+    response = client.models.generate_content(model=MODEL, contents=contents, config=response_config(model))
+    record_llm_usage(response)
+    size = len(response.text or "")
+    check = _Check(model, _decode(response.text))
+
+    repairs = 0
+    while check.value is None and check.errors and repairs < max_repairs:
+        repairs += 1
+        repair_model = _repair_model(model, tuple(check.errors))
+        response = client.models.generate_content(
+            model=MODEL, contents=_repair_contents(check, context), config=response_config(repair_model)
+        )
+        record_llm_usage(response)
+        size += len(response.text or "")
+        check = _merge_repair(model, check, response.text)
+
+    return _finish(check, size, repairs)
+
+
+async def agenerate_structured(
+    client,
+    model: type[BaseModel],
+    contents: str,
+    context: str,
+    max_repairs: int = MAX_REPAIRS,
+) -> str:
+    """Async counterpart of ``generate_structured``."""
+    response = await client.aio.models.generate_content(model=MODEL, contents=contents, config=response_config(model))
+    record_llm_usage(response)
+    size = len(response.text or "")
+    check = _Check(model, _decode(response.text))
+
+    repairs = 0
+    while check.value is None and check.errors and repairs < max_repairs:
+        repairs += 1
+        repair_model = _repair_model(model, tuple(check.errors))
+        response = await client.aio.models.generate_content(
+            model=MODEL, contents=_repair_contents(check, context), config=response_config(repair_model)
+        )
+        record_llm_usage(response)
+        size += len(response.text or "")
+        check = _merge_repair(model, check, response.text)
+
+    return _finish(check, size, repairs)
@@ -0,0 +1,176 @@
+import asyncio
+import contextvars
+import functools
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# Fields collected for the node currently executing (None outside a span)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("sentinel_span", default=None)
+
+# Latency histogram buckets (seconds) for the Prometheus export
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Span fields summed per node: (field, Prometheus counter, help text)
+_COUNTERS = (
+    ("prompt_tokens", "sentinel_llm_prompt_tokens_total", "LLM prompt tokens"),
+    ("response_tokens", "sentinel_llm_response_tokens_total", "LLM response tokens"),
+    ("embed_s", "sentinel_embed_seconds_total", "Seconds spent embedding text"),
+    ("query_s", "sentinel_vector_query_seconds_total", "Seconds spent in vector store queries"),
+    ("llm_cache_hits", "sentinel_llm_cache_hits_total", "LLM response cache hits"),
+    ("llm_cache_misses", "sentinel_llm_cache_misses_total", "LLM response cache misses"),
+    ("llm_repairs", "sentinel_llm_repairs_total", "Structured-output field repair calls"),
+    ("rule_labels", "sentinel_rule_labels_total", "Tickets labeled by keyword rules without the LLM"),
+    ("lexical_dups", "sentinel_lexical_duplicates_total", "Duplicates found by the lexical index without embedding"),
+)
+
+
+def record(field: str, value: float):
+    """Add ``value`` to a field of the active span; no-op outside a span."""
+    span = _current_span.get()
+    if span is not None:
+        span[field] = span.get(field, 0) + value
+
+
+@contextmanager
+def timed(field: str):
+    """Accumulate the wall time of the block into a span field."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(field, time.perf_counter() - start)
+
+
+def record_llm_usage(response):
+    """Record prompt/response token counts from a Gemini response."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    record("prompt_tokens", getattr(usage, "prompt_token_count", None) or 0)
+    record("response_tokens", getattr(usage, "candidates_token_count", None) or 0)
+
+
+class SpanRecorder:
+    """Process-wide sink for node spans with JSON-lines and Prometheus export."""
+
+    def __init__(self, max_spans: int = 10_000):
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._count = defaultdict(int)
+        self._errors = defaultdict(int)
+        self._wall_sum = defaultdict(float)
+        self._buckets = defaultdict(lambda: [0] * len(LATENCY_BUCKETS))
+        self._counters = defaultdict(lambda: defaultdict(float))
+
+    def add(self, span: dict):
+        node = span["node"]
+        with self._lock:
+            self._spans.append(span)
+            self._count[node] += 1
+            self._errors[node] += 1 if span.get("error") else 0
+            self._wall_sum[node] += span["wall_s"]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if span["wall_s"] <= bound:
+                    self._buckets[node][i] += 1
+            for field, _, _ in _COUNTERS:
+                if field in span:
+                    self._counters[field][node] += span[field]
+
+    def spans(self) -> list[dict]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._reset()
+
+    def export_jsonl(self, path: str):
+        """Append buffered spans to a JSON-lines file."""
+        with open(path, "a") as f:
+            for span in self.spans():
+                f.write(json.dumps(span) + "\n")
+
+    def prometheus_text(self) -> str:
+        """Render aggregates in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                "# HELP sentinel_node_latency_seconds Wall time per pipeline node",
+                "# TYPE sentinel_node_latency_seconds histogram",
+            ]
+            for node in sorted(self._count):
+                for bound, n in zip(LATENCY_BUCKETS, self._buckets[node]):
+                    lines.append(f'sentinel_node_latency_seconds_bucket{{node="{node}",le="{bound}"}} {n}')
+                lines.append(f'sentinel_node_latency_seconds_bucket{{node="{node}",le="+Inf"}} {self._count[node]}')
+                lines.append(f'sentinel_node_latency_seconds_sum{{node="{node}"}} {self._wall_sum[node]:.6f}')
+                lines.append(f'sentinel_node_latency_seconds_count{{node="{node}"}} {self._count[node]}')
+
+            lines += [
+                "# HELP sentinel_node_errors_total Node invocations that raised",
+                "# TYPE sentinel_node_errors_total counter",
+            ]
+            lines += [f'sentinel_node_errors_total{{node="{n}"}} {c}' for n, c in sorted(self._errors.items())]
+
+            for field, metric, help_text in _COUNTERS:
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+                for node, value in sorted(self._counters[field].items()):
+                    lines.append(f'{metric}{{node="{node}"}} {value:g}')
+            return "\n".join(lines) + "\n"
+
+
+recorder = SpanRecorder()
+
+
+def _start(name: str):
+    span = {"node": name, "start": time.time()}
+    return span, _current_span.set(span), time.perf_counter()
+
+
+def _finish(span: dict, started: float, update: dict = None, error: bool = False) -> dict:
+    span["wall_s"] = round(time.perf_counter() - started, 6)
+    if error:
+        span["error"] = True
+    recorder.add(span)
+    if update is None:
+        return None
+    update = dict(update)
+    update["spans"] = [span]
+    return update
+
+
+def instrument_node(name: str, fn):
+    """Wrap a graph node so each call emits a span into state and the recorder."""
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(state):
+            span, token, started = _start(name)
+            try:
+                update = await fn(state)
+            except Exception:
+                _finish(span, started, error=True)
+                raise
+            finally:
+                _current_span.reset(token)
+            return _finish(span, started, update)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state):
+        span, token, started = _start(name)
+        try:
+            update = fn(state)
+        except Exception:
+            _finish(span, started, error=True)
+            raise
+        finally:
+            _current_span.reset(token)
+        return _finish(span, started, update)
+
+    return wrapper
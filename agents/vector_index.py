@@ -0,0 +1,598 @@
+import contextlib
+import fcntl
+import json
+import mmap
+import os
+import shutil
+import threading
+from array import array
+from itertools import islice
+import numpy as np
+
+# Candidates rescored with float32 vectors, per quantization
+RERANK_CANDIDATES = {"int8": 32, "binary": 256}
+QUANTIZATIONS = tuple(RERANK_CANDIDATES)
+
+_SCAN_BLOCK = 8192   # Rows quantized, or int8 rows widened to float32, at a time
+_BITS_BLOCK = 32768  # Rows of sign bits compared at a time
+
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _bit_count(words: np.ndarray) -> np.ndarray:
+    """Set bits in each uint64; np.bitwise_count needs NumPy 2, older versions use a byte table."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    words = np.ascontiguousarray(words)
+    return _POPCOUNT[words.view(np.uint8).reshape(*words.shape, 8)].sum(axis=-1, dtype=np.uint8)
+
+
+def _truncate(path: str, size: int):
+    """Cut a file back to ``size`` bytes if something was written past it."""
+    if os.path.getsize(path) > size:
+        with open(path, "ab") as f:
+            f.truncate(size)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+_RANGE_OPS = {"$gt": np.greater, "$gte": np.greater_equal, "$lt": np.less, "$lte": np.less_equal}
+
+
+class ExactCollection:
+    """Brute-force cosine search over a NumPy matrix, persisted to disk.
+
+    Implements the part of ``chromadb.Collection`` dedup and the indexer
+    use (``get``, ``upsert``, ``query``, ``count``, ``delete``) with the same
+    result shapes, so it can stand in for an HNSW collection. Every query
+    scores every stored vector: recall is exact, latency grows linearly,
+    which suits small and medium corpora.
+
+    On disk, ``vectors.f32`` holds one normalized row per upsert and
+    ``records.jsonl`` the matching id, document and metadata. Re-upserting
+    an id appends a new row; on load the last row for each id wins.
+    ``deleted.jsonl`` lists (id, row) pairs removed by ``delete``. Dead
+    rows are still scored until ``vacuum`` rewrites the files without them.
+
+    Several processes may share a store (e.g. the app next to the importer
+    or compaction CLIs): writes hold an exclusive ``flock`` on
+    ``<path>.lock`` and first read what other handles appended, so rows are
+    always placed after what is on disk. Reads pick up other handles'
+    writes, or reload a store another handle vacuumed, when the files change.
+    """
+
+    def __init__(self, path: str, dim: int = None):
+        self.path = path
+        self.dim = dim
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._records_path = os.path.join(path, "records.jsonl")
+        self._deleted_path = os.path.join(path, "deleted.jsonl")
+        # Next to the store rather than in it, so vacuum can swap the directory
+        self._lock_path = f"{path}.lock"
+        self._lock = threading.Lock()
+        self._records_file = None
+        self._reset()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._file_lock():
+            self._recover_vacuum()
+            os.makedirs(path, exist_ok=True)
+            self._sync()
+
+    def _reset(self):
+        self._rows: dict[str, int] = {}      # id -> live row
+        self._records = self._new_records()  # row -> {"id", "document", "metadata"}
+        # Where-filter indexes, built per field the first time a filter uses it:
+        # (field, value) -> rows for other values, numeric fields as float columns (NaN if absent)
+        self._indexed: set[str] = set()
+        self._postings: dict[tuple, list[int]] = {}
+        self._numbers: dict[str, np.ndarray] = {}
+        self._matrix = np.zeros((0, self.dim or 0), dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._size = 0
+        # Open records.jsonl this handle has read, and how far into it and deleted.jsonl
+        if self._records_file is not None:
+            self._records_file.close()
+        self._records_file = None
+        self._records_end = 0
+        self._deleted_end = 0
+
+    # Vector storage; QuantizedCollection keeps it in mapped files instead
+
+    def _new_records(self):
+        return []
+
+    def _read_vectors(self, start: int, count: int) -> np.ndarray:
+        vectors = np.fromfile(self._vectors_path, dtype=np.float32, count=count * self.dim, offset=start * self.dim * 4)
+        return vectors.reshape(count, self.dim)
+
+    def _grow_vectors(self, capacity: int):
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        if self._size:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+    def _store_vectors(self, start: int, vectors: np.ndarray):
+        self._matrix[start:start + len(vectors)] = vectors
+
+    def _snapshot(self):
+        """Vector state a query keeps using after releasing the lock."""
+        return self._matrix
+
+    def _embeddings(self, snapshot, rows: list) -> np.ndarray:
+        return snapshot[rows].copy()
+
+    def _search(self, queries: np.ndarray, live: np.ndarray, k: int, snapshot) -> tuple[list, list]:
+        """Top-k live rows and their cosine similarities, per query."""
+        scores = queries @ snapshot[:len(live)].T
+        scores[:, ~live] = -np.inf
+        top_rows, top_scores = [], []
+        for row_scores in scores:
+            top = np.argpartition(-row_scores, k - 1)[:k]
+            top = top[np.argsort(-row_scores[top], kind="stable")]
+            top_rows.append(list(top))
+            top_scores.append(row_scores[top])
+        return top_rows, top_scores
+
+    # Sharing the files with other handles
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        with self._lock, open(self._lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _recover_vacuum(self):
+        """Finish a vacuum interrupted between swapping the old and new directories."""
+        if not os.path.exists(self.path):
+            for leftover in (f"{self.path}.vacuum", f"{self.path}.old"):
+                if os.path.exists(leftover):
+                    os.replace(leftover, self.path)
+                    break
+        shutil.rmtree(f"{self.path}.old", ignore_errors=True)
+        shutil.rmtree(f"{self.path}.vacuum", ignore_errors=True)
+
+    def _changed(self) -> bool:
+        """Whether another handle wrote to or vacuumed the store since the last sync."""
+        try:
+            records = os.stat(self._records_path)
+        except FileNotFoundError:
+            return False
+        if self._records_file is None:
+            return True
+        seen = os.fstat(self._records_file.fileno())
+        deleted = os.path.getsize(self._deleted_path) if os.path.exists(self._deleted_path) else 0
+        return ((records.st_dev, records.st_ino) != (seen.st_dev, seen.st_ino)
+                or records.st_size != self._records_end or deleted != self._deleted_end)
+
+    def _refresh(self):
+        """Sync before a read, taking the file lock only if the files changed."""
+        if self._changed():
+            with self._file_lock():
+                self._sync()
+
+    def _sync(self):
+        """Read rows and deletes written since the last sync; call with the file lock held.
+
+        A store vacuumed since is reloaded from scratch. Records without a
+        vector and partial lines (a crash mid-append) are cut off, and
+        vectors without a record are overwritten by the next upsert.
+        """
+        if not os.path.exists(self._records_path):
+            return
+        if self._records_file is not None:
+            # The open file keeps its inode, so a replaced records.jsonl never looks the same
+            seen, current = os.fstat(self._records_file.fileno()), os.stat(self._records_path)
+            if (seen.st_dev, seen.st_ino) != (current.st_dev, current.st_ino):
+                self._reset()
+        if self._records_file is None:
+            self._records_file = open(self._records_path, "rb")
+        if self.dim is None:
+            n_records = sum(1 for _ in self._lines(self._records_file, 0))
+            if not n_records:
+                return
+            self.dim = os.path.getsize(self._vectors_path) // (4 * n_records)
+        stored = os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+        lines = self._lines(self._records_file, self._records_end)
+        # In chunks, so a large store never has every record parsed at once
+        while self._size < stored:
+            chunk = list(islice(lines, min(_SCAN_BLOCK, stored - self._size)))
+            if not chunk:
+                break
+            self._append([record for _, record in chunk], self._read_vectors(self._size, len(chunk)))
+            self._records_end = chunk[-1][0]
+        _truncate(self._records_path, self._records_end)
+        if os.path.exists(self._deleted_path):
+            with open(self._deleted_path, "rb") as f:
+                for end, deleted in self._lines(f, self._deleted_end):
+                    self._drop(deleted["id"], deleted["row"])
+                    self._deleted_end = end
+            _truncate(self._deleted_path, self._deleted_end)
+
+    @staticmethod
+    def _lines(f, start: int):
+        """(end offset, parsed line) for each complete JSON line of ``f`` after ``start``."""
+        f.seek(start)
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            start += len(line)
+            if line.strip():
+                yield start, json.loads(line)
+
+    def _append(self, records: list[dict], vectors: np.ndarray):
+        """Add rows in memory, growing arrays geometrically."""
+        needed = self._size + len(records)
+        if needed > len(self._live) or self._matrix.shape[1] != self.dim:
+            capacity = max(needed, 2 * len(self._live), 1024)
+            self._grow_vectors(capacity)
+            live = np.zeros(capacity, dtype=bool)
+            live[:self._size] = self._live[:self._size]
+            self._live = live
+            for field, column in self._numbers.items():
+                self._numbers[field] = np.concatenate([column, np.full(capacity - len(column), np.nan)])
+        self._store_vectors(self._size, vectors)
+        for offset, record in enumerate(records):
+            row = self._size + offset
+            previous = self._rows.get(record["id"])
+            if previous is not None:
+                self._live[previous] = False
+            self._rows[record["id"]] = row
+            self._live[row] = True
+            if self._indexed:
+                metadata = record["metadata"] or {}
+                for field in self._indexed:
+                    self._index_value(field, row, metadata.get(field))
+        self._records.extend(records)
+        self._size = needed
+
+    def _index_value(self, field: str, row: int, value):
+        if value is None:
+            return
+        if _is_number(value):
+            if field not in self._numbers:
+                self._numbers[field] = np.full(len(self._live), np.nan)
+            self._numbers[field][row] = value
+        else:
+            self._postings.setdefault((field, value), []).append(row)
+
+    def _index_field(self, field: str):
+        if field in self._indexed:
+            return
+        for row in range(self._size):
+            self._index_value(field, row, (self._records[row]["metadata"] or {}).get(field))
+        self._indexed.add(field)
+
+    def count(self) -> int:
+        self._refresh()
+        return len(self._rows)
+
+    def upsert(self, ids: list, embeddings, documents: list = None, metadatas: list = None):
+        vectors = _normalize(embeddings)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        records = [
+            {
+                "id": id_,
+                "document": documents[i] if documents else None,
+                "metadata": metadatas[i] if metadatas else None,
+            }
+            for i, id_ in enumerate(ids)
+        ]
+        with self._file_lock():
+            self._sync()
+            with open(self._vectors_path, "ab") as f:
+                # Overwrite vectors an interrupted append left without a record
+                f.truncate(self._size * self.dim * 4)
+                f.write(vectors.tobytes())
+            with open(self._records_path, "a") as f:
+                f.writelines(json.dumps(r) + "\n" for r in records)
+            self._sync()
+
+    add = upsert
+
+    def _drop(self, id_: str, row: int):
+        if self._rows.get(id_) == row:
+            del self._rows[id_]
+            self._live[row] = False
+
+    def delete(self, ids: list):
+        """Drop ids from search; their rows stay on disk."""
+        with self._file_lock():
+            self._sync()
+            deleted = [{"id": id_, "row": self._rows[id_]} for id_ in ids if id_ in self._rows]
+            with open(self._deleted_path, "a") as f:
+                f.writelines(json.dumps(d) + "\n" for d in deleted)
+            self._sync()
+
+    def vacuum(self) -> int:
+        """Rewrite the store with live rows only; returns the rows reclaimed.
+
+        The compacted copy is written next to the store and swapped in, so
+        a crash leaves either the old or the new store intact. Other handles
+        reload the new store at their next read or write.
+        """
+        with self._file_lock():
+            self._sync()
+            rows = sorted(self._rows.values())
+            reclaimed = self._size - len(rows)
+            if not reclaimed:
+                return 0
+            staging, old = f"{self.path}.vacuum", f"{self.path}.old"
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            self._embeddings(self._snapshot(), rows).tofile(os.path.join(staging, "vectors.f32"))
+            with open(os.path.join(staging, "records.jsonl"), "w") as f:
+                f.writelines(json.dumps(self._records[r]) + "\n" for r in rows)
+            os.replace(self.path, old)
+            os.replace(staging, self.path)
+            shutil.rmtree(old)
+            self._reset()
+            self._sync()
+            return reclaimed
+
+    def get(self, ids: list = None, where: dict = None, include: list = ("metadatas", "documents"),
+            limit: int = None, offset: int = 0) -> dict:
+        self._refresh()
+        with self._lock:
+            rows = [self._rows[i] for i in (ids if ids is not None else list(self._rows)) if i in self._rows]
+            if where:
+                mask = self._where_mask(where, self._size)
+                rows = [r for r in rows if mask[r]]
+            end = None if limit is None else offset + limit
+            return self._shape(rows[offset:end], include, self._records, self._snapshot())
+
+    def _shape(self, rows: list, include, records, snapshot) -> dict:
+        found = [records[r] for r in rows]
+        return {
+            "ids": [r["id"] for r in found],
+            "documents": [r["document"] for r in found] if "documents" in include else None,
+            "metadatas": [r["metadata"] for r in found] if "metadatas" in include else None,
+            "embeddings": self._embeddings(snapshot, rows) if "embeddings" in include else None,
+        }
+
+    def _rows_mask(self, rows, size: int) -> np.ndarray:
+        mask = np.zeros(size, dtype=bool)
+        rows = np.asarray(rows, dtype=np.int64)
+        mask[rows[rows < size]] = True
+        return mask
+
+    def _equals_mask(self, field: str, values: list, size: int) -> np.ndarray:
+        mask = self._rows_mask(
+            [r for v in values if not _is_number(v) for r in self._postings.get((field, v), ())], size
+        )
+        numbers = [v for v in values if _is_number(v)]
+        column = self._numbers.get(field)
+        if numbers and column is not None:
+            mask |= np.isin(column[:size], numbers)
+        return mask
+
+    def _where_mask(self, where: dict, size: int) -> np.ndarray:
+        """Rows matching a Chroma-style where filter.
+
+        Supports field equality, $eq/$ne/$gt/$gte/$lt/$lte/$in/$nin and
+        $and/$or. As in Chroma, $ne and $nin match rows without the field
+        and range operators only match numeric values.
+        """
+        mask = np.ones(size, dtype=bool)
+        for field, condition in where.items():
+            if field in ("$and", "$or"):
+                masks = [self._where_mask(w, size) for w in condition]
+                mask &= np.logical_and.reduce(masks) if field == "$and" else np.logical_or.reduce(masks)
+                continue
+            self._index_field(field)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, value in condition.items():
+                if op in ("$eq", "$ne"):
+                    matched = self._equals_mask(field, [value], size)
+                elif op in ("$in", "$nin"):
+                    matched = self._equals_mask(field, list(value), size)
+                elif op in _RANGE_OPS:
+                    column = self._numbers.get(field)
+                    with np.errstate(invalid="ignore"):
+                        matched = _RANGE_OPS[op](column[:size], value) if column is not None else np.zeros(size, bool)
+                else:
+                    raise ValueError(f"Unsupported where operator {op!r}")
+                mask &= ~matched if op in ("$ne", "$nin") else matched
+        return mask
+
+    def query(self, query_embeddings, n_results: int = 10, where: dict = None,
+              include: list = ("metadatas", "documents", "distances")) -> dict:
+        """Nearest rows by cosine, optionally restricted by a ``where`` metadata filter."""
+        queries = _normalize(query_embeddings)
+        self._refresh()
+        with self._lock:
+            # Rows below size never change in place (vacuum swaps in new
+            # objects), so score and shape from this snapshot outside the lock
+            records, snapshot, live = self._records, self._snapshot(), self._live[:self._size].copy()
+            if where:
+                live &= self._where_mask(where, len(live))
+
+        k = min(n_results, int(live.sum()))
+        if k:
+            top_rows, top_scores = self._search(queries, live, k, snapshot)
+        else:
+            top_rows = [[] for _ in queries]
+            top_scores = [[] for _ in queries]
+
+        shaped = [self._shape(rows, include, records, snapshot) for rows in top_rows]
+        # Chroma's hnsw:space=cosine reports 1 - similarity
+        return {
+            "ids": [s["ids"] for s in shaped],
+            "documents": [s["documents"] for s in shaped] if "documents" in include else None,
+            "metadatas": [s["metadatas"] for s in shaped] if "metadatas" in include else None,
+            "distances": [[float(1 - x) for x in sc] for sc in top_scores] if "distances" in include else None,
+        }
+
+
+class _RecordFile:
+    """``records.jsonl`` read one line at a time; only line offsets stay in memory."""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._offsets = array("q", [0])
+        self._fd = None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def extend(self, records: list[dict]):
+        # Opened with the first records, so a later vacuum can't swap the file under the offsets
+        if self._fd is None:
+            self._fd = os.open(self._path, os.O_RDONLY)
+        # Lines were written with json.dumps, so re-encoding gives their exact length
+        for record in records:
+            self._offsets.append(self._offsets[-1] + len((json.dumps(record) + "\n").encode()))
+
+    def __getitem__(self, row: int) -> dict:
+        start = self._offsets[row]
+        return json.loads(os.pread(self._fd, self._offsets[row + 1] - start, start))
+
+    def __del__(self):
+        if self._fd is not None:
+            os.close(self._fd)
+
+
+class QuantizedCollection(ExactCollection):
+    """ExactCollection that scans quantized codes and reranks in float32.
+
+    ``int8`` keeps one signed byte per dimension and a per-vector scale (4x
+    smaller than float32); ``binary`` keeps the sign bits (32x smaller) and
+    ranks by Hamming distance. The best ``rerank`` candidates are rescored
+    against ``vectors.f32``, so reported distances are exact and a true
+    neighbour is only lost if it misses the candidate list.
+
+    Codes and float32 vectors are memory-mapped and documents and metadata
+    are read from ``records.jsonl`` per result, so resident memory is the
+    id map plus whatever pages the OS keeps cached. Codes are derived from
+    ``vectors.f32`` and rebuilt on open if missing or short.
+    """
+
+    def __init__(self, path: str, dim: int = None, quantization: str = "int8", rerank: int = None):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization {quantization!r}; expected one of {QUANTIZATIONS}")
+        self.quantization = quantization
+        self.rerank = rerank or RERANK_CANDIDATES[quantization]
+        self._codes_path = os.path.join(path, f"codes.{quantization}")
+        self._scales_path = os.path.join(path, "scales.f32")
+        super().__init__(path, dim)
+
+    def _reset(self):
+        super()._reset()
+        self._codes = self._scales = self._vectors = None
+
+    def _new_records(self):
+        return _RecordFile(self._records_path)
+
+    def _code_width(self) -> int:
+        # Sign bits are padded to whole 64-bit words, so Hamming distance counts words
+        return self.dim if self.quantization == "int8" else (self.dim + 63) // 64 * 8
+
+    def _sign_bits(self, vectors: np.ndarray) -> np.ndarray:
+        bits = np.packbits(vectors > 0, axis=1)
+        return np.pad(bits, ((0, 0), (0, self._code_width() - bits.shape[1])))
+
+    def _quantize(self, vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        if self.quantization == "binary":
+            return self._sign_bits(vectors), None
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1
+        return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+    def _map(self, path: str, dtype, shape: tuple):
+        if not shape[0]:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+    def _read_vectors(self, start: int, count: int) -> np.ndarray:
+        return self._map_vectors(start + count)[start:]
+
+    def _map_vectors(self, rows: int) -> np.ndarray:
+        vectors = self._map(self._vectors_path, np.float32, (rows, self.dim))
+        if isinstance(vectors, np.memmap):
+            # Reranking reads scattered rows; readahead would page in their neighbours too
+            vectors._mmap.madvise(mmap.MADV_RANDOM)
+        return vectors
+
+    def _grow_vectors(self, capacity: int):
+        # Vectors live in the mapped files; only record that the dimension is known
+        self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+
+    def _store_vectors(self, start: int, vectors: np.ndarray):
+        """Quantize rows missing from the codes file and remap everything."""
+        rows, width = start + len(vectors), self._code_width()
+        int8 = self.quantization == "int8"
+        have = os.path.getsize(self._codes_path) // width if os.path.exists(self._codes_path) else 0
+        if int8:
+            have = min(have, os.path.getsize(self._scales_path) // 4 if os.path.exists(self._scales_path) else 0)
+        if have < rows:
+            # Codes for a row never change once written, so only cut off a partial
+            # block from an interrupted write; other handles may have the rest mapped
+            source = self._map_vectors(rows)
+            with open(self._codes_path, "ab") as codes, \
+                    (open(self._scales_path, "ab") if int8 else contextlib.nullcontext()) as scales:
+                codes.truncate(have * width)
+                if int8:
+                    scales.truncate(have * 4)
+                for lo in range(have, rows, _SCAN_BLOCK):
+                    block_codes, block_scales = self._quantize(np.asarray(source[lo:min(lo + _SCAN_BLOCK, rows)]))
+                    codes.write(block_codes.tobytes())
+                    if int8:
+                        scales.write(block_scales.tobytes())
+        self._codes = self._map(self._codes_path, np.int8 if int8 else np.uint8, (rows, width))
+        self._scales = self._map(self._scales_path, np.float32, (rows,)) if int8 else None
+        self._vectors = self._map_vectors(rows)
+
+    def _snapshot(self):
+        return self._codes, self._scales, self._vectors
+
+    def _embeddings(self, snapshot, rows: list) -> np.ndarray:
+        vectors = snapshot[2]
+        return np.array(vectors[rows] if vectors is not None else np.zeros((0, self.dim or 0)), dtype=np.float32)
+
+    def _approximate(self, queries: np.ndarray, codes, scales, size: int) -> np.ndarray:
+        """Approximate similarity of each query to rows [0, size), one block of codes at a time."""
+        scores = np.empty((len(queries), size), dtype=np.float32)
+        query_words = self._sign_bits(queries).view(np.uint64) if scales is None else None
+        block = _SCAN_BLOCK if query_words is None else _BITS_BLOCK
+        for lo in range(0, size, block):
+            hi = min(lo + block, size)
+            if query_words is None:
+                scores[:, lo:hi] = (queries @ codes[lo:hi].astype(np.float32).T) * scales[lo:hi]
+            else:
+                # Summing word by word beats a reduction over the short word axis
+                words = codes[lo:hi].view(np.uint64)
+                hamming = np.zeros((len(queries), hi - lo), dtype=np.int32)
+                for w in range(words.shape[1]):
+                    hamming += _bit_count(words[:, w] ^ query_words[:, w, None])
+                scores[:, lo:hi] = -hamming
+        return scores
+
+    def _search(self, queries: np.ndarray, live: np.ndarray, k: int, snapshot) -> tuple[list, list]:
+        codes, scales, vectors = snapshot
+        scores = self._approximate(queries, codes, scales, len(live))
+        scores[:, ~live] = -np.inf
+        n_candidates = min(int(live.sum()), max(k, self.rerank))
+        top_rows, top_scores = [], []
+        for query, row_scores in zip(queries, scores):
+            # Sorted so the float32 rows are read front to back
+            candidates = np.sort(np.argpartition(-row_scores, n_candidates - 1)[:n_candidates])
+            exact = np.asarray(vectors[candidates]) @ query
+            order = np.argsort(-exact, kind="stable")[:k]
+            top_rows.append(list(candidates[order]))
+            top_scores.append(exact[order])
+        return top_rows, top_scores
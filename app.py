@@ -1,12 +1,18 @@
 import json
+import os
 import gradio as gr
-from graph.pipeline import run_triage
-from agents.dedup import init_vector_store, seed_vector_store
+from graph.pipeline import stream_triage
+from agents.dedup import get_collection, seed_vector_store, warm_up_embeddings, warm_up_lexical_index
+from agents.gate import GATE_ENABLED
 from agents.jira_client import create_jira_ticket
+from agents.indexer import index_created_ticket
 
-# Initialize ChromaDB on startup
-collection = init_vector_store()
+# Open the pooled ChromaDB collection on startup
+collection = get_collection()
 seed_vector_store(collection)
+# Load the embedding model now so the first triage doesn't pay for it
+print(f"Embedding model warmed up in {warm_up_embeddings():.2f}s")
+print(f"Lexical index built in {warm_up_lexical_index():.2f}s")
 
 EXAMPLE_INPUTS = [
     "The login button on the checkout page is unresponsive on Safari. Works on Chrome.",
@@ -16,16 +22,19 @@ EXAMPLE_INPUTS = [
     "URGENT: User passwords exposed in plaintext in /api/v2/users response",
 ]
 
-# Store the latest Jira payload for the "Create in Jira" button
-_latest_jira_payload = {"payload": None}
+# Triage runs handled at once across all sessions; further clicks wait in the queue
+APP_CONCURRENCY = int(os.getenv("APP_CONCURRENCY", "8"))
+# Requests allowed to wait before new ones are turned away
+APP_MAX_QUEUE = int(os.getenv("APP_MAX_QUEUE", "64"))
 
 
-def process_ticket(raw_input: str):
-    """Run the full triage pipeline and return formatted outputs for each tab."""
-    if not raw_input.strip():
-        return "Please enter a bug report.", "", "", "", "", gr.update(visible=False), ""
+def _format_outputs(result, done: bool):
+    """Format a (possibly partial) triage result for each tab.
 
-    result = run_triage(raw_input)
+    Tabs whose node hasn't run yet show as pending until the run is done,
+    after which they show as skipped.
+    """
+    pending = json.dumps({"status": "Skipped" if done else "Pending..."}, indent=2)
 
     # Tab 1: Intake
     if result.get("parsed_ticket"):
@@ -33,22 +42,26 @@ def process_ticket(raw_input: str):
         intake_output = json.dumps(pt.model_dump(), indent=2)
     elif result.get("error"):
         intake_output = json.dumps({"error": result["error"]}, indent=2)
-    else:
+    elif done:
         intake_output = json.dumps({"status": "no output"}, indent=2)
+    else:
+        intake_output = pending
 
     # Tab 2: Dedup
     if result.get("dedup_result"):
         dedup_output = json.dumps(result["dedup_result"].model_dump(), indent=2)
-    else:
+    elif done:
         dedup_output = json.dumps(
             {"status": "Skipped (input was invalid or needs clarification)"}, indent=2
         )
+    else:
+        dedup_output = pending
 
     # Tab 3: Labels
     if result.get("labeled_ticket"):
         labeled_output = json.dumps(result["labeled_ticket"].model_dump(), indent=2)
     else:
-        labeled_output = json.dumps({"status": "Skipped"}, indent=2)
+        labeled_output = pending
 
     # Tab 4: Routing + Jira Payload
     if result.get("team_assignment") and result.get("jira_payload"):
@@ -59,41 +72,59 @@ def process_ticket(raw_input: str):
             },
             indent=2,
         )
-        # Store payload for Jira creation
-        _latest_jira_payload["payload"] = result["jira_payload"].model_dump()
     else:
-        route_output = json.dumps({"status": "Skipped"}, indent=2)
-        _latest_jira_payload["payload"] = None
+        route_output = pending
 
     # Tab 5: Trace
-    trace_output = f"Decision: {result.get('decision', 'unknown')}\n\n"
+    trace_output = f"Decision: {result.get('decision', 'unknown' if done else 'running...')}\n\n"
     trace_output += "Pipeline Trace:\n"
     for step in result.get("trace", []):
         trace_output += f"  -> {step}\n"
 
+    return intake_output, dedup_output, labeled_output, route_output, trace_output
+
+
+def process_ticket(raw_input: str, session: dict = None):
+    """Run the triage pipeline, updating the tabs as each node finishes.
+
+    ``session`` is this browser session's ``gr.State``; the last output is
+    its new value, holding the Jira payload for the "Create in Jira" button.
+    """
+    if not raw_input.strip():
+        yield "Please enter a bug report.", "", "", "", "", gr.update(visible=False), "", None
+        return
+
+    # Hide the Jira button and clear any previous Jira result while running
+    result = None
+    for _, result in stream_triage(raw_input, gate=GATE_ENABLED):
+        yield (*_format_outputs(result, done=False), gr.update(visible=False), "", None)
+
+    # Store payload for Jira creation in this session only
+    if result.get("team_assignment") and result.get("jira_payload"):
+        session = {
+            "payload": result["jira_payload"].model_dump(),
+            "ticket": (result["parsed_ticket"], result["labeled_ticket"], result["team_assignment"]),
+        }
+    else:
+        session = None
+
     # Show/hide Jira button based on decision
     show_jira_btn = result.get("decision") == "create_ticket"
 
-    return (
-        intake_output,
-        dedup_output,
-        labeled_output,
-        route_output,
-        trace_output,
-        gr.update(visible=show_jira_btn),
-        "",  # Clear any previous Jira result
-    )
+    yield (*_format_outputs(result, done=True), gr.update(visible=show_jira_btn), "", session)
 
 
-def create_in_jira():
-    """Create the triaged ticket in Jira Cloud."""
-    payload = _latest_jira_payload.get("payload")
-    if not payload:
+def create_in_jira(session: dict = None):
+    """Create this session's triaged ticket in Jira Cloud."""
+    if not session or not session.get("payload"):
         return "No ticket payload available. Run triage first."
 
-    result = create_jira_ticket(payload)
+    result = create_jira_ticket(session["payload"])
 
     if result.success:
+        # Make the new ticket visible to dedup for future reports
+        if session.get("ticket"):
+            index_created_ticket(result.key, *session["ticket"])
         return f"Jira ticket **{result.key}** created\n\n{result.url}"
     else:
         return f"Failed to create Jira ticket: {result.error}"
@@ -109,6 +140,9 @@ with gr.Blocks(title="Sentinel — AI Triage Agent", theme=gr.themes.Soft()) as
         """
     )
 
+    # Per-session Jira payload: one user's button never files another's ticket
+    jira_session = gr.State(None)
+
     with gr.Row():
         with gr.Column(scale=1):
             input_text = gr.Textbox(
@@ -145,7 +179,7 @@ with gr.Blocks(title="Sentinel — AI Triage Agent", theme=gr.themes.Soft()) as
 
     submit_btn.click(
         fn=process_ticket,
-        inputs=input_text,
+        inputs=[input_text, jira_session],
         outputs=[
             intake_out,
             dedup_out,
@@ -154,14 +188,18 @@ with gr.Blocks(title="Sentinel — AI Triage Agent", theme=gr.themes.Soft()) as
             trace_out,
             create_jira_btn,
             jira_result,
+            jira_session,
         ],
     )
 
     create_jira_btn.click(
         fn=create_in_jira,
-        inputs=[],
+        inputs=[jira_session],
         outputs=jira_result,
     )
 
+# Streaming needs the queue; it also caps concurrent runs across sessions
+demo.queue(default_concurrency_limit=APP_CONCURRENCY, max_size=APP_MAX_QUEUE)
+
 if __name__ == "__main__":
     demo.launch()
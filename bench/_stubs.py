@@ -0,0 +1,248 @@
+import asyncio
+import json
+import re
+import threading
+import time
+import zlib
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from schema.ticket import JiraCreateResult
+
+EMBEDDING_DIM = 384  # Same width as all-MiniLM-L6-v2
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class HashEmbeddingFunction(EmbeddingFunction):
+    """Deterministic bag-of-words hashing embedding — no model download.
+
+    Identical texts embed identically (cosine similarity 1.0) and texts that
+    share words land close together, which is enough to exercise dedup.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return [self._embed(text) for text in input]
+
+    def _embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            h = zlib.crc32(token.encode())
+            vec[h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        if norm == 0:
+            vec[0] = 1.0
+            return vec
+        return vec / norm
+
+    @staticmethod
+    def name() -> str:
+        return "sentinel-hash"
+
+    def get_config(self) -> dict:
+        return {"dim": self.dim}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "HashEmbeddingFunction":
+        return HashEmbeddingFunction(dim=config.get("dim", EMBEDDING_DIM))
+
+
+_SKILLS_VOCAB = {
+    "payments", "checkout", "billing", "subscriptions", "stripe", "refunds",
+    "auth", "login", "sso", "api", "performance", "infrastructure", "database",
+    "ui", "css", "responsive", "accessibility", "browser", "safari", "chrome", "mobile",
+    "analytics", "reports", "dashboard", "export", "csv", "data", "metrics",
+    "security", "vulnerability", "xss", "csrf", "injection", "encryption", "pii",
+}
+_CRITICAL_WORDS = {"urgent", "security", "password", "passwords", "breach", "down", "injection", "xss"}
+_FEATURE_PHRASES = ("would be nice", "would be great", "feature request", "dark mode", "please add")
+
+
+class _StubUsage:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+
+class _StubResponse:
+    """Gemini-shaped response; token counts are whitespace word counts."""
+
+    def __init__(self, text: str, contents: str = ""):
+        self.text = text
+        self.usage_metadata = _StubUsage(len(contents.split()), len(text.split()))
+
+
+class _StubModels:
+    def __init__(self, owner: "StubGenAIClient"):
+        self._owner = owner
+
+    def generate_content(self, model: str, contents: str, **kwargs) -> _StubResponse:
+        return self._owner._respond(contents)
+
+
+class _StubAsyncModels:
+    def __init__(self, owner: "StubGenAIClient"):
+        self._owner = owner
+
+    async def generate_content(self, model: str, contents: str, **kwargs) -> _StubResponse:
+        if self._owner.delay:
+            await asyncio.sleep(self._owner.delay)
+        return self._owner._respond(contents, sleep=False)
+
+
+class _StubAio:
+    def __init__(self, owner: "StubGenAIClient"):
+        self.models = _StubAsyncModels(owner)
+
+
+class StubGenAIClient:
+    """Offline stand-in for ``genai.Client`` with keyword-driven answers.
+
+    Recognises the intake, labeler and fused prompts and returns schema-valid JSON
+    for each, through both ``models`` and ``aio.models``. ``delay`` simulates
+    the LLM round-trip in seconds.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.models = _StubModels(self)
+        self.aio = _StubAio(self)
+
+    def _respond(self, contents: str, sleep: bool = True) -> _StubResponse:
+        with self._lock:
+            self.calls += 1
+        if sleep and self.delay:
+            time.sleep(self.delay)
+        if "Parse and classify this bug report:" in contents:
+            return _StubResponse(json.dumps(stub_fused(contents.rsplit("Parse and classify this bug report:", 1)[1])), contents)
+        if "Parse this bug report:" in contents:
+            return _StubResponse(json.dumps(stub_intake(contents.rsplit("Parse this bug report:", 1)[1])), contents)
+        ticket_text = contents[contents.rfind("Title:"):]
+        return _StubResponse(json.dumps(stub_labels(ticket_text)), contents)
+
+
+class ScriptedGenAIClient:
+    """Stand-in for ``genai.Client`` that replays queued response texts.
+
+    Records each request's ``contents`` and ``config`` in ``requests``.
+    """
+
+    def __init__(self, responses: list[str]):
+        self.responses = list(responses)
+        self.requests: list[tuple[str, object]] = []
+        self.models = _ScriptedModels(self)
+        self.aio = _StubAio(self)
+        self.aio.models = _ScriptedAsyncModels(self)
+
+    def _next(self, contents: str, config) -> _StubResponse:
+        self.requests.append((contents, config))
+        return _StubResponse(self.responses.pop(0), contents)
+
+
+class _ScriptedModels:
+    def __init__(self, owner: ScriptedGenAIClient):
+        self._owner = owner
+
+    def generate_content(self, model: str, contents: str, config=None, **kwargs) -> _StubResponse:
+        return self._owner._next(contents, config)
+
+
+class _ScriptedAsyncModels(_ScriptedModels):
+    async def generate_content(self, model: str, contents: str, config=None, **kwargs) -> _StubResponse:
+        return self._owner._next(contents, config)
+
+
+def stub_intake(raw: str) -> dict:
+    """Deterministic ParsedTicket payload for a raw report."""
+    raw = raw.strip()
+    words = _TOKEN_RE.findall(raw.lower())
+    if len(words) < 4:
+        return {
+            "title": "",
+            "description": "",
+            "is_valid": False,
+            "clarification_reason": "Please describe what is broken and where.",
+        }
+    component = next((w for w in words if w in _SKILLS_VOCAB), None)
+    first_sentence = re.split(r"(?<=[.!?])\s", raw, maxsplit=1)[0]
+    return {
+        "title": first_sentence[:200],
+        "description": raw,
+        "component": component,
+        "is_valid": True,
+    }
+
+
+def stub_fused(raw: str) -> dict:
+    """Deterministic FusedTicket payload: stub_intake plus stub_labels."""
+    parsed = stub_intake(raw)
+    labeled = None
+    if parsed["is_valid"]:
+        labeled = stub_labels(f"Title: {parsed['title']}\nDescription: {parsed['description']}")
+    return {"parsed": parsed, "labeled": labeled}
+
+
+def stub_labels(ticket_text: str) -> dict:
+    """Deterministic LabeledTicket payload for a parsed ticket."""
+    lowered = ticket_text.lower()
+    words = set(_TOKEN_RE.findall(lowered))
+    if any(p in lowered for p in _FEATURE_PHRASES):
+        severity, priority, issue_type = "low", "P3", "feature_request"
+    elif words & _CRITICAL_WORDS:
+        severity, priority, issue_type = "critical", "P0", "incident"
+    else:
+        severity, priority, issue_type = "high", "P1", "bug"
+    return {
+        "severity": severity,
+        "priority": priority,
+        "issue_type": issue_type,
+        "labels": sorted(words & _SKILLS_VOCAB),
+        "confidence": 0.9,
+    }
+
+
+class FakeJira:
+    """Stand-in for ``create_jira_ticket``: records payloads, hands out sequential keys."""
+
+    def __init__(self):
+        self.created = []
+        self._lock = threading.Lock()
+
+    def create(self, payload: dict) -> JiraCreateResult:
+        with self._lock:
+            self.created.append(payload)
+            key = f"ENG-{len(self.created)}"
+        return JiraCreateResult(success=True, key=key, url=f"https://jira.example/browse/{key}")
+
+
+def patch_offline(stack, llm_delay: float = 0.0) -> StubGenAIClient:
+    """Stub the LLM client, embeddings and vector store for the life of ``stack``.
+
+    ``stack`` is a ``contextlib.ExitStack``. Response caching and the labeler
+    keyword rules are disabled so every LLM call reaches the stub, and the
+    seeded vector store lives in a temporary directory. Returns the stub client.
+    """
+    import tempfile
+    from unittest import mock
+    import agents.fused
+    import agents.intake
+    import agents.labeler
+    import agents.llm_cache
+    import agents.rules
+    from agents import dedup
+
+    client = StubGenAIClient(delay=llm_delay)
+    tmpdir = stack.enter_context(tempfile.TemporaryDirectory())
+    for module in (agents.intake, agents.labeler, agents.fused):
+        stack.enter_context(mock.patch.object(module, "client", client))
+    stack.enter_context(mock.patch.object(agents.llm_cache, "_cache", None))
+    stack.enter_context(mock.patch.object(agents.rules, "RULE_CONFIDENCE_THRESHOLD", None))
+    stack.enter_context(mock.patch.object(dedup, "_embedding_fn", HashEmbeddingFunction()))
+    stack.enter_context(mock.patch.object(dedup, "_default_persist_dir", lambda: tmpdir))
+    stack.callback(dedup.close_vector_store, tmpdir)
+    dedup.seed_vector_store(dedup.get_collection())
+    return client
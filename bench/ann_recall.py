@@ -0,0 +1,157 @@
+"""Dedup nearest-neighbour recall and latency: Chroma HNSW vs exact NumPy search.
+
+Builds a clustered synthetic corpus of unit vectors (tickets about the same
+area embed close together) and queries it with near-duplicates of stored
+tickets. For each corpus size and HNSW ef_search it reports:
+
+- top-1 recall: HNSW's nearest neighbour is the true (exact) one
+- duplicate recall: of queries whose true neighbour clears SIMILARITY_THRESHOLD,
+  the share HNSW also flags as duplicates (a miss here is a missed duplicate)
+- p50/p95 query latency, and index build time
+
+Usage: python -m bench.ann_recall [--sizes 10000,100000,1000000] [--queries N]
+                                  [--m M] [--ef-construction EF] [--ef-search 10,50,100,200]
+
+The 1M-vector HNSW build takes a long time and several GB of RAM.
+"""
+import argparse
+import multiprocessing
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from agents import dedup
+from agents.dedup import EMBEDDING_DIM, SIMILARITY_THRESHOLD, init_vector_store
+
+_UPSERT_CHUNK = 5000
+
+
+def synthetic_corpus(n: int, dim: int = EMBEDDING_DIM, cluster_size: int = 50, spread: float = 0.35,
+                     seed: int = 0, return_labels: bool = False):
+    """``n`` unit vectors in clusters of ~``cluster_size``; in-cluster cosine is roughly 0.9.
+
+    With ``return_labels`` also returns each vector's cluster index.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(max(1, n // cluster_size), dim)).astype(np.float32)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    labels = rng.integers(0, len(centroids), size=n)
+    vectors = centroids[labels] + rng.normal(scale=spread / np.sqrt(dim), size=(n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors, labels) if return_labels else vectors
+
+
+def near_duplicates(corpus: np.ndarray, n: int, noise: float = 0.25, seed: int = 1) -> np.ndarray:
+    """Perturbed copies of ``n`` random stored vectors (cosine to the source ~0.97)."""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(corpus), size=n, replace=False)
+    queries = corpus[picks] + rng.normal(scale=noise / np.sqrt(corpus.shape[1]), size=(n, corpus.shape[1]))
+    return (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _fill(collection, corpus: np.ndarray) -> float:
+    start = time.perf_counter()
+    for lo in range(0, len(corpus), _UPSERT_CHUNK):
+        chunk = corpus[lo:lo + _UPSERT_CHUNK]
+        collection.upsert(
+            ids=[f"T-{i}" for i in range(lo, lo + len(chunk))],
+            embeddings=chunk,
+            metadatas=[{"title": f"T-{i}"} for i in range(lo, lo + len(chunk))],
+        )
+    return time.perf_counter() - start
+
+
+def _run_queries(collection, queries: np.ndarray) -> tuple[list, list, list]:
+    """One query per ticket, like dedup_agent; returns (top ids, top similarities, seconds)."""
+    ids, sims, timings = [], [], []
+    for q in queries:
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[q], n_results=3, include=["metadatas", "distances"])
+        timings.append(time.perf_counter() - start)
+        ids.append(result["ids"][0][0])
+        sims.append(1 - result["distances"][0][0])
+    return ids, sims, timings
+
+
+def _summary(label: str, ids, sims, timings, truth_ids, truth_sims) -> dict:
+    ms = sorted(t * 1000 for t in timings)
+    true_dups = [i for i, s in enumerate(truth_sims) if s >= SIMILARITY_THRESHOLD]
+    found = [i for i in true_dups if sims[i] >= SIMILARITY_THRESHOLD]
+    return {
+        "index": label,
+        "top1_recall": round(sum(a == b for a, b in zip(ids, truth_ids)) / len(ids), 4),
+        "dup_recall": round(len(found) / len(true_dups), 4) if true_dups else None,
+        "true_duplicates": len(true_dups),
+        "p50_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+    }
+
+
+def _query_hnsw(persist_dir: str, ef_search: int, queries: np.ndarray) -> tuple[list, list, list]:
+    # Chroma reads ef_search when it loads the index, so each setting gets a fresh process
+    collection = init_vector_store(
+        persist_dir, "bench", embedding_function=_NoEmbedding(), index="hnsw", hnsw={"ef_search": ef_search}
+    )
+    return _run_queries(collection, queries)
+
+
+def benchmark(size: int, n_queries: int, ef_searches: list, m: int = None, ef_construction: int = None) -> list:
+    """Recall/latency rows for one corpus size: exact first, then HNSW per ef_search."""
+    corpus = synthetic_corpus(size)
+    queries = near_duplicates(corpus, min(n_queries, size))
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        exact = init_vector_store(tmpdir, "bench", index="exact")
+        build_s = _fill(exact, corpus)
+        truth_ids, truth_sims, timings = _run_queries(exact, queries)
+        rows.append(dict(_summary("exact", truth_ids, truth_sims, timings, truth_ids, truth_sims), build_s=round(build_s, 2)))
+        del exact
+
+        hnsw = {"m": m, "ef_construction": ef_construction}
+        collection = init_vector_store(tmpdir, "bench", embedding_function=_NoEmbedding(), index="hnsw", hnsw=hnsw)
+        build_s = _fill(collection, corpus)
+        del collection
+        dedup.close_vector_store(tmpdir)
+
+        for ef in ef_searches:
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                ids, sims, timings = pool.submit(_query_hnsw, tmpdir, ef, queries).result()
+            rows.append(dict(_summary(f"hnsw ef={ef}", ids, sims, timings, truth_ids, truth_sims), build_s=round(build_s, 2)))
+    return rows
+
+
+class _NoEmbedding:
+    """Placeholder embedding function: the benchmark always passes vectors."""
+
+    def __call__(self, input):
+        raise RuntimeError("benchmark passes precomputed embeddings")
+
+    @staticmethod
+    def name() -> str:
+        return "default"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--m", type=int, default=None, help="HNSW M (default HNSW_M)")
+    parser.add_argument("--ef-construction", type=int, default=None, help="Default HNSW_EF_CONSTRUCTION")
+    parser.add_argument("--ef-search", default="10,50,100,200")
+    args = parser.parse_args()
+    ef_searches = [int(x) for x in args.ef_search.split(",")]
+
+    print(f"Near-duplicate queries: {args.queries}, threshold {SIMILARITY_THRESHOLD}, "
+          f"M={args.m or dedup.HNSW_M}, ef_construction={args.ef_construction or dedup.HNSW_EF_CONSTRUCTION}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"\n{size:,} vectors")
+        for row in benchmark(size, args.queries, ef_searches, args.m, args.ef_construction):
+            print(f"  {row['index']:13s}: top-1 recall {row['top1_recall']:.4f}  "
+                  f"duplicate recall {row['dup_recall']} of {row['true_duplicates']}  "
+                  f"p50 {row['p50_ms']:7.3f} ms  p95 {row['p95_ms']:7.3f} ms  build {row['build_s']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Concurrent UI sessions: N users triage and file tickets at the same time.
+
+Each session streams a triage through ``app.process_ticket`` and then clicks
+"Create in Jira" with its own ``gr.State`` value, on a worker pool the size
+of the Gradio queue's concurrency limit. LLM calls, embeddings and the Jira
+API are stubbed. Reports throughput, latency, time to first output, and any
+session whose Jira click filed someone else's ticket.
+
+Usage: python -m bench.app_sessions [--sessions N] [--concurrency C] [--llm-delay S]
+"""
+import argparse
+import importlib
+import json
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from unittest import mock
+
+from bench._stubs import FakeJira, patch_offline
+
+_REPORTS = [
+    "The login button on the checkout page is unresponsive on Safari. Works on Chrome.",
+    "Stripe payments over $10,000 are timing out and customers aren't getting confirmation emails",
+    "CSV export from the analytics dashboard has no column headers since the last deploy",
+    "Password reset emails never arrive for users on the EU cluster",
+]
+
+
+def _report_text(i: int) -> str:
+    # Unique per session so a crossed payload is detectable
+    return f"{_REPORTS[i % len(_REPORTS)]} (session {i})"
+
+
+def _run_session(app, jira: FakeJira, i: int) -> dict:
+    """One user: stream a triage, then click "Create in Jira" with this session's state."""
+    start = time.perf_counter()
+    first_output_s, session, updates = None, None, 0
+    for outputs in app.process_ticket(_report_text(i), session):
+        if first_output_s is None:
+            first_output_s = time.perf_counter() - start
+        session = outputs[-1]
+        updates += 1
+    jira_message = app.create_in_jira(session)
+    latency_s = time.perf_counter() - start
+
+    # The payload Jira actually received for this click, looked up by issue key
+    key = re.search(r"ENG-(\d+)", jira_message)
+    filed = json.dumps(jira.created[int(key.group(1)) - 1]) if key else None
+    return {
+        "session": i,
+        "latency_s": latency_s,
+        "first_output_s": first_output_s,
+        "updates": updates,
+        "filed": filed,
+    }
+
+
+def patched_app(stack: ExitStack, llm_delay: float = 0.0):
+    """Import ``app`` with LLM, embeddings, vector store and Jira stubbed; returns (app, fake Jira)."""
+    patch_offline(stack, llm_delay)
+    jira = FakeJira()
+    app = importlib.import_module("app")
+    stack.enter_context(mock.patch.object(app, "create_jira_ticket", jira.create))
+    stack.enter_context(mock.patch.object(app, "index_created_ticket", lambda *args: None))
+    return app, jira
+
+
+def run_sessions(app, jira: FakeJira, sessions: int, concurrency: int) -> dict:
+    """Drive ``sessions`` users through ``concurrency`` workers; returns a summary."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: _run_session(app, jira, i), range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(r["latency_s"] for r in results)
+    crossed = [
+        r["session"] for r in results
+        if r["filed"] is not None and f"(session {r['session']})" not in r["filed"]
+    ]
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(sessions / elapsed, 2),
+        "p50_latency_s": round(statistics.median(latencies), 3),
+        "p95_latency_s": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        "mean_first_output_s": round(statistics.mean(r["first_output_s"] for r in results), 3),
+        "filed": sum(1 for r in results if r["filed"] is not None),
+        "crossed_sessions": crossed,
+    }
+
+
+def _print(summary: dict):
+    print(f"  concurrency {summary['concurrency']:3d}: {summary['throughput_per_s']:7.2f} sessions/s  "
+          f"p50 {summary['p50_latency_s']:.3f}s  p95 {summary['p95_latency_s']:.3f}s  "
+          f"first output {summary['mean_first_output_s']:.3f}s  "
+          f"filed {summary['filed']}/{summary['sessions']}  crossed {len(summary['crossed_sessions'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=None, help="Defaults to APP_CONCURRENCY")
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="Seconds per stubbed LLM call")
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        app, jira = patched_app(stack, args.llm_delay)
+        concurrency = args.concurrency or app.APP_CONCURRENCY
+        print(f"{args.sessions} sessions, {args.llm_delay}s per LLM call (stubbed)")
+        # Before: the global payload forced a single worker
+        _print(run_sessions(app, jira, args.sessions, 1))
+        _print(run_sessions(app, jira, args.sessions, concurrency))
+        print(f"  Jira tickets created: {len(jira.created)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Bulk import throughput: docs/sec and peak memory per embedding worker count.
+
+Writes ``--size`` synthetic tickets to a JSON Lines file and imports it
+into a fresh store with ``agents.importer.import_files`` once per
+``--workers`` setting. Peak RSS shows the import streams: it stays flat
+as the file grows instead of holding the whole export in memory.
+
+Usage: python -m bench.bulk_import [--size 50000] [--workers 0,2,4] [--index hnsw|exact]
+
+The stub embedding is nearly free, so these numbers are dominated by
+parsing and upserts; with the real model, embedding dominates and extra
+workers help up to the number of cores.
+"""
+import argparse
+import json
+import os
+import resource
+import tempfile
+
+from agents import dedup
+from agents.dedup import init_vector_store
+from agents.importer import import_files
+from bench._stubs import HashEmbeddingFunction
+from bench.hybrid_dedup import synthetic_tickets
+
+
+def write_export(path: str, size: int):
+    with open(path, "w") as f:
+        for id_, title, description in synthetic_tickets(size):
+            f.write(json.dumps({"id": id_, "title": title, "description": description, "component": "checkout"}) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--workers", default="0,2,4")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--chunk-size", type=int, default=2048)
+    parser.add_argument("--index", default=dedup.DEDUP_INDEX, choices=dedup.DEDUP_INDEXES)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "export.jsonl")
+        write_export(path, args.size)
+        print(f"{args.size:,} tickets ({os.path.getsize(path) / 1e6:.1f} MB), {os.cpu_count()} CPUs, {args.index} index")
+        for workers in (int(w) for w in args.workers.split(",")):
+            collection = init_vector_store(
+                os.path.join(tmpdir, f"store-{workers}"), "bulk", HashEmbeddingFunction(), index=args.index
+            )
+            stats = import_files(
+                [path], collection, batch_size=args.batch_size, chunk_size=args.chunk_size,
+                workers=workers, embedding_function=HashEmbeddingFunction(),
+            )
+            peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"  workers={workers}: {stats['imported']:,} in {stats['seconds']:.1f}s "
+                  f"= {stats['docs_per_s']:.0f} docs/s, peak RSS {peak_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
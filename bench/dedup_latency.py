@@ -0,0 +1,72 @@
+"""Per-ticket dedup latency: reopening the store per ticket vs the pooled handle.
+
+Usage: python -m bench.dedup_latency [--tickets N]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from unittest import mock
+
+from agents import dedup
+from bench._stubs import HashEmbeddingFunction
+from schema.ticket import ParsedTicket
+
+_QUERIES = [
+    ("Checkout button dead on Safari", "Clicking pay on the checkout page does nothing in Safari 17."),
+    ("CSV export missing headers", "The analytics CSV export has no column headers since the last deploy."),
+    ("Password reset email never arrives", "Users requesting a reset link never receive the email."),
+    ("Dashboard charts render blank", "All charts on the main dashboard are empty for EU customers."),
+]
+
+
+def _state(i: int) -> dict:
+    title, description = _QUERIES[i % len(_QUERIES)]
+    return {
+        "parsed_ticket": ParsedTicket(title=title, description=description, is_valid=True),
+        "trace": [],
+    }
+
+
+def _time_dedup(n: int, before_each=None) -> list[float]:
+    timings = []
+    for i in range(n):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        dedup.dedup_agent(_state(i))
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(label: str, timings: list[float]):
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"  {label:10s}: mean {statistics.mean(ms):7.2f} ms  p50 {statistics.median(ms):7.2f} ms  p95 {p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=200)
+    args = parser.parse_args()
+
+    embedding_fn = HashEmbeddingFunction()
+    with tempfile.TemporaryDirectory() as tmpdir, \
+            mock.patch.object(dedup, "_embedding_fn", embedding_fn), \
+            mock.patch.object(dedup, "_default_persist_dir", lambda: tmpdir):
+        dedup.seed_vector_store(dedup.get_collection())
+
+        print(f"Dedup latency over {args.tickets} tickets (stubbed embeddings)")
+        # Before: every ticket opened its own client + collection
+        before = _time_dedup(args.tickets, before_each=dedup.close_vector_store)
+        _report("reopen", before)
+        # After: one pooled handle reused across tickets
+        dedup.get_collection()
+        after = _time_dedup(args.tickets)
+        _report("pooled", after)
+        print(f"  speedup   : {statistics.mean(before) / statistics.mean(after):.1f}x")
+        dedup.close_vector_store()
+
+
+if __name__ == "__main__":
+    main()
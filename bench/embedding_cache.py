@@ -0,0 +1,72 @@
+"""First-ticket latency with/without warm-up, and embedding cache hit ratio.
+
+The stub model sleeps ``--load-s`` on first use (model load) and
+``--embed-ms`` per call, standing in for all-MiniLM-L6-v2 on CPU.
+
+Usage: python -m bench.embedding_cache [--tickets N] [--repeat-ratio R]
+"""
+import argparse
+import random
+import time
+
+from agents.embeddings import CachedEmbeddingFunction
+from bench._stubs import HashEmbeddingFunction
+
+
+class SlowModel(HashEmbeddingFunction):
+    def __init__(self, load_s: float, embed_ms: float):
+        super().__init__()
+        self.load_s = load_s
+        self.embed_ms = embed_ms
+        self.loaded = False
+
+    def __call__(self, input):
+        if not self.loaded:
+            time.sleep(self.load_s)
+            self.loaded = True
+        time.sleep(self.embed_ms / 1000)
+        return super().__call__(input)
+
+
+def _first_ticket_ms(fn) -> float:
+    start = time.perf_counter()
+    fn(["Checkout button dead on Safari. Clicking pay does nothing."])
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=500)
+    parser.add_argument("--repeat-ratio", type=float, default=0.3, help="Share of re-pasted reports")
+    parser.add_argument("--load-s", type=float, default=1.5)
+    parser.add_argument("--embed-ms", type=float, default=8.0)
+    args = parser.parse_args()
+
+    cold = CachedEmbeddingFunction(SlowModel(args.load_s, args.embed_ms))
+    print(f"First ticket, no warm-up : {_first_ticket_ms(cold):8.1f} ms")
+
+    warm = CachedEmbeddingFunction(SlowModel(args.load_s, args.embed_ms))
+    warm.warm_up()
+    print(f"First ticket, warmed up  : {_first_ticket_ms(warm):8.1f} ms")
+
+    rng = random.Random(0)
+    seen = []
+    fn = CachedEmbeddingFunction(SlowModel(0, args.embed_ms))
+    start = time.perf_counter()
+    for i in range(args.tickets):
+        if seen and rng.random() < args.repeat_ratio:
+            text = rng.choice(seen)
+        else:
+            text = f"Ticket {i}: checkout fails with error code {rng.randint(0, 10**6)}"
+            seen.append(text)
+        fn([text])
+    elapsed = time.perf_counter() - start
+    stats = fn.stats()
+    print(f"\n{args.tickets} tickets, {args.repeat_ratio:.0%} repeats")
+    print(f"  hit ratio        : {stats['hit_ratio']*100:.1f}%")
+    print(f"  model call       : {stats['avg_embed_ms']:.2f} ms")
+    print(f"  embed per ticket : {1000 * elapsed / args.tickets:.2f} ms (uncached: ~{args.embed_ms:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Dedup latency and duplicate recall: vector-only vs lexical-first hybrid.
+
+Fills a store with synthetic tickets, then runs dedup_agent on a mix of
+near-verbatim re-submissions (a typo, two swapped words, or an appended
+"still happening" line) and novel tickets, twice: with the lexical stage
+off (every ticket is embedded and queried) and on (LEXICAL_DUP_THRESHOLD).
+For each it reports p50/p95 per-ticket latency, duplicate recall over the
+re-submissions, false duplicates over the novel tickets, and how many
+tickets skipped the embedding.
+
+Usage: python -m bench.hybrid_dedup [--size 100000] [--queries 1000] [--index hnsw|exact]
+
+The bag-of-words stub embedding costs microseconds; a real MiniLM encode
+on CPU costs several milliseconds per ticket, so the saving for each
+lexical hit is larger in production than it is here.
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from agents import dedup
+from agents.dedup import dedup_agent, get_collection, get_lexical_index, ticket_document
+from bench._stubs import HashEmbeddingFunction
+from schema.ticket import ParsedTicket
+
+_UPSERT_CHUNK = 5000
+_COMPONENTS = ["checkout", "login", "search", "billing", "upload", "dashboard", "export", "notifications"]
+_SYMPTOMS = ["fails", "times out", "returns 500", "hangs", "shows a blank page", "crashes", "is very slow"]
+_FOLLOW_UPS = ["Still happening today.", "Any update on this?", "Seeing it again after the deploy."]
+
+
+def _vocabulary(size: int = 3000, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def synthetic_tickets(n: int, seed: int = 0) -> list:
+    """``n`` (id, title, description) tickets; descriptions are ~30 words of random vocabulary."""
+    rng = random.Random(seed)
+    words = _vocabulary()
+    tickets = []
+    for i in range(n):
+        component = rng.choice(_COMPONENTS)
+        title = f"{component.capitalize()} {rng.choice(_SYMPTOMS)} for {rng.choice(words)} users"
+        description = " ".join(rng.choice(words) for _ in range(rng.randint(25, 40)))
+        tickets.append((f"SYN-{i}", title, f"When opening {component}, {description}."))
+    return tickets
+
+
+def resubmit(title: str, description: str, rng: random.Random) -> tuple:
+    """A near-verbatim copy of a ticket: one typo, two swapped words, or a follow-up line."""
+    words = description.split()
+    edit = rng.choice(["typo", "swap", "append"])
+    if edit == "typo":
+        i = rng.randrange(len(words))
+        words[i] = words[i][:-1] + ("x" if words[i][-1] != "x" else "y")
+    elif edit == "swap":
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    else:
+        words.append(rng.choice(_FOLLOW_UPS))
+    return title, " ".join(words)
+
+
+def _queries(tickets: list, n: int, seed: int = 1) -> list:
+    """Half re-submissions of stored tickets (expected duplicate id), half novel tickets (None)."""
+    rng = random.Random(seed)
+    picks = rng.sample(tickets, n // 2)
+    duplicates = [(resubmit(title, description, rng), id_) for id_, title, description in picks]
+    novel = [((title, description), None) for _, title, description in synthetic_tickets(n - n // 2, seed=seed + 1)]
+    queries = duplicates + novel
+    rng.shuffle(queries)
+    return queries
+
+
+def _fill(tickets: list) -> float:
+    start = time.perf_counter()
+    collection = get_collection()
+    for lo in range(0, len(tickets), _UPSERT_CHUNK):
+        chunk = tickets[lo:lo + _UPSERT_CHUNK]
+        documents = [ticket_document(title, description) for _, title, description in chunk]
+        collection.upsert(
+            ids=[id_ for id_, _, _ in chunk],
+            documents=documents,
+            metadatas=[{"title": title} for _, title, _ in chunk],
+            embeddings=dedup.embed_texts(documents),
+        )
+    return time.perf_counter() - start
+
+
+def _run(queries: list, threshold) -> dict:
+    with patch.object(dedup, "LEXICAL_DUP_THRESHOLD", threshold):
+        timings, found, false_dups, skipped = [], 0, 0, 0
+        for (title, description), expected in queries:
+            state = {"parsed_ticket": ParsedTicket(title=title, description=description, is_valid=True)}
+            start = time.perf_counter()
+            update = dedup_agent(state)
+            timings.append(time.perf_counter() - start)
+            result = update["dedup_result"]
+            skipped += "embedding skipped" in update["trace"][0]
+            if expected is None:
+                false_dups += result.is_duplicate
+            else:
+                found += result.is_duplicate and result.similar_ticket_id == expected
+    ms = sorted(t * 1000 for t in timings)
+    expected_dups = sum(expected is not None for _, expected in queries)
+    return {
+        "p50_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "dup_recall": round(found / expected_dups, 4),
+        "false_dups": false_dups,
+        "embeddings_skipped": skipped,
+    }
+
+
+def benchmark(size: int, n_queries: int, index: str) -> dict:
+    tickets = synthetic_tickets(size)
+    queries = _queries(tickets, n_queries)
+    with ExitStack() as stack, tempfile.TemporaryDirectory() as tmpdir:
+        stack.enter_context(patch.object(dedup, "_embedding_fn", HashEmbeddingFunction()))
+        stack.enter_context(patch.object(dedup, "_default_persist_dir", lambda: tmpdir))
+        stack.enter_context(patch.object(dedup, "DEDUP_INDEX", index))
+        try:
+            fill_s = _fill(tickets)
+            start = time.perf_counter()
+            get_lexical_index()
+            lexical_build_s = time.perf_counter() - start
+            return {
+                "fill_s": round(fill_s, 2),
+                "lexical_build_s": round(lexical_build_s, 2),
+                "vector": _run(queries, None),
+                "hybrid": _run(queries, dedup.LEXICAL_DUP_THRESHOLD or 0.8),
+            }
+        finally:
+            dedup.close_vector_store(tmpdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--index", default=dedup.DEDUP_INDEX, choices=dedup.DEDUP_INDEXES)
+    args = parser.parse_args()
+
+    result = benchmark(args.size, args.queries, args.index)
+    print(f"{args.size:,} tickets ({args.index}), {args.queries} queries (half re-submissions)")
+    print(f"  store fill {result['fill_s']}s, lexical index build {result['lexical_build_s']}s")
+    for label in ("vector", "hybrid"):
+        row = result[label]
+        print(f"  {label:6s}: p50 {row['p50_ms']:7.3f} ms  p95 {row['p95_ms']:7.3f} ms  "
+              f"duplicate recall {row['dup_recall']:.4f}  false duplicates {row['false_dups']}  "
+              f"embeddings skipped {row['embeddings_skipped']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Dedup store memory, latency and recall: Chroma HNSW vs exact vs quantized.
+
+Fills one store per backend with the same clustered synthetic corpus as
+``bench.ann_recall``, then opens each in a fresh process and queries it with
+near-duplicates of stored tickets. Per backend it reports:
+
+- resident memory added by opening and querying the store, split into
+  anonymous memory (heap: matrices, graphs, id maps) and file-backed pages
+  (memory-mapped files). File-backed pages are page cache the OS can drop
+  and re-read; the kernel maps cached pages around each row a query reads,
+  so this figure approaches the file size as queries touch more rows.
+- size on disk
+- p50/p95 query latency
+- top-1 recall and duplicate recall at SIMILARITY_THRESHOLD against exact search
+
+Usage: python -m bench.quantized_store [--sizes 100000] [--queries N]
+                                       [--indexes hnsw,exact,int8,binary]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from agents import dedup
+from agents.dedup import SIMILARITY_THRESHOLD, init_vector_store
+from bench.ann_recall import _NoEmbedding, _fill, _run_queries, _summary, near_duplicates, synthetic_corpus
+
+
+def _rss_mb() -> dict:
+    """Current anonymous and file-backed resident memory of this process, in MB."""
+    rss = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                key, kb = line.split()[:2]
+                rss[key.rstrip(":")] = int(kb) / 1024
+    return rss
+
+
+def _disk_mb(path: str) -> float:
+    return sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names
+    ) / 1e6
+
+
+def _measure(persist_dir: str, index: str, queries: np.ndarray) -> dict:
+    """Open a store in this (fresh) process, query it and report what it cost."""
+    before = _rss_mb()
+    collection = init_vector_store(persist_dir, "bench", embedding_function=_NoEmbedding(), index=index)
+    ids, sims, timings = _run_queries(collection, queries)
+    after = _rss_mb()
+    return {
+        "ids": ids, "sims": sims, "timings": timings,
+        "anon_mb": after["RssAnon"] - before["RssAnon"],
+        "file_mb": after["RssFile"] - before["RssFile"],
+    }
+
+
+def benchmark(size: int, n_queries: int, indexes: list) -> list:
+    corpus = synthetic_corpus(size)
+    queries = near_duplicates(corpus, min(n_queries, size))
+    similarities = queries @ corpus.T
+    best = similarities.argmax(axis=1)
+    truth_ids = [f"T-{i}" for i in best]
+    truth_sims = list(similarities[np.arange(len(best)), best])
+    del similarities
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for index in indexes:
+            persist_dir = os.path.join(tmpdir, index)
+            collection = init_vector_store(persist_dir, "bench", embedding_function=_NoEmbedding(), index=index)
+            build_s = _fill(collection, corpus)
+            del collection
+            dedup.close_vector_store(persist_dir)
+            # A fresh process per backend, so memory is not shared with the fill
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                measured = pool.submit(_measure, persist_dir, index, queries).result()
+            summary = _summary(index, measured["ids"], measured["sims"], measured["timings"], truth_ids, truth_sims)
+            rows.append(dict(
+                summary,
+                build_s=round(build_s, 1),
+                anon_mb=round(measured["anon_mb"], 1),
+                file_mb=round(measured["file_mb"], 1),
+                disk_mb=round(_disk_mb(persist_dir), 1),
+            ))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100000")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--indexes", default=",".join(dedup.DEDUP_INDEXES))
+    args = parser.parse_args()
+
+    print(f"{args.queries} near-duplicate queries, threshold {SIMILARITY_THRESHOLD}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"\n{size:,} vectors")
+        for row in benchmark(size, args.queries, args.indexes.split(",")):
+            print(f"  {row['index']:6s}: heap +{row['anon_mb']:6.1f} MB  mapped +{row['file_mb']:6.1f} MB  "
+                  f"disk {row['disk_mb']:6.1f} MB  p50 {row['p50_ms']:7.3f} ms  p95 {row['p95_ms']:7.3f} ms  "
+                  f"top-1 recall {row['top1_recall']:.4f}  duplicate recall {row['dup_recall']} "
+                  f"of {row['true_duplicates']}  build {row['build_s']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Dedup query latency by corpus size: global vs component-scoped search.
+
+Fills a store with clustered synthetic vectors, each cluster belonging to
+one of ``--components`` components, and partitions it per component. Then
+queries near-duplicates of stored tickets under each DEDUP_SCOPE:
+
+- global: the whole collection
+- component: the whole collection with a ``where`` filter on the component
+- partition: the component's own collection
+
+and reports p50/p95 latency and how often the top hit agrees with the
+global search (a disagreement is a nearest neighbour from another area).
+
+Usage: python -m bench.scoped_dedup [--sizes 10000,100000] [--queries N]
+                                    [--components N] [--index hnsw|exact]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+import numpy as np
+
+from agents import dedup
+from agents.dedup import dedup_scope, get_collection, upsert_tickets
+from bench.ann_recall import _NoEmbedding, synthetic_corpus
+
+_UPSERT_CHUNK = 5000
+
+
+def _fill(corpus: np.ndarray, components: list) -> float:
+    start = time.perf_counter()
+    collection = get_collection()
+    for lo in range(0, len(corpus), _UPSERT_CHUNK):
+        hi = min(lo + _UPSERT_CHUNK, len(corpus))
+        upsert_tickets(
+            collection,
+            ids=[f"T-{i}" for i in range(lo, hi)],
+            documents=[f"ticket {i}" for i in range(lo, hi)],
+            metadatas=[{"title": f"T-{i}", "component": components[i]} for i in range(lo, hi)],
+            embeddings=corpus[lo:hi],
+        )
+    return time.perf_counter() - start
+
+
+def _run(queries: np.ndarray, components: list, scope: str) -> tuple[list, list]:
+    ids, timings = [], []
+    with patch.object(dedup, "DEDUP_SCOPE", scope):
+        for component in set(components):
+            dedup_scope(component)  # Open partitions before timing
+        for q, component in zip(queries, components):
+            start = time.perf_counter()
+            collection, where = dedup_scope(component)
+            result = collection.query(query_embeddings=[q], n_results=3, where=where, include=["distances"])
+            timings.append(time.perf_counter() - start)
+            ids.append(result["ids"][0][0] if result["ids"][0] else None)
+    return ids, timings
+
+
+def benchmark(size: int, n_queries: int, n_components: int, index: str) -> list:
+    corpus, labels = synthetic_corpus(size, return_labels=True)
+    components = [f"area{label % n_components}" for label in labels]
+    rng = np.random.default_rng(1)
+    picks = rng.choice(size, size=min(n_queries, size), replace=False)
+    queries = corpus[picks] + rng.normal(scale=0.25 / np.sqrt(corpus.shape[1]), size=(len(picks), corpus.shape[1]))
+    query_components = [components[i] for i in picks]
+
+    rows = []
+    with ExitStack() as stack, tempfile.TemporaryDirectory() as tmpdir:
+        stack.enter_context(patch.object(dedup, "_embedding_fn", _NoEmbedding()))
+        stack.enter_context(patch.object(dedup, "_default_persist_dir", lambda: tmpdir))
+        stack.enter_context(patch.object(dedup, "DEDUP_INDEX", index))
+        stack.enter_context(patch.object(dedup, "DEDUP_SCOPE", "partition"))
+        try:
+            fill_s = _fill(corpus, components)
+            global_ids = None
+            for scope in dedup.DEDUP_SCOPES:
+                ids, timings = _run(queries, query_components, scope)
+                global_ids = global_ids or ids
+                ms = sorted(t * 1000 for t in timings)
+                rows.append({
+                    "scope": scope,
+                    "p50_ms": round(statistics.median(ms), 3),
+                    "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+                    "agreement": round(sum(a == b for a, b in zip(ids, global_ids)) / len(ids), 4),
+                    "fill_s": round(fill_s, 2),
+                })
+        finally:
+            dedup.close_vector_store(tmpdir)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--components", type=int, default=24)
+    parser.add_argument("--index", default=dedup.DEDUP_INDEX, choices=dedup.DEDUP_INDEXES)
+    args = parser.parse_args()
+
+    print(f"{args.queries} near-duplicate queries, {args.components} components, {args.index} index")
+    for size in (int(s) for s in args.sizes.split(",")):
+        rows = benchmark(size, args.queries, args.components, args.index)
+        print(f"\n{size:,} tickets (fill incl. partitions {rows[0]['fill_s']}s)")
+        for row in rows:
+            print(f"  {row['scope']:9s}: p50 {row['p50_ms']:7.3f} ms  p95 {row['p95_ms']:7.3f} ms  "
+                  f"top-1 agrees with global {row['agreement']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Load test for the headless HTTP service (service.py) with stubbed LLM and embeddings.
+
+Starts the service in-process on a free port and fires N concurrent
+``POST /triage`` requests from C client threads. Reports throughput, latency
+of accepted requests and how many were shed with 429 or timed out with 504.
+
+Usage: python -m bench.service_load [--requests N] [--clients C] [--workers W]
+                                    [--max-queue Q] [--timeout S] [--llm-delay S]
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from unittest import mock
+
+import service
+from bench._stubs import FakeJira, patch_offline
+
+_REPORTS = [
+    "The login button on the checkout page is unresponsive on Safari. Works on Chrome.",
+    "Stripe payments over $10,000 are timing out and customers aren't getting confirmation emails",
+    "CSV export from the analytics dashboard has no column headers since the last deploy",
+    "it's broken",
+]
+
+
+def post(url: str, body: dict, timeout: float = 120) -> tuple[int, dict]:
+    """POST JSON and return (status, decoded body), including error statuses."""
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def serve_offline(stack: ExitStack, llm_delay: float = 0.0, **service_kwargs):
+    """Start the service on a free local port with everything external stubbed.
+
+    Returns (base URL, server, fake Jira); shut down when ``stack`` closes.
+    """
+    patch_offline(stack, llm_delay)
+    jira = FakeJira()
+    stack.enter_context(mock.patch.object(service, "create_jira_ticket", jira.create))
+    stack.enter_context(mock.patch.object(service, "index_created_ticket", lambda *args: None))
+
+    server = service.make_server("127.0.0.1", 0, service.TriageService(**service_kwargs))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stack.callback(server.service.close)
+    stack.callback(server.server_close)
+    stack.callback(server.shutdown)
+    return f"http://127.0.0.1:{server.server_port}", server, jira
+
+
+def run_load(base_url: str, requests: int, clients: int) -> dict:
+    """Fire ``requests`` triage POSTs from ``clients`` threads; returns a summary."""
+    def one(i: int):
+        start = time.perf_counter()
+        status, _ = post(f"{base_url}/triage", {"text": _REPORTS[i % len(_REPORTS)]})
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    statuses = Counter(status for status, _ in results)
+    ok = sorted(latency for status, latency in results if status == 200)
+    return {
+        "requests": requests,
+        "clients": clients,
+        "elapsed_s": round(elapsed, 3),
+        "statuses": dict(sorted(statuses.items())),
+        "completed_per_s": round(len(ok) / elapsed, 2),
+        "p50_latency_s": round(statistics.median(ok), 3) if ok else None,
+        "p95_latency_s": round(ok[min(len(ok) - 1, int(len(ok) * 0.95))], 3) if ok else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=service.SERVICE_WORKERS)
+    parser.add_argument("--max-queue", type=int, default=service.SERVICE_MAX_QUEUE)
+    parser.add_argument("--timeout", type=float, default=service.SERVICE_TIMEOUT_S)
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="Seconds per stubbed LLM call")
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        base_url, _, _ = serve_offline(
+            stack, args.llm_delay, workers=args.workers, max_queue=args.max_queue, timeout_s=args.timeout
+        )
+        summary = run_load(base_url, args.requests, args.clients)
+        print(f"{summary['requests']} requests from {summary['clients']} clients -> "
+              f"{args.workers} workers, queue {args.max_queue}, {args.llm_delay}s per LLM call (stubbed)")
+        print(f"  statuses   : {summary['statuses']}")
+        print(f"  throughput : {summary['completed_per_s']} completed/s over {summary['elapsed_s']}s")
+        print(f"  latency    : p50 {summary['p50_latency_s']}s  p95 {summary['p95_latency_s']}s (200s only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Response size and failure/retry rate: fence stripping vs structured output.
+
+Replays bench/fixtures/labeler_responses.jsonl, which pairs each ticket
+with the text an unconstrained labeler call returns (``legacy``) and the
+text returned with the JSON response schema (``structured``, plus the
+answer to a field repair prompt where one is needed).
+
+Legacy: strip code fences and validate; a failure is a dead ticket, and
+retrying means resending the full system prompt. Structured: validate
+field by field and re-ask only the failing fields with a compact prompt.
+
+Usage: python -m bench.structured_output
+"""
+import json
+import os
+
+from pydantic import ValidationError
+
+from agents import structured
+from agents.labeler import _labeler_contents
+from agents.structured import generate_structured, strip_code_fences
+from bench._stubs import ScriptedGenAIClient
+from schema.ticket import LabeledTicket
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "labeler_responses.jsonl")
+
+
+def load_fixtures(path: str = FIXTURES) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def legacy_replay(fixtures: list[dict]) -> dict:
+    failures = 0
+    retry_bytes = 0
+    for fx in fixtures:
+        try:
+            LabeledTicket.model_validate_json(strip_code_fences(fx["legacy"]))
+        except ValidationError:
+            failures += 1
+            retry_bytes += len(_labeler_contents(fx["ticket"]))
+    return {
+        "avg_response_bytes": sum(len(fx["legacy"]) for fx in fixtures) / len(fixtures),
+        "retries": failures,
+        "failures": failures,
+        "avg_retry_request_bytes": retry_bytes / failures if failures else 0.0,
+    }
+
+
+def structured_replay(fixtures: list[dict]) -> dict:
+    structured.stats.reset()
+    failures = 0
+    repair_bytes = []
+    for fx in fixtures:
+        client = ScriptedGenAIClient([fx["structured"]] + ([fx["repair"]] if fx["repair"] else []))
+        try:
+            generate_structured(client, LabeledTicket, _labeler_contents(fx["ticket"]), context=fx["ticket"])
+        except (ValidationError, ValueError):
+            failures += 1
+        repair_bytes += [len(contents) for contents, _ in client.requests[1:]]
+    stats = structured.stats.stats()
+    return {
+        "avg_response_bytes": stats["avg_response_bytes"],
+        "retries": sum(1 for fx in fixtures if fx["repair"]),
+        "failures": failures,
+        "avg_retry_request_bytes": sum(repair_bytes) / len(repair_bytes) if repair_bytes else 0.0,
+    }
+
+
+def main():
+    fixtures = load_fixtures()
+    rows = [("fence stripping", legacy_replay(fixtures)), ("structured output", structured_replay(fixtures))]
+    print(f"{len(fixtures)} replayed labeler responses\n")
+    print(f"{'':20s}{'resp bytes':>12s}{'retries':>10s}{'dead':>8s}{'retry req bytes':>18s}")
+    for name, r in rows:
+        print(
+            f"{name:20s}{r['avg_response_bytes']:12.1f}{r['retries']:10d}"
+            f"{r['failures']:8d}{r['avg_retry_request_bytes']:18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import json
 import os
 
 _TEST_CASES_PATH = os.path.join(os.path.dirname(__file__), "test_cases.json")
+# Cases kept out of tuning: local rules and classifiers are written or trained from test_cases.json
+HOLDOUT_CASES_PATH = os.path.join(os.path.dirname(__file__), "holdout_cases.json")
 
 
 def load_test_cases(path: str = None) -> list:
@@ -1,3 +1,13 @@
+import math
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
 def compute_metrics(results: list) -> dict:
     """Compute per-dimension accuracy metrics from eval results."""
     dimensions = [
@@ -32,6 +42,57 @@ def compute_metrics(results: list) -> dict:
         sum(r["latency_s"] for r in results) / len(results), 2
     ) if results else 0.0
 
+    # Speculative labeling accounting (only present in speculative runs)
+    speculated = [r["speculation"] for r in results if r.get("speculation")]
+    if speculated:
+        saved = sum(s.get("saved_s", 0.0) for s in speculated)
+        metrics["speculation"] = {
+            "tickets": len(speculated),
+            "latency_saved_s": round(saved, 3),
+            "avg_latency_saved_s": round(saved / len(speculated), 3),
+            "discarded_labels": sum(1 for s in speculated if s.get("discarded")),
+            "wasted_labeler_s": round(sum(s.get("wasted_s", 0.0) for s in speculated), 3),
+        }
+
+    # Fused-mode fallbacks to the two-step path
+    fused = [r for r in results if r.get("mode") == "fused"]
+    if fused:
+        fallbacks = sum(1 for r in fused if r.get("fused_fallback"))
+        metrics["fused"] = {
+            "tickets": len(fused),
+            "fallbacks": fallbacks,
+            "fallback_rate": round(fallbacks / len(fused), 3),
+        }
+
+    # Vagueness gate: intake calls skipped, and any valid tickets it wrongly stopped
+    gated = [r for r in results if "gate_short_circuit" in r]
+    if gated:
+        stopped = [r for r in gated if r["gate_short_circuit"]]
+        metrics["gate"] = {
+            "tickets": len(gated),
+            "short_circuited": len(stopped),
+            "llm_calls_saved": len(stopped),
+            "false_positives": sum(
+                1 for r in stopped if r.get("expected_decision") != "needs_clarification"
+            ),
+        }
+
+    # Per-node latency percentiles from telemetry spans
+    node_times = {}
+    for r in results:
+        for node, seconds in r.get("node_latency_s", {}).items():
+            node_times.setdefault(node, []).append(seconds)
+    if node_times:
+        metrics["node_latency"] = {
+            node: {
+                "count": len(times),
+                "p50_s": round(percentile(times, 50), 4),
+                "p95_s": round(percentile(times, 95), 4),
+                "p99_s": round(percentile(times, 99), 4),
+            }
+            for node, times in node_times.items()
+        }
+
     # Per-category breakdown
     categories = set(r["category"] for r in results)
     metrics["by_category"] = {}
@@ -55,6 +116,30 @@ def print_report(metrics: dict, results: list):
     print(f"\nOverall pass rate: {metrics['overall_pass_rate']*100:.1f}%")
     print(f"Average latency: {metrics['avg_latency_s']}s")
 
+    if "speculation" in metrics:
+        spec = metrics["speculation"]
+        print(
+            f"Speculative labeling: saved {spec['latency_saved_s']}s total "
+            f"({spec['avg_latency_saved_s']}s/ticket over {spec['tickets']} tickets), "
+            f"{spec['discarded_labels']} labels discarded ({spec['wasted_labeler_s']}s wasted)"
+        )
+
+    if "node_latency" in metrics:
+        print("\nPer-node latency (p50 / p95 / p99):")
+        for node, m in metrics["node_latency"].items():
+            print(f"  {node:20s}: {m['p50_s']}s / {m['p95_s']}s / {m['p99_s']}s ({m['count']} calls)")
+
+    if "fused" in metrics:
+        fused = metrics["fused"]
+        print(f"Fused mode: {fused['fallbacks']}/{fused['tickets']} tickets fell back to two-step")
+
+    if "gate" in metrics:
+        g = metrics["gate"]
+        print(
+            f"Vagueness gate: {g['short_circuited']}/{g['tickets']} tickets stopped before intake, "
+            f"{g['llm_calls_saved']} LLM calls saved, {g['false_positives']} valid tickets stopped"
+        )
+
     print("\nPer-dimension accuracy:")
     for dim in ["decision", "severity", "issue_type", "team", "is_duplicate", "is_valid"]:
         if dim in metrics:
@@ -72,3 +157,42 @@ def print_report(metrics: dict, results: list):
         for f in failures:
             failed_dims = [k for k, v in f["scores"].items() if not v]
             print(f"  {f['id']}: failed on {', '.join(failed_dims)}")
+
+
+def print_comparison(comparison: dict):
+    """Print accuracy and latency for several pipeline modes side by side.
+
+    ``comparison`` maps mode -> {"results": [...], "metrics": {...}}.
+    """
+    modes = list(comparison)
+    print("\n" + "=" * 60)
+    print("SENTINEL MODE COMPARISON")
+    print("=" * 60)
+    print(f"\n{'':22s}" + "".join(f"{m:>14s}" for m in modes))
+
+    def row(label: str, values: list):
+        print(f"{label:22s}" + "".join(f"{v:>14s}" for v in values))
+
+    row("overall pass rate", [f"{comparison[m]['metrics']['overall_pass_rate']*100:.1f}%" for m in modes])
+    for dim in ["decision", "severity", "priority", "issue_type", "team", "is_duplicate", "is_valid"]:
+        if all(dim in comparison[m]["metrics"] for m in modes):
+            row(dim, [f"{comparison[m]['metrics'][dim]['accuracy']*100:.1f}%" for m in modes])
+
+    for label, pct in [("latency p50", 50), ("latency p95", 95)]:
+        values = []
+        for m in modes:
+            latencies = [r["latency_s"] for r in comparison[m]["results"]]
+            values.append(f"{percentile(latencies, pct):.2f}s" if latencies else "-")
+        row(label, values)
+    row("avg latency", [f"{comparison[m]['metrics']['avg_latency_s']:.2f}s" for m in modes])
+
+    if any("gate" in comparison[m]["metrics"] for m in modes):
+        row("gate calls saved", [
+            str(comparison[m]["metrics"]["gate"]["llm_calls_saved"]) if "gate" in comparison[m]["metrics"] else "-"
+            for m in modes
+        ])
+    if any("fused" in comparison[m]["metrics"] for m in modes):
+        row("fused fallbacks", [
+            str(comparison[m]["metrics"]["fused"]["fallbacks"]) if "fused" in comparison[m]["metrics"] else "-"
+            for m in modes
+        ])
@@ -0,0 +1,66 @@
+import argparse
+import time
+from agents.rules import RULE_CONFIDENCE_THRESHOLD, get_label_rules
+from eval.dataset import HOLDOUT_CASES_PATH, load_test_cases
+
+_FIELDS = ("severity", "priority", "issue_type")
+
+
+def evaluate_rules(test_cases: list, threshold: float = None) -> dict:
+    """Score the labeler fast path on cases that expect a label.
+
+    Rules see the raw input, standing in for the parsed title/description.
+    Accuracy is measured only on tickets the rules would label locally; it
+    means little on cases the rules were written from, so the CLI scores
+    the held-out cases by default.
+    """
+    threshold = (RULE_CONFIDENCE_THRESHOLD or 0.85) if threshold is None else threshold
+    rules = get_label_rules()
+    cases = [tc for tc in test_cases if any(f in tc["expected"] for f in _FIELDS)]
+
+    covered = []
+    start = time.perf_counter()
+    for tc in cases:
+        result = rules.label(tc["input"])
+        if result is not None and result[0].confidence >= threshold:
+            covered.append((tc, result[0], result[1]))
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "tickets": len(cases),
+        "labeled_by_rules": len(covered),
+        "coverage": round(len(covered) / len(cases), 3) if cases else 0.0,
+        "llm_calls_saved": len(covered),
+        "avg_match_us": round(1e6 * elapsed / len(cases), 1) if cases else 0.0,
+        "mislabeled": [],
+    }
+    for field in _FIELDS:
+        scored = [(tc, labeled) for tc, labeled, _ in covered if field in tc["expected"]]
+        correct = sum(1 for tc, labeled in scored if getattr(labeled, field).value == tc["expected"][field])
+        report[field] = {"accuracy": round(correct / len(scored), 3) if scored else None, "total": len(scored)}
+        report["mislabeled"] += [
+            {"id": tc["id"], "field": field, "expected": tc["expected"][field], "got": getattr(labeled, field).value}
+            for tc, labeled in scored
+            if getattr(labeled, field).value != tc["expected"][field]
+        ]
+    return report
+
+
+def print_rule_report(report: dict):
+    print(f"Rule fast path: {report['labeled_by_rules']}/{report['tickets']} labeled locally "
+          f"({report['coverage']*100:.1f}%), {report['llm_calls_saved']} LLM calls saved, "
+          f"{report['avg_match_us']}us per ticket")
+    for field in _FIELDS:
+        m = report[field]
+        if m["accuracy"] is not None:
+            print(f"  {field:12s}: {m['accuracy']*100:.1f}% of {m['total']} rule-labeled tickets")
+    for miss in report["mislabeled"]:
+        print(f"  {miss['id']}: {miss['field']} expected {miss['expected']}, rules said {miss['got']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the labeler keyword rules on the eval cases")
+    parser.add_argument("--cases", default=HOLDOUT_CASES_PATH, help="Path to test cases JSON (default: held-out cases)")
+    parser.add_argument("--threshold", type=float, default=None, help="Minimum rule confidence")
+    args = parser.parse_args()
+    print_rule_report(evaluate_rules(load_test_cases(args.cases), args.threshold))
@@ -1,16 +1,23 @@
+import argparse
 import json
 import time
 import os
-from graph.pipeline import run_triage
-from agents.dedup import init_vector_store, seed_vector_store
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from graph.pipeline import run_triage, PIPELINE_MODES
+from agents.dedup import get_collection, seed_vector_store, embedding_stats
 from eval.dataset import load_test_cases
-from eval.metrics import compute_metrics, print_report
+from agents.telemetry import recorder
+from eval.metrics import compute_metrics, print_report, print_comparison
+from eval.rate_limit import TokenBucket
 
 
-def evaluate_single(test_case: dict) -> dict:
+def evaluate_single(test_case: dict, speculative: bool = False, mode: str = None, gate: bool = False) -> dict:
     """Run a single test case and compare against expected output."""
+    kwargs = {"speculative": speculative} if mode is None else {"mode": mode}
+    if gate:
+        kwargs["gate"] = True
     start = time.time()
-    result = run_triage(test_case["input"])
+    result = run_triage(test_case["input"], **kwargs)
     latency = time.time() - start
 
     expected = test_case["expected"]
@@ -50,44 +57,223 @@ def evaluate_single(test_case: dict) -> dict:
         expected_labels = set(l.lower() for l in expected["labels_should_contain"])
         scores["label_coverage"] = expected_labels.issubset(predicted_labels)
 
-    return {
+    output = {
         "id": test_case["id"],
         "category": test_case.get("category", "unknown"),
         "scores": scores,
         "all_passed": all(scores.values()) if scores else False,
         "latency_s": round(latency, 2),
-        "trace": result.get("trace", []),
+        "trace": list(result.get("trace", [])),
+    }
+    if mode is not None:
+        output["mode"] = mode
+        if mode == "fused":
+            output["fused_fallback"] = any(t.startswith("FUSED FALLBACK") for t in output["trace"])
+    if gate:
+        output["gate_short_circuit"] = any(t.startswith("GATE:") for t in output["trace"])
+        output["expected_decision"] = expected.get("decision")
+    if result.get("spans"):
+        node_latency = {}
+        for span in result["spans"]:
+            node_latency[span["node"]] = node_latency.get(span["node"], 0.0) + span["wall_s"]
+        output["node_latency_s"] = node_latency
+    if result.get("speculation"):
+        output["speculation"] = {
+            k: result["speculation"][k] for k in ("discarded", "saved_s", "wasted_s")
+            if k in result["speculation"]
+        }
+    return output
+
+
+def _failed_result(test_case: dict, error: str, latency_s: float = 0.0) -> dict:
+    return {
+        "id": test_case["id"],
+        "category": test_case.get("category", "unknown"),
+        "scores": {},
+        "all_passed": False,
+        "latency_s": round(latency_s, 2),
+        "trace": [],
+        "error": error,
     }
 
 
-def run_full_eval(test_cases_path: str = None) -> dict:
+def _print_progress(done: int, total: int, result: dict):
+    status = "PASS" if result["all_passed"] else "FAIL"
+    if result.get("error"):
+        status = f"ERROR: {result['error']}"
+    print(f"[{done}/{total}] {result['id']}: {status} (latency: {result['latency_s']}s)")
+
+
+def run_cases(
+    test_cases: list,
+    workers: int = 1,
+    max_rps: float = None,
+    timeout_s: float = None,
+    speculative: bool = False,
+    mode: str = None,
+    gate: bool = False,
+) -> list:
+    """Evaluate cases on a worker pool, returning results in input order.
+
+    ``max_rps`` caps how fast cases start (token bucket shared by all
+    workers). A case running longer than ``timeout_s`` is recorded as a
+    failure; its thread cannot be interrupted and finishes in the background.
+    """
+    bucket = TokenBucket(max_rps) if max_rps else None
+    started = {}
+
+    def run_case(i: int) -> dict:
+        if bucket:
+            bucket.acquire()
+        started[i] = time.monotonic()
+        return evaluate_single(test_cases[i], speculative=speculative, mode=mode, gate=gate)
+
+    results = [None] * len(test_cases)
+    total = len(test_cases)
+    done = 0
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        pending = {pool.submit(run_case, i): i for i in range(total)}
+        while pending:
+            finished, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i = pending.pop(future)
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = _failed_result(test_cases[i], f"{type(e).__name__}: {e}")
+                done += 1
+                _print_progress(done, total, results[i])
+
+            if timeout_s is not None:
+                now = time.monotonic()
+                for future, i in list(pending.items()):
+                    if i in started and now - started[i] > timeout_s:
+                        del pending[future]
+                        results[i] = _failed_result(
+                            test_cases[i], f"Timed out after {timeout_s}s", timeout_s
+                        )
+                        done += 1
+                        _print_progress(done, total, results[i])
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+def run_full_eval(
+    test_cases_path: str = None,
+    speculative: bool = False,
+    workers: int = 1,
+    max_rps: float = None,
+    timeout_s: float = None,
+    results_path: str = None,
+    mode: str = None,
+    gate: bool = False,
+) -> dict:
     """Run all test cases and compute aggregate metrics."""
     # Ensure vector store is seeded
-    collection = init_vector_store()
+    collection = get_collection()
     seed_vector_store(collection)
 
     test_cases = load_test_cases(test_cases_path)
-    results = []
-
-    for i, tc in enumerate(test_cases):
-        print(f"Running eval {i+1}/{len(test_cases)}: {tc['id']}...")
-        result = evaluate_single(tc)
-        results.append(result)
-        status = "PASS" if result["all_passed"] else "FAIL"
-        print(f"  {status} (latency: {result['latency_s']}s)")
+    print(f"Running {len(test_cases)} eval cases with {workers} worker(s)...")
+    results = run_cases(
+        test_cases,
+        workers=workers,
+        max_rps=max_rps,
+        timeout_s=timeout_s,
+        speculative=speculative,
+        mode=mode,
+        gate=gate,
+    )
 
     # Aggregate metrics
     metrics = compute_metrics(results)
 
     # Save results
     output = {"results": results, "metrics": metrics}
-    results_path = os.path.join(os.path.dirname(__file__), "eval_results.json")
+    embeddings = embedding_stats()
+    if embeddings:
+        output["embedding_cache"] = embeddings
+    if results_path is None:
+        results_path = os.path.join(os.path.dirname(__file__), "eval_results.json")
     with open(results_path, "w") as f:
         json.dump(output, f, indent=2)
 
     print_report(metrics, results)
+    if embeddings:
+        print(
+            f"\nEmbedding cache: {embeddings['hit_ratio']*100:.1f}% hit ratio "
+            f"({embeddings['hits']} hits / {embeddings['misses']} misses), "
+            f"{embeddings['avg_embed_ms']}ms per model call"
+        )
     return output
 
 
+def compare_modes(
+    modes: list,
+    test_cases_path: str = None,
+    workers: int = 1,
+    max_rps: float = None,
+    timeout_s: float = None,
+    gate: bool = False,
+) -> dict:
+    """Run the eval once per pipeline mode and print accuracy/latency side by side."""
+    collection = get_collection()
+    seed_vector_store(collection)
+
+    test_cases = load_test_cases(test_cases_path)
+    comparison = {}
+    for mode in modes:
+        print(f"Running {len(test_cases)} eval cases in {mode} mode with {workers} worker(s)...")
+        results = run_cases(
+            test_cases, workers=workers, max_rps=max_rps, timeout_s=timeout_s, mode=mode, gate=gate
+        )
+        comparison[mode] = {"results": results, "metrics": compute_metrics(results)}
+
+    print_comparison(comparison)
+    return comparison
+
+
 if __name__ == "__main__":
-    run_full_eval()
+    parser = argparse.ArgumentParser(description="Run the Sentinel eval suite")
+    parser.add_argument("--cases", default=None, help="Path to test cases JSON")
+    parser.add_argument(
+        "--speculative", action="store_true",
+        help="Label concurrently with dedup and report latency saved",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Cases evaluated concurrently")
+    parser.add_argument("--max-rps", type=float, default=None, help="Max cases started per second")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-case timeout in seconds")
+    parser.add_argument("--spans", default=None, help="Append per-node spans to this JSON-lines file")
+    parser.add_argument(
+        "--mode", default=None, choices=PIPELINE_MODES,
+        help="Pipeline mode (two_step, speculative or fused)",
+    )
+    parser.add_argument(
+        "--compare", nargs="+", default=None, choices=PIPELINE_MODES, metavar="MODE",
+        help="Run each mode and print accuracy and latency side by side",
+    )
+    parser.add_argument(
+        "--gate", action="store_true",
+        help="Run the local vagueness gate before intake and report LLM calls saved",
+    )
+    args = parser.parse_args()
+    if args.compare:
+        compare_modes(
+            args.compare, args.cases, workers=args.workers, max_rps=args.max_rps,
+            timeout_s=args.timeout, gate=args.gate,
+        )
+    else:
+        run_full_eval(
+            args.cases,
+            speculative=args.speculative,
+            workers=args.workers,
+            max_rps=args.max_rps,
+            timeout_s=args.timeout,
+            mode=args.mode,
+            gate=args.gate,
+        )
+    if args.spans:
+        recorder.export_jsonl(args.spans)
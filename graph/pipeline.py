@@ -1,9 +1,22 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from langgraph.graph import StateGraph, END
-from schema.state import TriageState
-from agents.intake import intake_agent
-from agents.dedup import dedup_agent
-from agents.labeler import labeler_agent
-from agents.router import router_agent
+from schema.state import TriageState, TriageResult
+from schema.trace import Trace, append_trace
+from agents.intake import intake_agent, aintake_agent
+from agents.dedup import dedup_agent, adedup_agent, dedup_many
+from agents.labeler import labeler_agent, alabeler_agent
+from agents.router import router_agent, arouter_agent, route_many
+from agents.fused import fused_agent, afused_agent
+from agents.gate import vagueness_gate, avagueness_gate
+from agents.telemetry import instrument_node
+from graph.speculative import (
+    speculative_labeler,
+    aspeculative_labeler,
+    timed_dedup,
+    atimed_dedup,
+    join_speculation,
+)
 
 
 def should_continue_after_intake(state: TriageState) -> str:
@@ -22,18 +35,110 @@ def should_continue_after_dedup(state: TriageState) -> str:
     return "label"
 
 
-def build_pipeline() -> StateGraph:
-    """Construct the LangGraph triage pipeline."""
+def should_continue_after_gate(state: TriageState) -> str:
+    """Stop before any LLM call when the gate judged the input too vague."""
+    if state.get("decision") == "needs_clarification":
+        return "clarification"
+    return "continue"
+
+
+def should_continue_after_fused(state: TriageState) -> str:
+    """Fused mode: take the two-step path when the fused output didn't validate."""
+    if state.get("parsed_ticket") is None:
+        return "fallback"
+    return should_continue_after_intake(state)
+
+
+def should_continue_after_fused_dedup(state: TriageState) -> str:
+    """Fused mode: skip the labeler when the fused call already labeled the ticket."""
+    if should_continue_after_dedup(state) == "duplicate":
+        return "duplicate"
+    return "route" if state.get("labeled_ticket") else "label"
+
+
+def fan_out_after_intake(state: TriageState):
+    """Speculative mode: start dedup and labeling together for valid tickets."""
+    if should_continue_after_intake(state) != "dedup":
+        return END
+    return ["dedup", "labeler"]
+
+
+def _add_nodes(workflow: StateGraph, nodes: dict):
+    """Register nodes, each wrapped to record a telemetry span."""
+    for name, fn in nodes.items():
+        workflow.add_node(name, instrument_node(name, fn))
+
+
+def _set_entry(workflow: StateGraph, first: str, gate: bool, use_async: bool):
+    """Enter at ``first``, optionally behind the pre-intake vagueness gate."""
+    if not gate:
+        workflow.set_entry_point(first)
+        return
+    _add_nodes(workflow, {"gate": avagueness_gate if use_async else vagueness_gate})
+    workflow.set_entry_point("gate")
+    workflow.add_conditional_edges(
+        "gate",
+        should_continue_after_gate,
+        {
+            "continue": first,
+            "clarification": END,
+        },
+    )
+
+
+PIPELINE_MODES = ("two_step", "speculative", "fused")
+
+
+def build_pipeline(
+    use_async: bool = False,
+    speculative: bool = False,
+    mode: str = "two_step",
+    gate: bool = False,
+) -> StateGraph:
+    """Construct the LangGraph triage pipeline.
+
+    With use_async=True the nodes are coroutines and the compiled graph is
+    meant to be driven with ``ainvoke``. Modes:
+
+    - ``two_step``: intake, dedup, labeler and router in sequence.
+    - ``speculative`` (or speculative=True): the labeler runs alongside
+      dedup after intake; a join node discards its result (recording the
+      wasted call) when dedup finds a duplicate.
+    - ``fused``: one LLM call parses and labels the ticket; output that
+      fails validation falls back to the two-step intake + labeler path.
+
+    With gate=True a local vagueness check (agents/gate.py) runs first and
+    answers needs_clarification without an LLM call when it is confident.
+    """
+    if speculative:
+        mode = "speculative"
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode {mode!r}; expected one of {PIPELINE_MODES}")
+    if mode == "speculative":
+        return _build_speculative_pipeline(use_async, gate)
+    if mode == "fused":
+        return _build_fused_pipeline(use_async, gate)
+
     workflow = StateGraph(TriageState)
 
     # Add nodes
-    workflow.add_node("intake", intake_agent)
-    workflow.add_node("dedup", dedup_agent)
-    workflow.add_node("labeler", labeler_agent)
-    workflow.add_node("router", router_agent)
+    if use_async:
+        _add_nodes(workflow, {
+            "intake": aintake_agent,
+            "dedup": adedup_agent,
+            "labeler": alabeler_agent,
+            "router": arouter_agent,
+        })
+    else:
+        _add_nodes(workflow, {
+            "intake": intake_agent,
+            "dedup": dedup_agent,
+            "labeler": labeler_agent,
+            "router": router_agent,
+        })
 
     # Set entry point
-    workflow.set_entry_point("intake")
+    _set_entry(workflow, "intake", gate, use_async)
 
     # Conditional edges
     workflow.add_conditional_edges(
@@ -62,13 +167,126 @@ def build_pipeline() -> StateGraph:
     return workflow.compile()
 
 
-# Global compiled pipeline instance
+def _build_speculative_pipeline(use_async: bool, gate: bool = False) -> StateGraph:
+    workflow = StateGraph(TriageState)
+
+    if use_async:
+        _add_nodes(workflow, {
+            "intake": aintake_agent,
+            "dedup": atimed_dedup,
+            "labeler": aspeculative_labeler,
+            "router": arouter_agent,
+        })
+    else:
+        _add_nodes(workflow, {
+            "intake": intake_agent,
+            "dedup": timed_dedup,
+            "labeler": speculative_labeler,
+            "router": router_agent,
+        })
+    _add_nodes(workflow, {"join": join_speculation})
+
+    _set_entry(workflow, "intake", gate, use_async)
+    workflow.add_conditional_edges("intake", fan_out_after_intake, ["dedup", "labeler", END])
+
+    # Join waits for both branches
+    workflow.add_edge(["dedup", "labeler"], "join")
+    workflow.add_conditional_edges(
+        "join",
+        should_continue_after_dedup,
+        {
+            "label": "router",
+            "duplicate": END,
+        },
+    )
+    workflow.add_edge("router", END)
+
+    return workflow.compile()
+
+
+def _build_fused_pipeline(use_async: bool, gate: bool = False) -> StateGraph:
+    workflow = StateGraph(TriageState)
+
+    if use_async:
+        _add_nodes(workflow, {
+            "fused": afused_agent,
+            "intake": aintake_agent,
+            "dedup": adedup_agent,
+            "labeler": alabeler_agent,
+            "router": arouter_agent,
+        })
+    else:
+        _add_nodes(workflow, {
+            "fused": fused_agent,
+            "intake": intake_agent,
+            "dedup": dedup_agent,
+            "labeler": labeler_agent,
+            "router": router_agent,
+        })
+
+    _set_entry(workflow, "fused", gate, use_async)
+    workflow.add_conditional_edges(
+        "fused",
+        should_continue_after_fused,
+        {
+            "dedup": "dedup",
+            "fallback": "intake",
+            "clarification": END,
+            "error": END,
+        },
+    )
+
+    # Fallback: the regular intake step, then labeler after dedup
+    workflow.add_conditional_edges(
+        "intake",
+        should_continue_after_intake,
+        {
+            "dedup": "dedup",
+            "clarification": END,
+            "error": END,
+        },
+    )
+    workflow.add_conditional_edges(
+        "dedup",
+        should_continue_after_fused_dedup,
+        {
+            "route": "router",
+            "label": "labeler",
+            "duplicate": END,
+        },
+    )
+    workflow.add_edge("labeler", "router")
+    workflow.add_edge("router", END)
+
+    return workflow.compile()
+
+
+# Global compiled pipeline instances
 pipeline = build_pipeline()
+async_pipeline = build_pipeline(use_async=True)
+speculative_pipeline = build_pipeline(speculative=True)
+fused_pipeline = build_pipeline(mode="fused")
+
+_pipelines = {
+    ("two_step", False): pipeline,
+    ("speculative", False): speculative_pipeline,
+    ("fused", False): fused_pipeline,
+}
+_pipelines_lock = threading.Lock()
+
+
+def get_pipeline(mode: str = "two_step", gate: bool = False):
+    """Return the compiled sync pipeline for a mode, compiling gated variants on first use."""
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode {mode!r}; expected one of {PIPELINE_MODES}")
+    with _pipelines_lock:
+        if (mode, gate) not in _pipelines:
+            _pipelines[(mode, gate)] = build_pipeline(mode=mode, gate=gate)
+        return _pipelines[(mode, gate)]
 
 
-def run_triage(raw_input: str, input_type: str = "text") -> TriageState:
-    """Execute the full triage pipeline."""
-    initial_state: TriageState = {
+def _initial_state(raw_input: str, input_type: str = "text") -> TriageState:
+    return {
         "raw_input": raw_input,
         "input_type": input_type,
         "normalized_text": None,
@@ -79,8 +297,100 @@ def run_triage(raw_input: str, input_type: str = "text") -> TriageState:
         "jira_payload": None,
         "decision": None,
         "error": None,
-        "trace": [],
+        "speculative_label": None,
+        "speculation": None,
+        "trace": Trace(),
+        "spans": [],
     }
 
-    result = pipeline.invoke(initial_state)
-    return result
+
+def _apply(state: TriageState, update: dict):
+    """Merge a node update into a state outside the graph, honoring reducers."""
+    for key, value in update.items():
+        if key == "trace":
+            state["trace"] = append_trace(state.get("trace"), value)
+        elif key == "spans":
+            state["spans"] = state.get("spans", []) + value
+        else:
+            state[key] = value
+
+
+def run_triage(
+    raw_input: str,
+    input_type: str = "text",
+    speculative: bool = False,
+    mode: str = None,
+    gate: bool = False,
+) -> TriageResult:
+    """Execute the full triage pipeline (``mode`` and ``gate`` as in ``build_pipeline``)."""
+    if mode is None:
+        mode = "speculative" if speculative else "two_step"
+    graph = get_pipeline(mode, gate)
+    result = graph.invoke(_initial_state(raw_input, input_type))
+    return TriageResult(result)
+
+
+def stream_triage(
+    raw_input: str,
+    input_type: str = "text",
+    mode: str = "two_step",
+    gate: bool = False,
+):
+    """Run the pipeline, yielding ``(node, TriageResult)`` as each node finishes.
+
+    Each result is a snapshot of the state so far; the last one equals what
+    ``run_triage`` returns for the same arguments.
+    """
+    state = _initial_state(raw_input, input_type)
+    for chunk in get_pipeline(mode, gate).stream(state, stream_mode="updates"):
+        for node, update in chunk.items():
+            _apply(state, update or {})
+            yield node, TriageResult(state)
+
+
+async def run_triage_async(raw_input: str, input_type: str = "text") -> TriageResult:
+    """Execute the full triage pipeline without blocking the event loop."""
+    result = await async_pipeline.ainvoke(_initial_state(raw_input, input_type))
+    return TriageResult(result)
+
+
+def run_triage_many(
+    inputs: list[str],
+    concurrency: int = 8,
+    input_type: str = "text",
+    gate: bool = False,
+) -> list[TriageResult]:
+    """Triage a batch of inputs stage by stage, returning results in input order.
+
+    Intake and labeler LLM calls fan out over a thread pool, dedup embeds and
+    queries the whole batch in one round-trip, and routing loads the skills
+    matrix once. Branching mirrors the graph: tickets stop after intake on
+    error/clarification and after dedup when duplicated. A labeler failure
+    stops that ticket before routing instead of failing the batch. With
+    gate=True, inputs the vagueness gate rejects never reach intake.
+    """
+    states = [_initial_state(raw, input_type) for raw in inputs]
+
+    active = states
+    if gate:
+        for state in states:
+            _apply(state, vagueness_gate(state))
+        active = [s for s in states if should_continue_after_gate(s) == "continue"]
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for state, update in zip(active, pool.map(intake_agent, active)):
+            _apply(state, update)
+
+        active = [s for s in active if should_continue_after_intake(s) == "dedup"]
+        for state, update in zip(active, dedup_many(active)):
+            _apply(state, update)
+
+        active = [s for s in active if should_continue_after_dedup(s) == "label"]
+        for state, update in zip(active, pool.map(labeler_agent, active)):
+            _apply(state, update)
+
+    active = [s for s in active if s.get("labeled_ticket") is not None]
+    for state, update in zip(active, route_many(active)):
+        _apply(state, update)
+
+    return [TriageResult(state) for state in states]
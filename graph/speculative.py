@@ -0,0 +1,74 @@
+import time
+from schema.state import TriageState
+from agents.dedup import dedup_agent, adedup_agent
+from agents.labeler import labeler_agent, alabeler_agent
+
+
+def _labeler_speculation(state: TriageState, update: dict, elapsed: float) -> dict:
+    """Park the labeler result until dedup decides whether it is needed."""
+    return {
+        "speculative_label": {
+            "labeled_ticket": update.get("labeled_ticket"),
+            "error": update.get("error"),
+            "trace": update["trace"],
+        },
+        "speculation": {"labeler_s": round(elapsed, 4)},
+    }
+
+
+def speculative_labeler(state: TriageState) -> dict:
+    """Label concurrently with dedup without touching shared state keys."""
+    start = time.perf_counter()
+    update = labeler_agent(state)
+    return _labeler_speculation(state, update, time.perf_counter() - start)
+
+
+async def aspeculative_labeler(state: TriageState) -> dict:
+    start = time.perf_counter()
+    update = await alabeler_agent(state)
+    return _labeler_speculation(state, update, time.perf_counter() - start)
+
+
+def timed_dedup(state: TriageState) -> dict:
+    """Dedup that also reports its duration for the speculation accounting."""
+    start = time.perf_counter()
+    update = dedup_agent(state)
+    update["speculation"] = {"dedup_s": round(time.perf_counter() - start, 4)}
+    return update
+
+
+async def atimed_dedup(state: TriageState) -> dict:
+    start = time.perf_counter()
+    update = await adedup_agent(state)
+    update["speculation"] = {"dedup_s": round(time.perf_counter() - start, 4)}
+    return update
+
+
+def join_speculation(state: TriageState) -> dict:
+    """Commit the speculative labeler result, or discard it for a duplicate."""
+    timings = state.get("speculation") or {}
+    parked = state.get("speculative_label") or {}
+    labeler_s = timings.get("labeler_s", 0.0)
+
+    if state.get("dedup_result") and state["dedup_result"].is_duplicate:
+        return {
+            "speculative_label": None,
+            "speculation": {"discarded": True, "wasted_s": labeler_s, "saved_s": 0.0},
+            "trace": [
+                f"SPECULATIVE: Discarded labeler result for duplicate ({labeler_s:.3f}s LLM call wasted)"
+            ],
+        }
+
+    # Sequential cost is dedup + labeler; running both at once hides the shorter one
+    saved = min(timings.get("dedup_s", 0.0), labeler_s)
+    update = {
+        "labeled_ticket": parked.get("labeled_ticket"),
+        "speculative_label": None,
+        "speculation": {"discarded": False, "wasted_s": 0.0, "saved_s": round(saved, 4)},
+        "trace": parked.get("trace", []) + [
+            f"SPECULATIVE: Labeler overlapped dedup (saved {saved:.3f}s)"
+        ],
+    }
+    if parked.get("error"):
+        update["error"] = parked["error"]
+    return update
@@ -1,6 +1,17 @@
-from typing import Optional, TypedDict
+import operator
+from typing import Annotated, Optional, TypedDict
 from schema.ticket import ParsedTicket, LabeledTicket, TeamAssignment, DedupResult, JiraPayload
 from schema.enums import TriageDecision, InputType
+from schema.trace import Trace, append_trace
+
+
+def merge_dicts(left: Optional[dict], right: Optional[dict]) -> Optional[dict]:
+    """Reducer letting parallel branches each contribute keys to one dict."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return {**left, **right}
 
 
 class TriageState(TypedDict):
@@ -27,6 +38,60 @@ class TriageState(TypedDict):
     jira_payload: Optional[JiraPayload]
     decision: Optional[TriageDecision]
 
+    # Speculative mode: labeler result parked until dedup finishes,
+    # plus dedup/labeler timings and the saved/wasted accounting
+    speculative_label: Optional[dict]
+    speculation: Annotated[Optional[dict], merge_dicts]
+
     # Metadata
     error: Optional[str]
-    trace: list[str]  # Logs each agent's action for observability
+    trace: Annotated[Trace, append_trace]  # Logs each agent's action; nodes return only new lines
+    spans: Annotated[list[dict], operator.add]  # Per-node timings (agents/telemetry.py)
+
+
+class TriageResult:
+    """Read-only view of a finished triage run.
+
+    Keeps only the output fields of the final state and supports the
+    ``result["key"]`` / ``result.get("key")`` access callers already use.
+    """
+
+    __slots__ = (
+        "raw_input",
+        "decision",
+        "parsed_ticket",
+        "dedup_result",
+        "labeled_ticket",
+        "team_assignment",
+        "jira_payload",
+        "speculation",
+        "error",
+        "trace",
+        "spans",
+    )
+
+    def __init__(self, state: dict):
+        for field in self.__slots__:
+            setattr(self, field, state.get(field))
+        if self.trace is None:
+            self.trace = Trace()
+        if self.spans is None:
+            self.spans = []
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def keys(self):
+        return self.__slots__
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import Optional
 from schema.enums import Severity, Priority, IssueType
 
@@ -24,6 +24,18 @@ class LabeledTicket(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="Model confidence in classification")
 
 
+class FusedTicket(BaseModel):
+    """Output of the fused intake+label call — both agents' schemas in one response."""
+    parsed: ParsedTicket
+    labeled: Optional[LabeledTicket] = Field(None, description="Classification; null when parsed.is_valid is false")
+
+    @model_validator(mode="after")
+    def _labeled_when_valid(self) -> "FusedTicket":
+        if self.parsed.is_valid and self.labeled is None:
+            raise ValueError("labeled is required when parsed.is_valid is true")
+        return self
+
+
 class TeamAssignment(BaseModel):
     """Output of the Router Agent — who handles this ticket."""
     team: str = Field(..., description="Team name from skills matrix")
@@ -0,0 +1,83 @@
+import time
+from collections.abc import Sequence
+
+
+class TraceEvent:
+    """One pipeline trace line: the emitting stage, its message and a timestamp."""
+
+    __slots__ = ("source", "message", "ts")
+
+    def __init__(self, message: str, source: str = None, ts: float = None):
+        self.message = message
+        # "DEDUP: No duplicate found" -> "DEDUP"
+        self.source = source if source is not None else message.split(":", 1)[0]
+        self.ts = ts if ts is not None else time.time()
+
+    def __repr__(self) -> str:
+        return f"TraceEvent({self.message!r})"
+
+    def to_dict(self) -> dict:
+        return {"source": self.source, "message": self.message, "ts": self.ts}
+
+
+class Trace(Sequence):
+    """Append-only trace that reads like a list of message strings.
+
+    Traces share one backing list: appending to the newest view extends
+    it in place and returns a longer view, so each node's delta costs
+    O(len(delta)) instead of re-copying the whole trace. Older views keep
+    their own length and never see later events; appending to an older
+    view (a branch) copies its prefix first.
+    """
+
+    __slots__ = ("_events", "_len")
+
+    def __init__(self, events: list = None, _len: int = None):
+        self._events = events if events is not None else []
+        self._len = len(self._events) if _len is None else _len
+
+    def extend(self, messages) -> "Trace":
+        """Return a new view with ``messages`` (strings or events) appended."""
+        events = self._events
+        if len(events) != self._len:
+            events = events[:self._len]
+        for m in messages:
+            events.append(m if isinstance(m, TraceEvent) else TraceEvent(m))
+        return Trace(events, len(events))
+
+    def events(self) -> list[TraceEvent]:
+        return self._events[:self._len]
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [e.message for e in self._events[:self._len][index]]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("trace index out of range")
+        return self._events[index].message
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self._events[i].message
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Trace, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __add__(self, other) -> "Trace":
+        return self.extend(other)
+
+    def __repr__(self) -> str:
+        return f"Trace({list(self)!r})"
+
+
+def append_trace(left, right) -> Trace:
+    """LangGraph reducer: nodes return only their new trace lines."""
+    if not isinstance(left, Trace):
+        left = Trace().extend(left or [])
+    return left.extend(right or [])
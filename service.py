@@ -0,0 +1,367 @@
+"""Headless HTTP triage service for webhook integrations.
+
+Endpoints (JSON in, JSON out):
+
+- ``POST /triage``        {"text": ..., "mode"?: ..., "gate"?: bool}
+- ``POST /triage/batch``  {"texts": [...], "gate"?: bool}
+- ``POST /jira/create``   {"jira_payload": ..., "parsed_ticket"?, "labeled_ticket"?, "team_assignment"?}
+- ``GET  /metrics``       Prometheus text: node spans plus queue/request counters
+- ``GET  /healthz``
+
+Work runs on a fixed worker pool behind a bounded queue. A full queue
+answers 429 straight away; a request not finished within its timeout
+answers 504 (and is dropped if it never left the queue). A Jira create
+that already started is waited for instead, since a client retrying a
+504 would file the issue twice.
+
+Usage: python service.py [--host H] [--port P]
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pydantic import BaseModel, ValidationError
+from agents.gate import GATE_ENABLED
+from agents.indexer import index_created_ticket
+from agents.jira_client import create_jira_ticket
+from agents.telemetry import recorder
+from graph.pipeline import PIPELINE_MODES, run_triage, run_triage_many
+from schema.state import TriageResult
+from schema.ticket import LabeledTicket, ParsedTicket, TeamAssignment
+from schema.trace import Trace
+
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "8"))
+SERVICE_MAX_QUEUE = int(os.getenv("SERVICE_MAX_QUEUE", "32"))
+SERVICE_TIMEOUT_S = float(os.getenv("SERVICE_TIMEOUT_S", "60"))
+SERVICE_MAX_BATCH = int(os.getenv("SERVICE_MAX_BATCH", "100"))
+
+
+class Overloaded(Exception):
+    """The work queue is full."""
+
+
+class WorkQueue:
+    """Fixed pool of worker threads draining a bounded FIFO of jobs."""
+
+    def __init__(self, workers: int = SERVICE_WORKERS, max_queue: int = SERVICE_MAX_QUEUE):
+        self._jobs = queue.Queue(maxsize=max_queue)
+        self._busy = 0
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.max_queue = max_queue
+        self._threads = [
+            threading.Thread(target=self._run, name=f"triage-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, fn, *args) -> Future:
+        """Queue ``fn(*args)``; raises Overloaded instead of waiting for room."""
+        future = Future()
+        try:
+            self._jobs.put_nowait((future, fn, args))
+        except queue.Full:
+            raise Overloaded() from None
+        return future
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            future, fn, args = job
+            # Skip jobs whose caller already timed out and cancelled them
+            if not future.set_running_or_notify_cancel():
+                continue
+            with self._lock:
+                self._busy += 1
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+
+    def depth(self) -> int:
+        return self._jobs.qsize()
+
+    def busy(self) -> int:
+        with self._lock:
+            return self._busy
+
+    def close(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+        for t in self._threads:
+            t.join()
+
+
+class ServiceMetrics:
+    """Request counters and latency sums per endpoint and status code."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._latency_sum = defaultdict(float)
+
+    def observe(self, endpoint: str, status: int, elapsed_s: float):
+        with self._lock:
+            self._requests[(endpoint, status)] += 1
+            self._latency_sum[endpoint] += elapsed_s
+
+    def count(self, endpoint: str = None, status: int = None) -> int:
+        with self._lock:
+            return sum(
+                n for (e, s), n in self._requests.items()
+                if (endpoint is None or e == endpoint) and (status is None or s == status)
+            )
+
+    def prometheus_text(self, work: WorkQueue) -> str:
+        with self._lock:
+            lines = [
+                "# HELP sentinel_http_requests_total HTTP requests by endpoint and status",
+                "# TYPE sentinel_http_requests_total counter",
+            ]
+            lines += [
+                f'sentinel_http_requests_total{{endpoint="{e}",status="{s}"}} {n}'
+                for (e, s), n in sorted(self._requests.items())
+            ]
+            lines += [
+                "# HELP sentinel_http_request_seconds_total Seconds spent serving requests",
+                "# TYPE sentinel_http_request_seconds_total counter",
+            ]
+            lines += [
+                f'sentinel_http_request_seconds_total{{endpoint="{e}"}} {v:.6f}'
+                for e, v in sorted(self._latency_sum.items())
+            ]
+        lines += [
+            "# HELP sentinel_queue_depth Jobs waiting for a worker",
+            "# TYPE sentinel_queue_depth gauge",
+            f"sentinel_queue_depth {work.depth()}",
+            "# HELP sentinel_queue_capacity Maximum jobs allowed to wait",
+            "# TYPE sentinel_queue_capacity gauge",
+            f"sentinel_queue_capacity {work.max_queue}",
+            "# HELP sentinel_workers_busy Workers currently running a job",
+            "# TYPE sentinel_workers_busy gauge",
+            f"sentinel_workers_busy {work.busy()}",
+            "# HELP sentinel_workers Size of the worker pool",
+            "# TYPE sentinel_workers gauge",
+            f"sentinel_workers {work.workers}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class BadRequest(Exception):
+    """The request body is missing or malformed (400)."""
+
+
+def _jsonable(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, Trace)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def result_to_json(result: TriageResult) -> dict:
+    """Serialize a TriageResult; per-node spans are left to /metrics."""
+    return {k: _jsonable(v) for k, v in result.to_dict().items() if k != "spans"}
+
+
+def _optional_model(body: dict, key: str, model):
+    return model.model_validate(body[key]) if body.get(key) else None
+
+
+def _triage_job(body: dict):
+    text = body.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise BadRequest('"text" must be a non-empty string')
+    mode = body.get("mode", "two_step")
+    if mode not in PIPELINE_MODES:
+        raise BadRequest(f'"mode" must be one of {list(PIPELINE_MODES)}')
+    return lambda: result_to_json(run_triage(text, mode=mode, gate=bool(body.get("gate", GATE_ENABLED))))
+
+
+def _batch_job(body: dict):
+    texts = body.get("texts")
+    if not isinstance(texts, list) or not texts or not all(isinstance(t, str) for t in texts):
+        raise BadRequest('"texts" must be a non-empty list of strings')
+    if len(texts) > SERVICE_MAX_BATCH:
+        raise BadRequest(f"at most {SERVICE_MAX_BATCH} texts per batch")
+    gate = bool(body.get("gate", GATE_ENABLED))
+    return lambda: {"results": [result_to_json(r) for r in run_triage_many(texts, gate=gate)]}
+
+
+def _jira_job(body: dict):
+    payload = body.get("jira_payload")
+    if not isinstance(payload, dict) or "fields" not in payload:
+        raise BadRequest('"jira_payload" must be a Jira payload with "fields"')
+    try:
+        # Optional: the triaged ticket, so dedup sees the created issue
+        parsed = _optional_model(body, "parsed_ticket", ParsedTicket)
+        labeled = _optional_model(body, "labeled_ticket", LabeledTicket)
+        assignment = _optional_model(body, "team_assignment", TeamAssignment)
+    except ValidationError as e:
+        raise BadRequest(str(e)) from None
+
+    def run():
+        result = create_jira_ticket(payload)
+        if result.success and parsed:
+            index_created_ticket(result.key, parsed, labeled, assignment)
+        return result.model_dump()
+
+    return run
+
+
+# POST endpoint -> builds a zero-argument job from the request body (or raises BadRequest)
+_JOBS = {
+    "/triage": _triage_job,
+    "/triage/batch": _batch_job,
+    "/jira/create": _jira_job,
+}
+
+# Endpoints with side effects a retry would repeat: once started, wait for the outcome
+_WAIT_ONCE_STARTED = {"/jira/create"}
+
+
+class TriageService:
+    """Queue, metrics and timeout policy shared by all request handler threads."""
+
+    def __init__(self, workers: int = SERVICE_WORKERS, max_queue: int = SERVICE_MAX_QUEUE,
+                 timeout_s: float = SERVICE_TIMEOUT_S):
+        self.work = WorkQueue(workers, max_queue)
+        self.metrics = ServiceMetrics()
+        self.timeout_s = timeout_s
+
+    def handle(self, endpoint: str, body: dict) -> tuple[int, dict]:
+        """Run one POST endpoint through the queue; returns (status, JSON body)."""
+        try:
+            job = _JOBS[endpoint](body)
+        except BadRequest as e:
+            return 400, {"error": str(e)}
+        try:
+            future = self.work.submit(job)
+        except Overloaded:
+            return 429, {"error": "triage queue is full, retry later"}
+        try:
+            return 200, self._result(endpoint, future)
+        except FutureTimeout:
+            return 504, {"error": f"not finished within {self.timeout_s:g}s"}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    def _result(self, endpoint: str, future: Future):
+        try:
+            return future.result(timeout=self.timeout_s)
+        except FutureTimeout:
+            # cancel() only succeeds for a job still waiting in the queue
+            if future.cancel() or endpoint not in _WAIT_ONCE_STARTED:
+                raise
+        # The Jira client's own timeouts and retries bound this wait
+        return future.result()
+
+    def metrics_text(self) -> str:
+        return recorder.prometheus_text() + self.metrics.prometheus_text(self.work)
+
+    def close(self):
+        self.work.close()
+
+
+def _handler_class(service: TriageService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, body: dict):
+            self._send(status, json.dumps(body).encode(), "application/json")
+
+        def do_GET(self):
+            start = time.perf_counter()
+            if self.path == "/metrics":
+                status = 200
+                self._send(status, service.metrics_text().encode(), "text/plain; version=0.0.4")
+            elif self.path == "/healthz":
+                status = 200
+                self._send_json(status, {"status": "ok"})
+            else:
+                status = 404
+                self._send_json(status, {"error": f"unknown endpoint {self.path}"})
+            service.metrics.observe(self.path if status != 404 else "other", status, time.perf_counter() - start)
+
+        def do_POST(self):
+            start = time.perf_counter()
+            endpoint = self.path
+            if endpoint not in _JOBS:
+                status, body = 404, {"error": f"unknown endpoint {endpoint}"}
+                endpoint = "other"
+            else:
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = json.loads(self.rfile.read(length) or b"null")
+                    if not isinstance(body, dict):
+                        raise ValueError("body must be a JSON object")
+                except ValueError as e:
+                    status, body = 400, {"error": f"invalid JSON body: {e}"}
+                else:
+                    status, body = service.handle(endpoint, body)
+            self._send_json(status, body)
+            service.metrics.observe(endpoint, status, time.perf_counter() - start)
+
+        def log_message(self, format, *args):
+            pass  # Request counts and latency are exported on /metrics
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Listen backlog: bursts must reach the handler to get a 429, not a reset
+    request_queue_size = 1024
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8080, service: TriageService = None) -> ThreadingHTTPServer:
+    """Build (but don't start) the HTTP server; port 0 picks a free port."""
+    service = service or TriageService()
+    server = _Server((host, port), _handler_class(service))
+    server.service = service
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentinel headless triage service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    from agents.dedup import get_collection, seed_vector_store, warm_up_embeddings, warm_up_lexical_index
+
+    seed_vector_store(get_collection())
+    print(f"Embedding model warmed up in {warm_up_embeddings():.2f}s")
+    print(f"Lexical index built in {warm_up_lexical_index():.2f}s")
+    server = make_server(args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_port} "
+          f"({SERVICE_WORKERS} workers, queue {SERVICE_MAX_QUEUE}, timeout {SERVICE_TIMEOUT_S:g}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
@@ -1,8 +1,16 @@
+import os
 import pytest
 import json
+from dotenv import load_dotenv
 from schema.ticket import ParsedTicket, LabeledTicket, DedupResult, TeamAssignment
 from schema.enums import Severity, Priority, IssueType
 
+# Offline tests stub the Gemini client; a placeholder key lets agents import
+load_dotenv()
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test-key")
+
+CLEAR_BUG = "The login button on the checkout page is unresponsive on Safari. Works on Chrome."
+
 
 @pytest.fixture
 def valid_parsed_ticket():
@@ -92,3 +100,46 @@ def sample_state_invalid():
         "error": None,
         "trace": [],
     }
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Replace the Gemini client used by the LLM agents with an offline stub.
+
+    Response caching and the labeler's keyword-rule fast path are disabled
+    so every agent call reaches the stub.
+    """
+    from bench._stubs import StubGenAIClient
+    import agents.intake
+    import agents.labeler
+    import agents.fused
+    import agents.llm_cache
+    import agents.rules
+
+    client = StubGenAIClient()
+    monkeypatch.setattr(agents.intake, "client", client)
+    monkeypatch.setattr(agents.labeler, "client", client)
+    monkeypatch.setattr(agents.fused, "client", client)
+    monkeypatch.setattr(agents.llm_cache, "_cache", None)
+    monkeypatch.setattr(agents.rules, "RULE_CONFIDENCE_THRESHOLD", None)
+    return client
+
+
+@pytest.fixture
+def stub_vector_store(monkeypatch, tmp_path):
+    """Seeded, pooled ChromaDB collection backed by hashing embeddings."""
+    from bench._stubs import HashEmbeddingFunction
+    from agents import dedup
+
+    monkeypatch.setattr(dedup, "_embedding_fn", HashEmbeddingFunction())
+    monkeypatch.setattr(dedup, "_default_persist_dir", lambda: str(tmp_path))
+    collection = dedup.get_collection()
+    dedup.seed_vector_store(collection)
+    yield collection
+    dedup.close_vector_store(str(tmp_path))
+
+
+@pytest.fixture
+def offline(stub_llm, stub_vector_store):
+    """Stub LLM client and seeded vector store, for running whole pipelines offline."""
+    return stub_llm, stub_vector_store
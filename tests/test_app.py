@@ -0,0 +1,33 @@
+from contextlib import ExitStack
+import pytest
+
+pytest.importorskip("gradio")
+
+from bench.app_sessions import patched_app, run_sessions  # noqa: E402
+
+
+@pytest.fixture
+def app_and_jira():
+    with ExitStack() as stack:
+        yield patched_app(stack)
+
+
+class TestSessions:
+    def test_concurrent_sessions_file_their_own_tickets(self, app_and_jira):
+        app, jira = app_and_jira
+        summary = run_sessions(app, jira, sessions=16, concurrency=8)
+        assert summary["filed"] == 16
+        assert summary["crossed_sessions"] == []
+        assert len(jira.created) == 16
+
+    def test_create_without_triage(self, app_and_jira):
+        app, jira = app_and_jira
+        assert app.create_in_jira(None).startswith("No ticket payload")
+        assert jira.created == []
+
+    def test_streams_before_final_update(self, app_and_jira):
+        app, _ = app_and_jira
+        updates = list(app.process_ticket("The login button on the checkout page is unresponsive on Safari."))
+        assert len(updates) > 1
+        assert all(u[-1] is None for u in updates[:-1])
+        assert updates[-1][-1]["payload"]["fields"]["summary"]
@@ -0,0 +1,114 @@
+import time
+import numpy as np
+import pytest
+from agents import dedup
+from agents.compaction import backfill, cold_name, compact, stale_ids
+from agents.dedup import get_collection, get_lexical_index, lifecycle_metadata, upsert_tickets
+
+DAY = 86400
+NOW = 1_700_000_000
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    """Empty pooled exact-index store in a temp dir."""
+    from bench._stubs import HashEmbeddingFunction
+    monkeypatch.setattr(dedup, "DEDUP_INDEX", "exact")
+    monkeypatch.setattr(dedup, "_embedding_fn", HashEmbeddingFunction())
+    monkeypatch.setattr(dedup, "_default_persist_dir", lambda: str(tmp_path))
+    yield get_collection()
+    dedup.close_vector_store(str(tmp_path))
+
+
+def _add(collection, ids, created_at, resolved_at=None, vectors=None):
+    upsert_tickets(
+        collection,
+        ids=ids,
+        documents=[f"Ticket {i} about checkout failures number {i}" for i in ids],
+        metadatas=[{"title": i, **lifecycle_metadata(created_at, resolved_at)} for i in ids],
+        embeddings=vectors,
+    )
+
+
+class TestStaleIds:
+    def test_resolved_past_retention(self):
+        metadatas = {
+            "old-resolved": lifecycle_metadata(NOW - 400 * DAY, NOW - 200 * DAY),
+            "recent-resolved": lifecycle_metadata(NOW - 400 * DAY, NOW - 10 * DAY),
+            "old-open": lifecycle_metadata(NOW - 400 * DAY),
+        }
+        assert stale_ids(metadatas, NOW, retention_days=90) == ["old-resolved"]
+
+    def test_cap_moves_oldest(self):
+        metadatas = {f"T-{i}": lifecycle_metadata(NOW - i * DAY) for i in range(5)}
+        metadatas["legacy"] = {"title": "no timestamps"}
+        assert stale_ids(metadatas, NOW, max_hot=3) == ["T-3", "T-4", "legacy"]
+
+
+class TestCompact:
+    def test_archives_to_cold(self, store):
+        _add(store, ["A", "B"], NOW - 300 * DAY, NOW - 200 * DAY)
+        _add(store, ["C"], NOW - 300 * DAY)
+        index = get_lexical_index()
+        assert compact(retention_days=90, now=NOW) == {"moved": 2, "hot": 1, "cold": 2}
+        assert store.get()["ids"] == ["C"]
+        cold = get_collection(name=cold_name())
+        archived = cold.get(ids=["A"], include=["metadatas", "embeddings"])
+        assert archived["metadatas"][0]["status"] == "resolved"
+        assert len(archived["embeddings"][0]) == dedup.EMBEDDING_DIM
+        assert len(index) == 1
+
+    def test_evict(self, store):
+        _add(store, ["A"], NOW - 300 * DAY, NOW - 200 * DAY)
+        assert compact(retention_days=90, archive=False, now=NOW) == {"evicted": 1, "hot": 0, "cold": None}
+
+    def test_latency_flat_with_capped_hot_set(self, store):
+        """Queries on a capped hot set cost the same however much history piles up."""
+        hot_cap, batch, rounds = 2000, 2000, 6
+        rng = np.random.default_rng(0)
+        queries = rng.normal(size=(20, dedup.EMBEDDING_DIM)).astype(np.float32)
+
+        def query_ms(collection):
+            timings = []
+            for q in queries:
+                start = time.perf_counter()
+                collection.query(query_embeddings=[q], n_results=3)
+                timings.append(time.perf_counter() - start)
+            return 1000 * min(timings)
+
+        latencies = []
+        for r in range(rounds):
+            ids = [f"T-{r}-{i}" for i in range(batch)]
+            _add(store, ids, NOW + r * DAY, vectors=rng.normal(size=(batch, dedup.EMBEDDING_DIM)))
+            compact(retention_days=None, max_hot=hot_cap)
+            assert store.count() == hot_cap
+            latencies.append(query_ms(store))
+
+        cold = get_collection(name=cold_name())
+        assert cold.count() == (rounds - 1) * batch
+        assert store.get(ids=[f"T-{rounds - 1}-0"], include=[])["ids"]  # Newest tickets stay hot
+        # The uncapped equivalent holds every ticket and is proportionally slower
+        uncapped_ms = query_ms(cold)
+        assert latencies[-1] < 2 * latencies[0]
+        assert latencies[-1] < uncapped_ms
+
+
+class TestBackfill:
+    def test_adds_missing_lifecycle_metadata(self, store):
+        upsert_tickets(store, ["legacy", "closed"], ["Checkout fails on submit", "Export drops rows"],
+                       [{"title": "legacy"}, {"title": "closed", "status": "Done"}])
+        _add(store, ["current"], NOW - 30 * DAY)
+        assert backfill(now=NOW) == 2
+        metadatas = dict(zip(*(store.get(ids=["legacy", "closed", "current"], include=["metadatas"])[k]
+                               for k in ("ids", "metadatas"))))
+        assert metadatas["legacy"] == {"title": "legacy", "created_at": NOW, "status": "open"}
+        assert metadatas["closed"]["status"] == "resolved"
+        assert metadatas["current"]["created_at"] == NOW - 30 * DAY
+        assert backfill(now=NOW) == 0
+
+    def test_backfilled_tickets_match_the_window(self, store, monkeypatch):
+        upsert_tickets(store, ["legacy"], ["Checkout fails on submit"], [{"title": "legacy"}])
+        backfill()
+        monkeypatch.setattr(dedup, "DEDUP_WINDOW_DAYS", 30)
+        collection, where = dedup.dedup_scope()
+        assert collection.get(where=where, include=[])["ids"] == ["legacy"]
@@ -1,7 +1,25 @@
 import pytest
 import tempfile
 import os
-from agents.dedup import init_vector_store, seed_vector_store, SIMILARITY_THRESHOLD
+from concurrent.futures import ThreadPoolExecutor
+from schema.ticket import ParsedTicket
+import json
+import time
+from agents import dedup
+from agents.dedup import (
+    build_partitions,
+    dedup_agent,
+    dedup_many,
+    dedup_scope,
+    partition_name,
+    init_vector_store,
+    lifecycle_metadata,
+    seed_vector_store,
+    get_collection,
+    close_vector_store,
+    reload_vector_store,
+    SIMILARITY_THRESHOLD,
+)
 
 
 @pytest.fixture(scope="module")
@@ -72,3 +90,162 @@ class TestDedupVectorSearch:
         similarity = 1 - results["distances"][0][0]
         # Should find either TICK-002 or TICK-046 with high similarity
         assert similarity > 0.7
+
+
+class TestCollectionRegistry:
+    @pytest.fixture
+    def persist_dir(self):
+        from bench._stubs import HashEmbeddingFunction
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield tmpdir, HashEmbeddingFunction()
+            close_vector_store(tmpdir)
+
+    def test_same_handle_reused(self, persist_dir):
+        tmpdir, ef = persist_dir
+        first = get_collection(tmpdir, embedding_function=ef)
+        assert get_collection(tmpdir, embedding_function=ef) is first
+
+    def test_handles_keyed_by_name(self, persist_dir):
+        tmpdir, ef = persist_dir
+        tickets = get_collection(tmpdir, embedding_function=ef)
+        archive = get_collection(tmpdir, name="tickets_archive", embedding_function=ef)
+        assert tickets is not archive
+
+    def test_close_drops_handle(self, persist_dir):
+        tmpdir, ef = persist_dir
+        first = get_collection(tmpdir, embedding_function=ef)
+        close_vector_store(tmpdir)
+        assert get_collection(tmpdir, embedding_function=ef) is not first
+
+    def test_reload_sees_persisted_data(self, persist_dir):
+        tmpdir, ef = persist_dir
+        get_collection(tmpdir, embedding_function=ef).add(ids=["T-1"], documents=["Checkout broken"])
+        reloaded = reload_vector_store(tmpdir, embedding_function=ef)
+        assert reloaded.count() == 1
+
+    def test_concurrent_first_open_yields_one_handle(self, persist_dir):
+        tmpdir, ef = persist_dir
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            handles = list(pool.map(lambda _: get_collection(tmpdir, embedding_function=ef), range(16)))
+        assert len({id(h) for h in handles}) == 1
+
+
+class TestDedupScope:
+    @pytest.fixture
+    def seeds(self, stub_vector_store, monkeypatch):
+        # Exercise the vector query, not the lexical shortcut
+        monkeypatch.setattr(dedup, "LEXICAL_DUP_THRESHOLD", None)
+        with open(os.path.join(os.path.dirname(__file__), "..", "data", "seed_tickets.json")) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _state(seed, component):
+        return {"parsed_ticket": ParsedTicket(
+            title=seed["title"], description=seed["description"], component=component, is_valid=True,
+        )}
+
+    def test_component_filter(self, seeds, monkeypatch):
+        monkeypatch.setattr(dedup, "DEDUP_SCOPE", "component")
+        seed = seeds[0]
+        assert dedup_agent(self._state(seed, seed["component"].upper()))["decision"] == "duplicate"
+        other = next(t["component"] for t in seeds if t["component"] != seed["component"])
+        update = dedup_agent(self._state(seed, other))
+        assert update["dedup_result"].similar_ticket_id != seed["id"]
+
+    def test_no_component_searches_globally(self, seeds, monkeypatch):
+        monkeypatch.setattr(dedup, "DEDUP_SCOPE", "component")
+        assert dedup_scope(None) == (dedup.get_collection(), None)
+        assert dedup_agent(self._state(seeds[0], None))["dedup_result"].similar_ticket_id == seeds[0]["id"]
+
+    @pytest.mark.parametrize("scope", ["global", "component", "partition"])
+    def test_unknown_component_searches_globally(self, seeds, monkeypatch, scope):
+        monkeypatch.setattr(dedup, "DEDUP_SCOPE", scope)
+        if scope == "partition":
+            build_partitions()
+        assert dedup_scope("checkout page") == (dedup.get_collection(), None)
+        update = dedup_agent(self._state(seeds[0], "checkout page"))
+        assert update["dedup_result"].similar_ticket_id == seeds[0]["id"]
+
+    def test_partitions(self, seeds, monkeypatch, tmp_path):
+        monkeypatch.setattr(dedup, "DEDUP_SCOPE", "partition")
+        assert build_partitions() == len(seeds)
+        seed = seeds[0]
+        partition, where = dedup_scope(seed["component"])
+        assert where is None
+        assert partition.count() == sum(t["component"] == seed["component"] for t in seeds)
+        assert dedup_agent(self._state(seed, seed["component"]))["dedup_result"].similar_ticket_id == seed["id"]
+
+        dedup.upsert_tickets(dedup.get_collection(), ["ENG-1"], ["New checkout bug"], [{"component": seed["component"]}])
+        assert partition.get(ids=["ENG-1"], include=[])["ids"] == ["ENG-1"]
+        assert dedup_scope("brand-new-area") == (dedup.get_collection(), None)
+
+    def test_dedup_many_queries_each_scope(self, seeds, monkeypatch):
+        monkeypatch.setattr(dedup, "DEDUP_SCOPE", "component")
+        other = next(t for t in seeds if t["component"] != seeds[0]["component"])
+        states = [self._state(seeds[0], seeds[0]["component"]), self._state(other, other["component"]),
+                  self._state(seeds[0], None)]
+        assert [u["dedup_result"].similar_ticket_id for u in dedup_many(states)] == [seeds[0]["id"], other["id"], seeds[0]["id"]]
+
+    def test_seed_normalizes_component(self, stub_vector_store, tmp_path):
+        seed_file = tmp_path / "seeds.json"
+        seed_file.write_text(json.dumps([{"id": "S-1", "title": "Cart", "description": "Empty", "component": " Checkout Page "}]))
+        seed_vector_store(stub_vector_store, seed_file=str(seed_file))
+        assert stub_vector_store.get(ids=["S-1"], include=["metadatas"])["metadatas"][0]["component"] == "checkout page"
+
+    def test_partition_name(self):
+        assert partition_name("tickets", " Checkout / Cart ") == "tickets.checkout-cart"
+        assert partition_name("tickets", "  ") is None
+
+
+class TestDedupFreshness:
+    @pytest.fixture
+    def store(self, stub_vector_store, monkeypatch):
+        """Seed store plus one resolved ticket from two years ago and one open ticket from last week."""
+        now = time.time()
+        old = {"title": "Export to CSV drops unicode characters",
+               "description": "Exported CSV files replace accented names with question marks."}
+        recent = {"title": "Webhook retries flood the audit log",
+                  "description": "Every failed webhook retry writes a separate audit log entry."}
+        dedup.upsert_tickets(
+            stub_vector_store, ["OLD-1", "NEW-1"],
+            [dedup.ticket_document(t["title"], t["description"]) for t in (old, recent)],
+            [{"title": old["title"], **lifecycle_metadata(now - 730 * 86400, now - 700 * 86400)},
+             {"title": recent["title"], **lifecycle_metadata(now - 7 * 86400)}],
+        )
+        return old, recent
+
+    @staticmethod
+    def _dedup(ticket):
+        return dedup_agent({"parsed_ticket": ParsedTicket(**ticket, is_valid=True)})["dedup_result"]
+
+    def test_unfiltered_matches_old_ticket(self, store):
+        assert self._dedup(store[0]).similar_ticket_id == "OLD-1"
+
+    @pytest.mark.parametrize("lexical", [0.8, None])
+    def test_window_skips_old_ticket(self, store, monkeypatch, lexical):
+        monkeypatch.setattr(dedup, "LEXICAL_DUP_THRESHOLD", lexical)
+        monkeypatch.setattr(dedup, "DEDUP_WINDOW_DAYS", 365)
+        assert not self._dedup(store[0]).is_duplicate
+        assert self._dedup(store[1]).similar_ticket_id == "NEW-1"
+
+    @pytest.mark.parametrize("lexical", [0.8, None])
+    def test_open_only_skips_resolved_ticket(self, store, monkeypatch, lexical):
+        monkeypatch.setattr(dedup, "LEXICAL_DUP_THRESHOLD", lexical)
+        monkeypatch.setattr(dedup, "DEDUP_STATUS", "open")
+        assert not self._dedup(store[0]).is_duplicate
+        assert self._dedup(store[1]).similar_ticket_id == "NEW-1"
+
+    def test_lifecycle_metadata(self):
+        assert lifecycle_metadata(100, status="Done") == {"created_at": 100, "status": "resolved"}
+        assert lifecycle_metadata("2024-01-15T10:00:00.000+0000", "2024-01-16T10:00:00.000+0000") == {
+            "created_at": 1705312800, "status": "resolved", "resolved_at": 1705399200,
+        }
+        assert lifecycle_metadata()["status"] == "open"
+
+    def test_seed_restores_tickets_stored_without_lifecycle(self, stub_vector_store, tmp_path):
+        seed_file = tmp_path / "seeds.json"
+        seed_file.write_text(json.dumps([{"id": "S-1", "title": "Cart", "description": "Empty"}]))
+        dedup.upsert_tickets(stub_vector_store, ["S-1"], ["Cart. Empty"], [{"title": "Cart"}])
+        seed_vector_store(stub_vector_store, seed_file=str(seed_file))
+        metadata = stub_vector_store.get(ids=["S-1"], include=["metadatas"])["metadatas"][0]
+        assert metadata["status"] == "open" and "created_at" in metadata
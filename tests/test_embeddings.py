@@ -0,0 +1,135 @@
+import threading
+import numpy as np
+import pytest
+from agents.embeddings import CachedEmbeddingFunction, MmapEmbeddingStore, text_hash
+from bench._stubs import HashEmbeddingFunction
+
+
+class CountingEmbedding(HashEmbeddingFunction):
+    def __init__(self):
+        super().__init__()
+        self.embedded = []
+
+    def __call__(self, input):
+        self.embedded.extend(input)
+        return super().__call__(input)
+
+
+class TestCachedEmbeddingFunction:
+    def test_repeat_text_not_reembedded(self):
+        inner = CountingEmbedding()
+        fn = CachedEmbeddingFunction(inner)
+        first = fn(["checkout broken", "csv export empty"])
+        second = fn(["csv export empty", "checkout broken", "new text"])
+        assert inner.embedded == ["checkout broken", "csv export empty", "new text"]
+        np.testing.assert_array_equal(first[0], second[1])
+
+    def test_stats(self):
+        fn = CachedEmbeddingFunction(CountingEmbedding())
+        fn(["a b", "c d"])
+        fn(["a b"])
+        stats = fn.stats()
+        assert (stats["hits"], stats["misses"], stats["embed_calls"]) == (1, 2, 1)
+        assert stats["hit_ratio"] == pytest.approx(0.333)
+
+    def test_lru_bound(self):
+        inner = CountingEmbedding()
+        fn = CachedEmbeddingFunction(inner, max_entries=2)
+        fn(["a"]), fn(["b"]), fn(["c"]), fn(["a"])
+        assert inner.embedded == ["a", "b", "c", "a"]
+
+    def test_warm_up_bypasses_cache(self):
+        inner = CountingEmbedding()
+        fn = CachedEmbeddingFunction(inner)
+        fn.warm_up()
+        assert inner.embedded == ["warm-up"]
+        assert fn.stats()["misses"] == 0
+
+    def test_config_round_trip(self, tmp_path):
+        from chromadb.utils.embedding_functions import register_embedding_function
+        register_embedding_function(HashEmbeddingFunction)
+        fn = CachedEmbeddingFunction(HashEmbeddingFunction(), max_entries=5,
+                                     disk_store=MmapEmbeddingStore(str(tmp_path), 384))
+        rebuilt = CachedEmbeddingFunction.build_from_config(fn.get_config())
+        assert rebuilt.max_entries == 5
+        assert rebuilt.disk_store.path == str(tmp_path)
+        np.testing.assert_array_equal(rebuilt(["checkout"])[0], fn(["checkout"])[0])
+
+
+class TestDedupEmbeddingCache:
+    def test_repeat_queries_embedded_once(self, stub_vector_store, sample_state_valid, monkeypatch):
+        from agents import dedup
+        inner = CountingEmbedding()
+        monkeypatch.setattr(dedup, "_embedding_fn", inner)
+        dedup.dedup_agent(sample_state_valid)
+        dedup.dedup_agent(sample_state_valid)
+        assert len(inner.embedded) == 1
+        assert dedup.embedding_stats()["hit_ratio"] == 0.5
+
+    def test_collection_keeps_model_embedding_config(self, stub_vector_store):
+        config = stub_vector_store.configuration["embedding_function"]
+        assert config.name() == HashEmbeddingFunction.name()
+
+    def test_warm_up_loads_model(self, stub_vector_store, monkeypatch):
+        from agents import dedup
+        inner = CountingEmbedding()
+        monkeypatch.setattr(dedup, "_embedding_fn", inner)
+        assert dedup.warm_up_embeddings() >= 0
+        assert inner.embedded == ["warm-up"]
+
+
+class TestMmapEmbeddingStore:
+    def test_survives_restart(self, tmp_path):
+        inner = CountingEmbedding()
+        CachedEmbeddingFunction(inner, disk_store=MmapEmbeddingStore(str(tmp_path), 384))(["checkout broken"])
+        restarted = CachedEmbeddingFunction(inner, disk_store=MmapEmbeddingStore(str(tmp_path), 384))
+        restarted(["checkout broken"])
+        assert inner.embedded == ["checkout broken"]
+        assert restarted.stats()["hits"] == 1
+
+    def test_round_trips_float32(self, tmp_path):
+        store = MmapEmbeddingStore(str(tmp_path), 4)
+        vectors = np.random.default_rng(0).random((3, 4), dtype=np.float32)
+        store.put_many(["a", "b", "c"], list(vectors))
+        store.put_many(["a"], [np.zeros(4)])  # Existing keys are not overwritten
+        np.testing.assert_array_equal(MmapEmbeddingStore(str(tmp_path), 4).get("b"), vectors[1])
+        assert len(store) == 3
+        np.testing.assert_array_equal(store.get("a"), vectors[0])
+
+    def test_ignores_torn_append(self, tmp_path):
+        store = MmapEmbeddingStore(str(tmp_path), 4)
+        store.put_many(["a"], [np.ones(4)])
+        with open(tmp_path / "keys.txt", "a") as f:
+            f.write(f"{text_hash('lost')}\n")  # Key written, vector never flushed
+        reopened = MmapEmbeddingStore(str(tmp_path), 4)
+        assert len(reopened) == 1
+        reopened.put_many(["b"], [np.full(4, 2.0)])
+        np.testing.assert_array_equal(MmapEmbeddingStore(str(tmp_path), 4).get("b"), np.full(4, 2.0))
+
+    def test_writers_sharing_a_directory(self, tmp_path):
+        # Two processes' stores, each appending with a stale view of the files
+        first, second = MmapEmbeddingStore(str(tmp_path), 4), MmapEmbeddingStore(str(tmp_path), 4)
+        first.put_many(["a"], [np.full(4, 1.0)])
+        second.put_many(["b", "a"], [np.full(4, 2.0), np.full(4, 9.0)])
+        first.put_many(["c", "c"], [np.full(4, 3.0), np.full(4, 3.0)])
+        reopened = MmapEmbeddingStore(str(tmp_path), 4)
+        assert len(reopened) == 3
+        for store in (reopened, first):
+            for key, value in [("a", 1.0), ("b", 2.0), ("c", 3.0)]:
+                np.testing.assert_array_equal(store.get(key), np.full(4, value))
+
+    def test_concurrent_writers(self, tmp_path):
+        stores = [MmapEmbeddingStore(str(tmp_path), 4) for _ in range(2)]
+
+        def write(w):
+            for i in range(100):
+                stores[w].put_many([f"{w}-{i}"], [np.full(4, w * 1000 + i, dtype=np.float32)])
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        reopened = MmapEmbeddingStore(str(tmp_path), 4)
+        assert len(reopened) == 200
+        assert all(reopened.get(f"{w}-{i}")[0] == w * 1000 + i for w in range(2) for i in range(100))
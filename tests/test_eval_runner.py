@@ -0,0 +1,116 @@
+import time
+import pytest
+from schema.ticket import ParsedTicket, DedupResult
+import eval.runner
+from eval.dataset import load_test_cases
+from eval.rate_limit import TokenBucket
+
+
+def _fake_triage(delay: float = 0.0, slow_ids=(), slow_delay: float = 0.0):
+    """Stub run_triage that echoes each case's expected decision."""
+    by_input = {tc["input"]: tc for tc in load_test_cases()}
+
+    def run_triage(raw_input, speculative=False, mode=None):
+        tc = by_input[raw_input]
+        time.sleep(slow_delay if tc["id"] in slow_ids else delay)
+        expected = tc["expected"]
+        return {
+            "decision": expected.get("decision"),
+            "parsed_ticket": ParsedTicket(
+                title="t", description="d", is_valid=expected.get("is_valid", True)
+            ),
+            "dedup_result": DedupResult(is_duplicate=expected.get("is_duplicate", False)),
+            "trace": [f"FAKE: {tc['id']}"],
+        }
+
+    return run_triage
+
+
+@pytest.fixture
+def stub_eval(monkeypatch, tmp_path):
+    monkeypatch.setattr(eval.runner, "get_collection", lambda: None)
+    monkeypatch.setattr(eval.runner, "seed_vector_store", lambda collection: None)
+
+    def run(fake, **kwargs):
+        monkeypatch.setattr(eval.runner, "run_triage", fake)
+        return eval.runner.run_full_eval(results_path=str(tmp_path / "results.json"), **kwargs)
+
+    return run
+
+
+class TestConcurrentEval:
+    def test_metrics_identical_to_sequential(self, stub_eval):
+        sequential = stub_eval(_fake_triage())
+        concurrent = stub_eval(_fake_triage(), workers=8)
+        assert concurrent["metrics"] == sequential["metrics"]
+
+    def test_results_in_case_order(self, stub_eval):
+        output = stub_eval(_fake_triage(delay=0.01), workers=8)
+        assert [r["id"] for r in output["results"]] == [tc["id"] for tc in load_test_cases()]
+
+    def test_workers_run_cases_concurrently(self, stub_eval):
+        start = time.perf_counter()
+        stub_eval(_fake_triage(delay=0.05), workers=11)
+        # 55 cases x 0.05s = 2.75s sequentially
+        assert time.perf_counter() - start < 1.5
+
+    def test_rate_limit_caps_throughput(self, stub_eval):
+        start = time.perf_counter()
+        stub_eval(_fake_triage(), workers=8, max_rps=100)
+        # 55 starts at 100/s need at least ~0.54s
+        assert time.perf_counter() - start >= 0.5
+
+    def test_per_case_timeout(self, stub_eval):
+        output = stub_eval(
+            _fake_triage(slow_ids={"eval-003"}, slow_delay=1.0), workers=4, timeout_s=0.2
+        )
+        by_id = {r["id"]: r for r in output["results"]}
+        assert by_id["eval-003"]["all_passed"] is False
+        assert "Timed out" in by_id["eval-003"]["error"]
+        assert "error" not in by_id["eval-001"]
+        assert len(output["results"]) == 55
+
+    def test_progress_reported(self, stub_eval, capsys):
+        stub_eval(_fake_triage(), workers=4)
+        out = capsys.readouterr().out
+        assert "[55/55]" in out
+
+
+class TestCompareModes:
+    def test_reports_each_mode(self, stub_eval, monkeypatch, capsys):
+        modes_seen = set()
+        fake = _fake_triage()
+
+        def run_triage(raw_input, speculative=False, mode=None):
+            modes_seen.add(mode)
+            result = fake(raw_input)
+            if mode == "fused":
+                result["trace"] = ["FUSED FALLBACK: bad json"] + result["trace"]
+            return result
+
+        monkeypatch.setattr(eval.runner, "get_collection", lambda: None)
+        monkeypatch.setattr(eval.runner, "seed_vector_store", lambda collection: None)
+        monkeypatch.setattr(eval.runner, "run_triage", run_triage)
+        comparison = eval.runner.compare_modes(["two_step", "fused"], workers=4)
+
+        assert modes_seen == {"two_step", "fused"}
+        assert comparison["two_step"]["metrics"]["decision"] == comparison["fused"]["metrics"]["decision"]
+        assert comparison["fused"]["metrics"]["fused"]["fallbacks"] == 55
+        assert "fused" not in comparison["two_step"]["metrics"]
+        out = capsys.readouterr().out
+        assert "SENTINEL MODE COMPARISON" in out
+        assert "latency p95" in out
+
+
+class TestTokenBucket:
+    def test_burst_then_throttle(self):
+        bucket = TokenBucket(rate=50, burst=5)
+        start = time.perf_counter()
+        for _ in range(10):
+            bucket.acquire()
+        # 5 banked tokens, then 5 more at 50/s
+        assert 0.08 <= time.perf_counter() - start < 0.5
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
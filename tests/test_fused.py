@@ -0,0 +1,107 @@
+import asyncio
+import json
+import pytest
+from pydantic import ValidationError
+import agents.fused
+from agents.fused import FUSED_PROMPT, fused_agent
+from agents.intake import SYSTEM_PROMPT
+from agents.labeler import LABELER_PROMPT
+from eval.metrics import compute_metrics
+from graph.pipeline import build_pipeline, run_triage, _initial_state
+from schema.ticket import FusedTicket
+from tests.conftest import CLEAR_BUG
+
+
+def _seed_text(i=0):
+    with open("data/seed_tickets.json") as f:
+        t = json.load(f)[i]
+    return f"{t['title']}. {t['description']}"
+
+
+class TestFusedSchema:
+    def test_prompt_embeds_both_agent_prompts(self):
+        assert SYSTEM_PROMPT.strip() in FUSED_PROMPT
+        assert LABELER_PROMPT.strip() in FUSED_PROMPT
+        assert "{{" not in FUSED_PROMPT
+
+    def test_valid_ticket_requires_labels(self):
+        with pytest.raises(ValidationError):
+            FusedTicket.model_validate({"parsed": {"title": "t", "description": "d", "is_valid": True}})
+
+    def test_invalid_ticket_needs_no_labels(self):
+        fused = FusedTicket.model_validate({
+            "parsed": {"title": "", "description": "", "is_valid": False, "clarification_reason": "vague"},
+            "labeled": None,
+        })
+        assert fused.labeled is None
+
+
+class TestFusedPipeline:
+    def test_matches_two_step_result_with_fewer_calls(self, offline):
+        client, _ = offline
+        fused = run_triage(CLEAR_BUG, mode="fused")
+        fused_calls = client.calls
+        two_step = run_triage(CLEAR_BUG)
+        assert fused_calls == 1
+        assert client.calls - fused_calls == 2
+        assert fused["decision"] == two_step["decision"] == "create_ticket"
+        assert fused["parsed_ticket"] == two_step["parsed_ticket"]
+        assert fused["labeled_ticket"] == two_step["labeled_ticket"]
+        assert fused["team_assignment"] == two_step["team_assignment"]
+        assert [s["node"] for s in fused["spans"]] == ["fused", "dedup", "router"]
+
+    def test_clarification_ends_after_one_call(self, offline):
+        client, _ = offline
+        result = run_triage("it's broken", mode="fused")
+        assert result["decision"] == "needs_clarification"
+        assert result["dedup_result"] is None
+        assert client.calls == 1
+
+    def test_duplicate_skips_router(self, offline):
+        result = run_triage(_seed_text(), mode="fused")
+        assert result["decision"] == "duplicate"
+        assert result["team_assignment"] is None
+
+    def test_invalid_output_falls_back_to_two_step(self, offline, monkeypatch):
+        client, _ = offline
+        monkeypatch.setattr(agents.fused, "_generate", lambda raw: '{"parsed": {"title": "t"}}')
+        result = run_triage(CLEAR_BUG, mode="fused")
+        assert result["trace"][0].startswith("FUSED FALLBACK")
+        assert result["decision"] == "create_ticket"
+        assert result["labeled_ticket"] == run_triage(CLEAR_BUG)["labeled_ticket"]
+        assert [s["node"] for s in result["spans"]] == ["fused", "intake", "dedup", "labeler", "router"]
+
+    def test_fallback_update_has_no_ticket(self, offline, monkeypatch):
+        monkeypatch.setattr(agents.fused, "_generate", lambda raw: "not json")
+        update = fused_agent(_initial_state(CLEAR_BUG))
+        assert "parsed_ticket" not in update
+
+    def test_fallback_on_exception_without_message(self, offline, monkeypatch):
+        def timeout(raw):
+            raise TimeoutError()
+
+        monkeypatch.setattr(agents.fused, "_generate", timeout)
+        update = fused_agent(_initial_state(CLEAR_BUG))
+        assert update["trace"] == ["FUSED FALLBACK: TimeoutError"]
+
+    def test_async_fused(self, offline):
+        graph = build_pipeline(use_async=True, mode="fused")
+        result = asyncio.run(graph.ainvoke(_initial_state(CLEAR_BUG)))
+        assert result["decision"] == "create_ticket"
+        assert offline[0].calls == 1
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError):
+            build_pipeline(mode="triple")
+        with pytest.raises(ValueError):
+            run_triage(CLEAR_BUG, mode="triple")
+
+
+class TestFusedMetrics:
+    def test_fallback_rate(self):
+        results = [
+            {"category": "c", "scores": {}, "all_passed": True, "latency_s": 0.0,
+             "mode": "fused", "fused_fallback": i == 0}
+            for i in range(4)
+        ]
+        assert compute_metrics(results)["fused"] == {"tickets": 4, "fallbacks": 1, "fallback_rate": 0.25}
@@ -0,0 +1,110 @@
+import asyncio
+import numpy as np
+import pytest
+from agents.gate import assess, char_entropy, features, get_classifier, vagueness_gate
+from eval.dataset import HOLDOUT_CASES_PATH, load_test_cases
+from eval.metrics import compute_metrics
+from graph.pipeline import build_pipeline, run_triage, run_triage_many, _initial_state
+from tests.conftest import CLEAR_BUG
+
+
+class TestAssess:
+    @pytest.mark.parametrize("text", ["it's broken", "help", "bug", "fix it", "not working"])
+    def test_flags_contentless_input(self, text):
+        assert assess(text)[0]
+
+    @pytest.mark.parametrize("path", [None, HOLDOUT_CASES_PATH])
+    def test_never_stops_an_actionable_case(self, path):
+        actionable = [
+            tc for tc in load_test_cases(path) if tc["expected"].get("decision") != "needs_clarification"
+        ]
+        assert not [tc["id"] for tc in actionable if assess(tc["input"])[0]]
+
+    def test_flags_held_out_vague_case(self):
+        # The classifier is trained on test_cases.json; these cases were never seen
+        vague = [tc for tc in load_test_cases(HOLDOUT_CASES_PATH) if tc["category"] == "vague_input"]
+        assert any(assess(tc["input"])[0] for tc in vague)
+
+    @pytest.mark.parametrize("text", ["Search returns nothing", "Typo on homepage", "Login fails"])
+    def test_short_specific_report_passes(self, text):
+        assert assess(text)[0] is False
+
+    def test_known_component_always_passes(self):
+        assert assess("checkout")[0] is False
+
+    def test_specific_report_without_vocabulary_passes(self):
+        text = "When I click save on the settings page nothing happens and the spinner never stops"
+        assert assess(text)[0] is False
+
+    def test_entropy(self):
+        assert char_entropy("aaaa") == 0.0
+        assert char_entropy("abcd") == pytest.approx(2.0)
+
+    def test_classifier_is_deterministic(self):
+        clf, vocab = get_classifier()
+        x = features("The app crashes sometimes", vocab)
+        assert clf.predict_proba(x) == pytest.approx(clf.predict_proba(x.copy()))
+        assert np.isfinite(clf.weights).all()
+
+
+class TestGateNode:
+    def test_vague_input_returns_invalid_ticket(self):
+        update = vagueness_gate(_initial_state("it's broken"))
+        assert update["decision"] == "needs_clarification"
+        assert update["parsed_ticket"].is_valid is False
+        assert update["trace"][0].startswith("GATE:")
+
+    def test_clear_input_passes_untouched(self):
+        assert vagueness_gate(_initial_state(CLEAR_BUG)) == {}
+
+
+class TestGatedPipeline:
+    def test_vague_input_skips_llm(self, offline):
+        client, _ = offline
+        result = run_triage("it's broken", gate=True)
+        assert result["decision"] == "needs_clarification"
+        assert result["parsed_ticket"].is_valid is False
+        assert client.calls == 0
+        assert [s["node"] for s in result["spans"]] == ["gate"]
+
+    def test_clear_input_matches_ungated(self, offline):
+        gated = run_triage(CLEAR_BUG, gate=True)
+        plain = run_triage(CLEAR_BUG)
+        assert gated["trace"] == plain["trace"]
+        assert gated["team_assignment"] == plain["team_assignment"]
+
+    @pytest.mark.parametrize("mode", ["speculative", "fused"])
+    def test_other_modes(self, offline, mode):
+        client, _ = offline
+        assert run_triage("help", mode=mode, gate=True)["decision"] == "needs_clarification"
+        assert client.calls == 0
+        assert run_triage(CLEAR_BUG, mode=mode, gate=True)["decision"] == "create_ticket"
+
+    def test_async_gate(self, offline):
+        graph = build_pipeline(use_async=True, gate=True)
+        result = asyncio.run(graph.ainvoke(_initial_state("fix it")))
+        assert result["decision"] == "needs_clarification"
+        assert offline[0].calls == 0
+
+    def test_batch_gate(self, offline):
+        client, _ = offline
+        results = run_triage_many(["bug", CLEAR_BUG], gate=True)
+        assert results[0]["decision"] == "needs_clarification"
+        assert results[1]["decision"] == "create_ticket"
+        assert client.calls == 2  # Intake + labeler for the clear report only
+
+
+class TestGateMetrics:
+    def test_calls_saved_and_false_positives(self):
+        results = [
+            {"category": "c", "scores": {}, "all_passed": True, "latency_s": 0.0,
+             "gate_short_circuit": stopped, "expected_decision": expected}
+            for stopped, expected in [
+                (True, "needs_clarification"),
+                (True, "create_ticket"),
+                (False, "create_ticket"),
+            ]
+        ]
+        assert compute_metrics(results)["gate"] == {
+            "tickets": 3, "short_circuited": 2, "llm_calls_saved": 2, "false_positives": 1,
+        }
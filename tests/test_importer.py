@@ -0,0 +1,121 @@
+import json
+import pytest
+from agents import importer
+from agents.dedup import init_vector_store
+from agents.importer import import_files, iter_records, ticket_from_record
+from bench._stubs import HashEmbeddingFunction
+
+
+class CountingEmbedding(HashEmbeddingFunction):
+    def __init__(self):
+        super().__init__()
+        self.documents = 0
+
+    def __call__(self, input):
+        self.documents += len(input)
+        return super().__call__(input)
+
+
+def _ticket(i: int) -> dict:
+    return {"id": f"HIST-{i}", "title": f"Ticket {i}", "description": f"Old issue number {i} in checkout",
+            "component": "Checkout"}
+
+
+def _jira_issue(key: str, description) -> dict:
+    return {"key": key, "fields": {
+        "summary": f"Summary of {key}", "description": description,
+        "components": [{"name": "Billing"}], "priority": {"name": "High"},
+    }}
+
+
+@pytest.fixture
+def collection(tmp_path):
+    return init_vector_store(str(tmp_path / "store"), "import", HashEmbeddingFunction(), index="exact")
+
+
+@pytest.fixture
+def jsonl(tmp_path):
+    path = tmp_path / "history.jsonl"
+    lines = [json.dumps(_ticket(i)) for i in range(25)] + ["", json.dumps({"id": "EMPTY"})]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+class TestRecords:
+    def test_jira_issue_with_adf_description(self):
+        adf = {"type": "doc", "content": [{"type": "paragraph", "content": [
+            {"type": "text", "text": "Refund"}, {"type": "text", "text": "fails"}]}]}
+        ticket = ticket_from_record(_jira_issue("ENG-7", adf))
+        assert ticket["id"] == "ENG-7"
+        assert ticket["description"] == "Refund fails"
+        assert (ticket["component"], ticket["priority"]) == ("Billing", "high")
+
+    def test_jira_lifecycle(self, collection, tmp_path):
+        issue = _jira_issue("ENG-9", "Closed long ago")
+        issue["fields"].update(created="2023-03-01T09:00:00.000+0000", resolutiondate="2023-03-02T09:00:00.000+0000",
+                               status={"name": "Closed", "statusCategory": {"key": "done"}})
+        path = tmp_path / "closed.jsonl"
+        path.write_text(json.dumps(issue))
+        import_files([str(path)], collection, workers=0, embedding_function=HashEmbeddingFunction())
+        metadata = collection.get(ids=["ENG-9"], include=["metadatas"])["metadatas"][0]
+        assert metadata["status"] == "resolved"
+        assert metadata["resolved_at"] - metadata["created_at"] == 86400
+
+    def test_unusable_record(self):
+        assert ticket_from_record({"id": "X"}) is None
+        assert ticket_from_record({"title": "No id"}) is None
+
+    def test_streams_jira_export(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(importer, "_READ_SIZE", 64)  # Force objects to straddle reads
+        path = tmp_path / "export.json"
+        issues = [_jira_issue(f"ENG-{i}", "Text with ] and [ brackets") for i in range(10)]
+        path.write_text(json.dumps({"startAt": 0, "total": 10, "issues": issues}, indent=2))
+        assert [r["key"] for r in iter_records(str(path))] == [f"ENG-{i}" for i in range(10)]
+
+    def test_streams_bare_array(self, tmp_path):
+        path = tmp_path / "tickets.json"
+        path.write_text(json.dumps([_ticket(1), _ticket(2)]))
+        assert len(list(iter_records(str(path)))) == 2
+
+
+class TestImport:
+    def test_import_jsonl(self, collection, jsonl):
+        stats = import_files([jsonl], collection, batch_size=4, chunk_size=8, workers=0,
+                             embedding_function=HashEmbeddingFunction())
+        assert (stats["read"], stats["imported"], stats["skipped"]) == (26, 25, 1)
+        assert stats["docs_per_s"] > 0
+        assert collection.count() == 25
+        stored = collection.get(ids=["HIST-3"], include=["metadatas"])
+        assert stored["metadatas"][0]["component"] == "checkout"
+
+    def test_repeated_ids_in_one_chunk(self, collection, tmp_path):
+        path = tmp_path / "dupes.jsonl"
+        path.write_text("\n".join(json.dumps(dict(_ticket(1), title=t)) for t in ("first", "second")))
+        import_files([str(path)], collection, workers=0, embedding_function=HashEmbeddingFunction())
+        assert collection.get(ids=["HIST-1"], include=["metadatas"])["metadatas"][0]["title"] == "second"
+
+    def test_resume_from_checkpoint(self, collection, jsonl, tmp_path):
+        checkpoint = str(tmp_path / "import.checkpoint.json")
+
+        def crash(stats):
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            import_files([jsonl], collection, batch_size=4, chunk_size=8, workers=0,
+                         checkpoint_path=checkpoint, embedding_function=HashEmbeddingFunction(), progress=crash)
+        assert collection.count() == 8
+
+        embedding = CountingEmbedding()
+        stats = import_files([jsonl], collection, batch_size=4, chunk_size=8, workers=0,
+                             checkpoint_path=checkpoint, embedding_function=embedding)
+        assert stats["imported"] == 17
+        assert embedding.documents == 17
+        assert collection.count() == 25
+
+    def test_worker_processes(self, collection, jsonl):
+        stats = import_files([jsonl], collection, batch_size=5, chunk_size=10, workers=2,
+                             embedding_function=HashEmbeddingFunction())
+        assert stats["imported"] == 25
+        top = collection.query(query_embeddings=HashEmbeddingFunction()(["Ticket 7. Old issue number 7 in checkout"]),
+                               n_results=1)
+        assert top["ids"] == [["HIST-7"]]
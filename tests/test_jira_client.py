@@ -0,0 +1,151 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from agents.jira_client import JiraClient, BULK_CHUNK_SIZE
+
+
+class _StubJira(BaseHTTPRequestHandler):
+    """Minimal Jira issue API; ``server.script`` queues (status, headers) overrides."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("Authorization"), body))
+            server.peers.add(self.client_address)
+            override = server.script.pop(0) if server.script else None
+
+        if override:
+            status, headers = override
+            self._send(status, {"errorMessages": ["scripted"]}, headers)
+        elif self.path == "/rest/api/3/issue":
+            self._send(201, {"key": server.next_key()})
+        elif self.path == "/rest/api/3/issue/bulk":
+            issues, errors = [], []
+            for i, update in enumerate(body["issueUpdates"]):
+                if update["fields"].get("summary") == "reject me":
+                    errors.append({"status": 400, "failedElementNumber": i,
+                                   "elementErrors": {"errors": {"summary": "bad"}}})
+                else:
+                    issues.append({"key": server.next_key()})
+            self._send(201, {"issues": issues, "errors": errors})
+        else:
+            self._send(404, {})
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def jira_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubJira)
+    server.lock = threading.Lock()
+    server.requests, server.peers, server.script = [], set(), []
+    counter = iter(range(1, 10_000))
+    server.next_key = lambda: f"ENG-{next(counter)}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(jira_server):
+    host, port = jira_server.server_address
+    c = JiraClient(f"http://{host}:{port}/", "me@example.com", "token", backoff_factor=0)
+    yield c
+    c.close()
+
+
+def _payload(summary="Checkout broken"):
+    return {"fields": {"project": {"key": "ENG"}, "summary": summary}}
+
+
+class TestJiraClient:
+    def test_create_returns_key_and_url(self, client):
+        result = client.create(_payload())
+        assert result.success is True
+        assert result.key == "ENG-1"
+        assert result.url == f"{client.base_url}/browse/ENG-1"
+
+    def test_basic_auth_header(self, client, jira_server):
+        client.create(_payload())
+        assert jira_server.requests[0][1] == "Basic bWVAZXhhbXBsZS5jb206dG9rZW4="
+
+    def test_connection_reused(self, client, jira_server):
+        for _ in range(5):
+            client.create(_payload())
+        assert len(jira_server.peers) == 1
+
+    def test_retries_refused_requests(self, client, jira_server):
+        jira_server.script = [(503, {"Retry-After": "0"}), (429, {"Retry-After": "0"})]
+        result = client.create(_payload())
+        assert result.success is True
+        assert len(jira_server.requests) == 3
+
+    @pytest.mark.parametrize("status, headers", [(500, {}), (502, {}), (504, {}), (503, {})])
+    def test_post_not_resent_after_server_error(self, client, jira_server, status, headers):
+        # Jira may have created the issue before failing; a retry could file it twice
+        jira_server.script = [(status, headers)]
+        result = client.create(_payload())
+        assert result.success is False
+        assert len(jira_server.requests) == 1
+
+    def test_honors_retry_after(self, client, jira_server):
+        jira_server.script = [(429, {"Retry-After": "1"})]
+        start = time.perf_counter()
+        result = client.create(_payload())
+        assert result.success is True
+        assert time.perf_counter() - start >= 1.0
+
+    def test_gives_up_after_max_retries(self, client, jira_server):
+        jira_server.script = [(503, {"Retry-After": "0"})] * 10
+        result = client.create(_payload())
+        assert result.success is False
+        assert "503" in result.error
+        assert len(jira_server.requests) == 4  # First try + 3 retries
+
+    def test_client_errors_not_retried(self, client, jira_server):
+        jira_server.script = [(400, {})]
+        result = client.create(_payload())
+        assert result.success is False
+        assert len(jira_server.requests) == 1
+
+    def test_missing_credentials(self):
+        result = JiraClient("", "", "").create(_payload())
+        assert result.success is False
+        assert "not configured" in result.error
+
+
+class TestBulkCreate:
+    def test_chunks_of_fifty(self, client, jira_server):
+        results = client.create_many([_payload(f"Bug {i}") for i in range(120)])
+        sizes = [len(body["issueUpdates"]) for path, _, body in jira_server.requests]
+        assert sizes == [BULK_CHUNK_SIZE, BULK_CHUNK_SIZE, 20]
+        assert [r.key for r in results] == [f"ENG-{i}" for i in range(1, 121)]
+
+    def test_failed_elements_keep_order(self, client):
+        results = client.create_many([_payload("a"), _payload("reject me"), _payload("c")])
+        assert [r.success for r in results] == [True, False, True]
+        assert [r.key for r in results] == ["ENG-1", None, "ENG-2"]
+        assert "summary" in results[1].error
+
+    def test_whole_chunk_failure(self, client, jira_server):
+        jira_server.script = [(400, {})]
+        results = client.create_many([_payload("a"), _payload("b")])
+        assert all(not r.success and "400" in r.error for r in results)
@@ -0,0 +1,141 @@
+import json
+import pytest
+from agents import dedup
+from agents.dedup import dedup_agent, dedup_many, get_lexical_index, ticket_document, warm_up_lexical_index
+from agents.indexer import TicketIndexer
+from agents.lexical import LexicalIndex, jaccard, shingles
+from schema.ticket import ParsedTicket
+
+TEXT = "Checkout page returns a 500 error when the cart contains more than ten items"
+
+
+@pytest.fixture
+def seed_ticket():
+    with open("data/seed_tickets.json") as f:
+        return json.load(f)[0]
+
+
+def _refuse_embedding(texts):
+    raise AssertionError("embedding should have been skipped")
+
+
+@pytest.fixture
+def no_embedding(monkeypatch):
+    """Fail the test if dedup embeds anything."""
+    monkeypatch.setattr(dedup, "embed_texts", _refuse_embedding)
+
+
+def _state(title: str, description: str, component: str = None) -> dict:
+    parsed = ParsedTicket(title=title, description=description, component=component, is_valid=True)
+    return {"parsed_ticket": parsed, "trace": []}
+
+
+class TestShingles:
+    def test_case_and_punctuation_insensitive(self):
+        assert jaccard(shingles(TEXT), shingles(TEXT.upper() + "!!")) == 1.0
+
+    def test_typo_changes_three_shingles(self):
+        # 12 word 3-grams, 3 of them contain the edited word: 9 shared of 15
+        assert jaccard(shingles(TEXT), shingles(TEXT.replace("contains", "contans"))) == pytest.approx(9 / 15)
+
+    def test_short_and_empty_text(self):
+        assert len(shingles("login broken")) == 1
+        assert jaccard(shingles(""), shingles(TEXT)) == 0.0
+
+
+class TestLexicalIndex:
+    def test_finds_near_verbatim_copy(self):
+        index = LexicalIndex()
+        index.add_many(["A", "B"], [TEXT, "Search autocomplete shows no suggestions on the homepage"], ["a", "b"])
+        best_id, title, score = index.query(TEXT + " Still happening today.")
+        assert (best_id, title) == ("A", "a")
+        assert 0.7 < score < 1.0
+
+    def test_unrelated_text_has_no_candidates(self):
+        index = LexicalIndex()
+        index.add_many(["A"], [TEXT])
+        assert index.query("Dark mode toggle resets after logout on the settings screen") is None
+
+    def test_readd_replaces_and_remove(self):
+        index = LexicalIndex()
+        index.add_many(["A"], [TEXT])
+        index.add_many(["A"], ["Mobile app crashes when uploading a profile photo over wifi"])
+        assert len(index) == 1
+        assert index.query(TEXT) is None
+        index.remove_many(["A", "missing"])
+        assert len(index) == 0
+
+    def test_bands_must_divide_permutations(self):
+        with pytest.raises(ValueError):
+            LexicalIndex(num_perm=64, bands=10)
+
+
+class TestLexicalDedup:
+    def test_verbatim_resubmission_skips_embedding(self, stub_vector_store, seed_ticket, no_embedding):
+        update = dedup_agent(_state(seed_ticket["title"], seed_ticket["description"]))
+        assert update["decision"] == "duplicate"
+        assert update["dedup_result"].similar_ticket_id == seed_ticket["id"]
+        assert update["dedup_result"].similar_ticket_title == seed_ticket["title"]
+        assert update["dedup_result"].similarity_score == 1.0
+        assert "embedding skipped" in update["trace"][0]
+
+    def test_inconclusive_falls_through_to_vector_query(self, stub_vector_store, sample_state_valid):
+        update = dedup_agent(sample_state_valid)
+        assert "embedding skipped" not in update["trace"][0]
+
+    @pytest.mark.parametrize("scope", ["component", "partition"])
+    def test_respects_dedup_scope(self, stub_vector_store, seed_ticket, monkeypatch, scope):
+        monkeypatch.setattr(dedup, "DEDUP_SCOPE", scope)
+        if scope == "partition":
+            dedup.build_partitions()
+        with open("data/seed_tickets.json") as f:
+            component = next(t["component"] for t in json.load(f) if t["component"] != seed_ticket["component"])
+        same = dedup_agent(_state(seed_ticket["title"], seed_ticket["description"], seed_ticket["component"]))
+        assert "embedding skipped" in same["trace"][0]
+        other = dedup_agent(_state(seed_ticket["title"], seed_ticket["description"], component))
+        assert "embedding skipped" not in other["trace"][0]
+        assert other["dedup_result"].similar_ticket_id != seed_ticket["id"]
+
+    def test_ticket_deleted_elsewhere_is_not_a_duplicate(self, stub_vector_store, seed_ticket):
+        get_lexical_index()
+        # As the compaction CLI would from another process: the store changes, this index doesn't
+        stub_vector_store.delete(ids=[seed_ticket["id"]])
+        update = dedup_agent(_state(seed_ticket["title"], seed_ticket["description"]))
+        assert "embedding skipped" not in update["trace"][0]
+        assert update["dedup_result"].similar_ticket_id != seed_ticket["id"]
+
+    def test_warm_up_builds_index(self, stub_vector_store):
+        warm_up_lexical_index()
+        index = dedup._lexical_indexes[dedup._registry_key(None, dedup.COLLECTION_NAME)]
+        assert len(index) == stub_vector_store.count()
+        assert get_lexical_index() is index
+
+    def test_disabled(self, stub_vector_store, seed_ticket, monkeypatch):
+        monkeypatch.setattr(dedup, "LEXICAL_DUP_THRESHOLD", None)
+        update = dedup_agent(_state(seed_ticket["title"], seed_ticket["description"]))
+        assert update["decision"] == "duplicate"
+        assert "embedding skipped" not in update["trace"][0]
+
+    def test_dedup_many_embeds_only_the_rest(self, stub_vector_store, seed_ticket, monkeypatch):
+        embedded = []
+        embed_texts = dedup.embed_texts
+        monkeypatch.setattr(dedup, "embed_texts", lambda texts: embedded.extend(texts) or embed_texts(texts))
+        novel = _state("Dark mode resets", "The dark mode toggle resets after logging out of the settings screen.")
+        updates = dedup_many([_state(seed_ticket["title"], seed_ticket["description"]), novel])
+        assert updates[0]["dedup_result"].similar_ticket_id == seed_ticket["id"]
+        assert embedded == [ticket_document(novel["parsed_ticket"].title, novel["parsed_ticket"].description)]
+
+    def test_indexer_flush_updates_lexical_index(self, stub_vector_store, monkeypatch):
+        before = len(get_lexical_index())
+        ticket = ParsedTicket(title="Invoice PDF download returns 500",
+                              description="Downloading any invoice PDF from the billing page fails.", is_valid=True)
+        indexer = TicketIndexer(batch_size=4, flush_interval_s=60)
+        try:
+            indexer.add("ENG-1", ticket)
+            indexer.flush()
+        finally:
+            indexer.close()
+        assert len(get_lexical_index()) == before + 1
+        monkeypatch.setattr(dedup, "embed_texts", _refuse_embedding)
+        update = dedup_agent(_state(ticket.title, ticket.description))
+        assert update["dedup_result"].similar_ticket_id == "ENG-1"
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import pytest
+import agents.intake
+import agents.labeler
+from agents import llm_cache
+from agents.llm_cache import MemoryCache, ResponseCache, SQLiteCache, cache_key, cached_call
+
+
+@pytest.fixture
+def memory_cache(stub_llm, monkeypatch):
+    cache = MemoryCache()
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    return cache
+
+
+class TestCacheKey:
+    def test_whitespace_normalized(self):
+        assert cache_key("prompt", "Login  broken\n on Safari ") == cache_key("prompt", "Login broken on Safari")
+
+    def test_prompt_change_changes_key(self):
+        assert cache_key("prompt v1", "text") != cache_key("prompt v2", "text")
+
+    def test_model_change_changes_key(self):
+        assert cache_key("prompt", "text", model="a") != cache_key("prompt", "text", model="b")
+
+
+class TestMemoryCache:
+    def test_lru_eviction(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+        cache = MemoryCache(ttl_s=60)
+        cache.set("a", "1")
+        now[0] += 61
+        assert cache.get("a") is None
+
+    def test_hit_miss_counters(self):
+        cache = MemoryCache()
+        cache.get("a")
+        cache.set("a", "1")
+        cache.get("a")
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_incomplete_backend_fails_on_creation(self):
+        class NoSize(ResponseCache):
+            _get = MemoryCache._get
+            _set = MemoryCache._set
+            _delete = MemoryCache._delete
+            _clear = MemoryCache._clear
+
+        with pytest.raises(TypeError, match="_size"):
+            NoSize()
+
+
+class TestSQLiteCache:
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        first = SQLiteCache(path)
+        first.set("a", "1")
+        first.close()
+        assert SQLiteCache(path).get("a") == "1"
+
+    def test_size_eviction(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+        for key in "abc":
+            cache.set(key, key)
+        assert cache.stats()["size"] == 2
+        assert cache.get("a") is None
+
+    def test_ttl_expiry(self, tmp_path, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl_s=60)
+        cache.set("a", "1")
+        now[0] += 61
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+
+class TestCachedCall:
+    def test_invalid_response_not_stored(self, memory_cache):
+        with pytest.raises(ValueError):
+            cached_call("p", "t", lambda: "not json", lambda text: json.loads(text))
+        assert memory_cache.stats()["size"] == 0
+
+    def test_disabled_cache_always_calls(self, stub_llm):
+        calls = []
+        result, hit = cached_call("p", "t", lambda: calls.append(1) or "{}", json.loads)
+        assert hit is None and calls == [1]
+
+
+class TestAgentCaching:
+    def test_repeat_intake_served_from_cache(self, memory_cache, stub_llm, sample_state_invalid):
+        sample_state_invalid["raw_input"] = "Checkout button does nothing on Safari 17"
+        first = agents.intake.intake_agent(sample_state_invalid)
+        second = agents.intake.intake_agent(sample_state_invalid)
+        assert stub_llm.calls == 1
+        assert first["parsed_ticket"] == second["parsed_ticket"]
+        assert second["trace"][-1] == "CACHE: intake hit (hits=1, misses=1)"
+
+    def test_prompt_edit_invalidates(self, memory_cache, stub_llm, sample_state_valid, monkeypatch):
+        agents.labeler.labeler_agent(sample_state_valid)
+        monkeypatch.setattr(agents.labeler, "LABELER_PROMPT", agents.labeler.LABELER_PROMPT + "\nNew rule.")
+        result = agents.labeler.labeler_agent(sample_state_valid)
+        assert stub_llm.calls == 2
+        assert result["trace"][-1].startswith("CACHE: labeler miss")
+
+    def test_async_agents_share_cache(self, memory_cache, stub_llm, sample_state_valid):
+        agents.labeler.labeler_agent(sample_state_valid)
+        result = asyncio.run(agents.labeler.alabeler_agent(sample_state_valid))
+        assert stub_llm.calls == 1
+        assert result["trace"][-1].startswith("CACHE: labeler hit")
@@ -1,6 +1,6 @@
 import pytest
 from graph.pipeline import run_triage
-from agents.dedup import init_vector_store, seed_vector_store
+from agents.dedup import get_collection, seed_vector_store
 
 pytestmark = pytest.mark.llm
 
@@ -8,7 +8,7 @@ pytestmark = pytest.mark.llm
 @pytest.fixture(scope="module", autouse=True)
 def ensure_seeded():
     """Ensure ChromaDB is seeded before pipeline tests."""
-    collection = init_vector_store()
+    collection = get_collection()
     seed_vector_store(collection)
 
 
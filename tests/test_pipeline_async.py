@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+import pytest
+from graph.pipeline import run_triage, run_triage_async
+from agents.dedup import adedup_agent
+from agents.intake import aintake_agent
+from agents.labeler import alabeler_agent
+from agents.router import arouter_agent, router_agent
+from tests.conftest import CLEAR_BUG
+
+INPUTS = [
+    CLEAR_BUG,
+    "it's broken",
+    "Would be nice if the dashboard had dark mode",
+    "URGENT: User passwords exposed in plaintext in /api/v2/users response",
+]
+
+
+class TestAsyncAgents:
+    def test_intake_matches_sync(self, offline, sample_state_invalid):
+        from agents.intake import intake_agent
+        sample_state_invalid["raw_input"] = INPUTS[0]
+        assert asyncio.run(aintake_agent(sample_state_invalid)) == intake_agent(sample_state_invalid)
+
+    def test_labeler_matches_sync(self, offline, sample_state_valid):
+        from agents.labeler import labeler_agent
+        assert asyncio.run(alabeler_agent(sample_state_valid)) == labeler_agent(sample_state_valid)
+
+    def test_dedup_runs_off_event_loop(self, offline, sample_state_valid, monkeypatch):
+        from agents import dedup
+        loop_thread = threading.get_ident()
+        seen = []
+        original = dedup.dedup_agent
+
+        def spy(state):
+            seen.append(threading.get_ident())
+            return original(state)
+
+        monkeypatch.setattr(dedup, "dedup_agent", spy)
+        result = asyncio.run(adedup_agent(sample_state_valid))
+        assert result["dedup_result"] is not None
+        assert seen and seen[0] != loop_thread
+
+    def test_router_matches_sync(self, sample_state_valid):
+        assert asyncio.run(arouter_agent(sample_state_valid)) == router_agent(sample_state_valid)
+
+
+class TestRunTriageAsync:
+    @pytest.mark.parametrize("raw", INPUTS)
+    def test_matches_sync_pipeline(self, offline, raw):
+        result = asyncio.run(run_triage_async(raw))
+        expected = run_triage(raw)
+        assert result["decision"] == expected["decision"]
+        assert result["trace"] == expected["trace"]
+
+    def test_many_triages_in_flight(self, offline):
+        offline[0].delay = 0.05  # Two LLM round-trips per valid ticket
+
+        async def triage_all():
+            return await asyncio.gather(*(run_triage_async(INPUTS[0]) for _ in range(40)))
+
+        start = time.perf_counter()
+        results = asyncio.run(triage_all())
+        elapsed = time.perf_counter() - start
+        assert all(r["decision"] == "create_ticket" for r in results)
+        # Sequential would take 40 * 0.1s = 4s
+        assert elapsed < 2.0
@@ -0,0 +1,66 @@
+import time
+import pytest
+import agents.intake
+import agents.labeler
+from bench._stubs import StubGenAIClient
+from graph.pipeline import run_triage, stream_triage
+from tests.conftest import CLEAR_BUG
+
+LLM_DELAY_S = 0.2
+
+
+@pytest.fixture
+def slow_llm(offline, monkeypatch):
+    """Stubbed agents whose LLM calls each take LLM_DELAY_S."""
+    client = StubGenAIClient(delay=LLM_DELAY_S)
+    monkeypatch.setattr(agents.intake, "client", client)
+    monkeypatch.setattr(agents.labeler, "client", client)
+    return client
+
+
+class TestStreamTriage:
+    def test_yields_each_node_in_order(self, offline):
+        nodes = [node for node, _ in stream_triage(CLEAR_BUG)]
+        assert nodes == ["intake", "dedup", "labeler", "router"]
+
+    def test_snapshots_grow(self, offline):
+        snapshots = [result for _, result in stream_triage(CLEAR_BUG)]
+        assert snapshots[0]["parsed_ticket"] is not None
+        assert snapshots[0]["labeled_ticket"] is None
+        assert [len(r["trace"]) for r in snapshots] == sorted(len(r["trace"]) for r in snapshots)
+        assert len(snapshots[0]["trace"]) < len(snapshots[-1]["trace"])
+
+    def test_final_snapshot_matches_run_triage(self, offline):
+        *_, (_, streamed) = stream_triage(CLEAR_BUG)
+        result = run_triage(CLEAR_BUG)
+        assert streamed["trace"] == result["trace"]
+        assert streamed["decision"] == result["decision"]
+        assert streamed["jira_payload"] == result["jira_payload"]
+        assert [s["node"] for s in streamed["spans"]] == [s["node"] for s in result["spans"]]
+
+    def test_gated_vague_input(self, offline):
+        assert [node for node, _ in stream_triage("it's broken", gate=True)] == ["gate"]
+        assert offline[0].calls == 0
+
+    @pytest.mark.parametrize("mode", ["speculative", "fused"])
+    def test_other_modes_finish(self, offline, mode):
+        *_, (node, result) = stream_triage(CLEAR_BUG, mode=mode)
+        assert node == "router"
+        assert result["decision"] == "create_ticket"
+
+
+class TestTimeToFirstOutput:
+    def test_intake_arrives_before_labeling(self, slow_llm):
+        start = time.perf_counter()
+        stream = stream_triage(CLEAR_BUG)
+        node, first = next(stream)
+        first_output_s = time.perf_counter() - start
+        for _ in stream:
+            pass
+        total_s = time.perf_counter() - start
+
+        assert node == "intake" and first["parsed_ticket"] is not None
+        # First output waits for one LLM call, the full run for two
+        assert first_output_s < 1.5 * LLM_DELAY_S
+        assert total_s >= 2 * LLM_DELAY_S
+        assert slow_llm.calls == 2
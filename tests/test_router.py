@@ -1,5 +1,10 @@
+import json
+import os
+import random
 import pytest
-from agents.router import router_agent, load_team_skills
+import agents.router
+from agents.router import router_agent, load_team_skills, get_skills_index, SkillsIndex
+from schema.trace import append_trace
 from schema.ticket import ParsedTicket, LabeledTicket
 from schema.enums import Severity, Priority, IssueType
 
@@ -92,8 +97,10 @@ class TestRouterAgent:
         state = self._make_state("payments", ["stripe"])
         state["trace"] = ["PREVIOUS_STEP"]
         result = router_agent(state)
-        assert len(result["trace"]) == 2
-        assert "ROUTER:" in result["trace"][1]
+        # Nodes return only their new lines; the state reducer appends them
+        trace = append_trace(state["trace"], result["trace"])
+        assert len(trace) == 2
+        assert "ROUTER:" in trace[1]
 
     def test_assignee_is_team_lead(self):
         state = self._make_state("security", ["xss", "vulnerability"])
@@ -129,3 +136,48 @@ class TestTeamSkillsMatrix:
         teams = load_team_skills()
         for name, info in teams.items():
             assert len(info["skills"]) >= 3, f"{name} has too few skills"
+
+
+class TestSkillsIndex:
+    @pytest.fixture
+    def skills_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "team_skills.json"
+        with open("data/team_skills.json") as f:
+            teams = json.load(f)
+        path.write_text(json.dumps(teams))
+        monkeypatch.setattr(agents.router, "_SKILLS_PATH", str(path))
+        monkeypatch.setattr(agents.router, "_index", None)
+        return path, teams
+
+    def _legacy_scores(self, teams, signals):
+        return {
+            name: (len(signals & set(info["skills"])) - (0.1 * max(0, 5 - info["capacity"])),
+                   signals & set(info["skills"]))
+            for name, info in teams.items()
+        }
+
+    def test_scores_match_full_scan(self):
+        teams = load_team_skills()
+        index = SkillsIndex(teams)
+        vocab = sorted({s for info in teams.values() for s in info["skills"]}) + ["unknown"]
+        rng = random.Random(7)
+        for _ in range(500):
+            signals = set(rng.sample(vocab, rng.randint(0, 6)))
+            assert index.score(signals) == self._legacy_scores(teams, signals)
+
+    def test_index_cached_between_calls(self, skills_file):
+        assert get_skills_index() is get_skills_index()
+
+    def test_hot_reload_on_file_change(self, skills_file):
+        path, teams = skills_file
+        state = TestRouterAgent()._make_state("payments", ["stripe", "billing"])
+        before = router_agent(state)
+        assert "Team capacity: 5." in before["team_assignment"].reasoning
+
+        teams["payments"]["capacity"] = 9
+        path.write_text(json.dumps(teams))
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        after = router_agent(state)
+        assert "Team capacity: 9." in after["team_assignment"].reasoning
@@ -0,0 +1,121 @@
+import json
+import pytest
+import agents.rules
+from agents.labeler import labeler_agent
+from agents.router import get_skills_index
+from agents.rules import LabelRules, load_rules, rule_label
+from eval.dataset import HOLDOUT_CASES_PATH, load_test_cases
+from eval.rule_coverage import evaluate_rules
+from graph.pipeline import run_triage
+
+RULE = {
+    "name": "outage", "phrases": ["is down", "outage"], "severity": "critical",
+    "priority": "P0", "issue_type": "incident", "labels": [], "confidence": 0.95,
+}
+COSMETIC = {
+    "name": "cosmetic", "phrases": ["typo"], "severity": "low",
+    "priority": "P3", "issue_type": "bug", "labels": ["ui"], "confidence": 0.9,
+}
+
+
+@pytest.fixture
+def rules():
+    return LabelRules([RULE, COSMETIC], get_skills_index())
+
+
+@pytest.fixture
+def rules_on(stub_llm, monkeypatch):
+    """Stubbed LLM with the rule fast path re-enabled at its default threshold."""
+    monkeypatch.setattr(agents.rules, "RULE_CONFIDENCE_THRESHOLD", 0.85)
+    return stub_llm
+
+
+class TestLabelRules:
+    def test_multi_word_phrase_case_insensitive(self, rules):
+        matched, _ = rules.match("The checkout page IS DOWN for everyone")
+        assert [r["name"] for r in matched] == ["outage"]
+
+    def test_whole_words_only(self, rules):
+        assert rules.match("typos-r-us and typography")[0] == []
+        assert rules.label("No rule phrase here") is None
+
+    def test_skills_keywords_become_labels(self, rules):
+        labeled, names = rules.label("Payment outage at checkout")
+        assert names == ["outage"]
+        assert labeled.severity.value == "critical"
+        assert "checkout" in labeled.labels
+
+    def test_conflicting_rules_lower_confidence(self, rules):
+        labeled, names = rules.label("Outage banner has a typo")
+        assert names == ["outage", "cosmetic"]
+        assert labeled.confidence == pytest.approx(0.95 * agents.rules._CONFLICT_PENALTY)
+        assert rule_label("Outage banner has a typo", threshold=0.85) is None
+
+    def test_threshold(self):
+        assert rule_label("Passwords exposed in plaintext", threshold=0.99) is None
+        labeled, _ = rule_label("Passwords exposed in plaintext", threshold=0.85)
+        assert labeled.issue_type.value == "incident"
+
+    def test_agreeing_phrases_combine(self, rules):
+        one, _ = rules.label("The site is down")
+        two, _ = rules.label("Outage: the site is down")
+        assert one.confidence == pytest.approx(0.95)
+        assert two.confidence == pytest.approx(1 - 0.05 ** 2)
+
+    def test_negated_phrase_ignored(self, rules):
+        assert rules.label("Not an outage, but the export is slow") is None
+        assert rules.label("No typo here, the total is wrong") is None
+
+    def test_unless_phrase_vetoes_rule(self):
+        rules = LabelRules([dict(COSMETIC, unless=["charges"])], get_skills_index())
+        assert rules.label("Typo in refund calculation charges customers twice") is None
+        assert rules.label("Typo in the refund email") is not None
+
+    @pytest.mark.parametrize("text", [
+        "Checkout button misaligned and payment fails. Clicking it throws a 500, no orders complete",
+        "Typo in refund calculation charges customers twice",
+        "Typo on homepage",
+        "Would be nice to have a dark mode",
+    ])
+    def test_shipped_rules_leave_weak_or_severe_tickets_to_llm(self, text):
+        assert rule_label(text, threshold=0.85) is None
+
+    def test_load_rules_rejects_unknown_enum(self, tmp_path):
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"rules": [dict(RULE, severity="urgent")]}))
+        with pytest.raises(ValueError):
+            load_rules(str(path))
+
+    def test_shipped_rules_load(self):
+        assert {r["name"] for r in load_rules()} >= {"security_exposure", "outage"}
+
+
+class TestLabelerFastPath:
+    def test_confident_rule_skips_llm(self, rules_on, sample_state_valid):
+        parsed = sample_state_valid["parsed_ticket"].model_copy(
+            update={"title": "User passwords exposed in plaintext", "description": "Seen in the API logs."}
+        )
+        result = labeler_agent(dict(sample_state_valid, parsed_ticket=parsed))
+        assert rules_on.calls == 0
+        assert result["labeled_ticket"].severity.value == "critical"
+        assert "via rules (security_exposure" in result["trace"][0]
+
+    def test_unmatched_ticket_calls_llm(self, rules_on, sample_state_valid):
+        labeler_agent(sample_state_valid)
+        assert rules_on.calls == 1
+
+    def test_rule_labels_recorded_in_span(self, rules_on, stub_vector_store):
+        result = run_triage("Outage: the whole site is down and nothing loads at checkout")
+        assert rules_on.calls == 1  # Intake only
+        label_span = next(s for s in result["spans"] if s["node"] == "labeler")
+        assert label_span["rule_labels"] == 1
+
+
+class TestRuleCoverage:
+    def test_held_out_cases_labeled_correctly(self):
+        report = evaluate_rules(load_test_cases(HOLDOUT_CASES_PATH))
+        assert report["labeled_by_rules"] >= 5
+        assert report["mislabeled"] == []
+
+    def test_off_threshold_covers_nothing(self):
+        assert evaluate_rules(load_test_cases(), threshold=1.01)["labeled_by_rules"] == 0
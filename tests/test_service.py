@@ -0,0 +1,164 @@
+import threading
+import time
+import urllib.request
+from contextlib import ExitStack
+import pytest
+import service
+from bench.service_load import post, run_load, serve_offline
+from schema.state import TriageResult
+from schema.ticket import JiraCreateResult
+from tests.conftest import CLEAR_BUG
+
+
+@pytest.fixture
+def server():
+    with ExitStack() as stack:
+        yield serve_offline(stack, workers=2, max_queue=4, timeout_s=30)
+
+
+def _get(url: str) -> str:
+    with urllib.request.urlopen(url) as response:
+        return response.read().decode()
+
+
+class TestWorkQueue:
+    def test_rejects_when_full(self):
+        work = service.WorkQueue(workers=1, max_queue=1)
+        started, release = threading.Event(), threading.Event()
+
+        def hold():
+            started.set()
+            return release.wait()
+
+        try:
+            running = work.submit(hold)
+            started.wait(timeout=5)
+            queued = work.submit(lambda: "queued")
+            with pytest.raises(service.Overloaded):
+                work.submit(lambda: "rejected")
+            release.set()
+            assert running.result(timeout=5) is True
+            assert queued.result(timeout=5) == "queued"
+        finally:
+            release.set()
+            work.close()
+
+    def test_timed_out_job_is_dropped(self, monkeypatch):
+        svc = service.TriageService(workers=1, max_queue=2, timeout_s=0.05)
+        release = threading.Event()
+        ran = []
+        monkeypatch.setitem(service._JOBS, "/test", lambda body: lambda: ran.append(body))
+        try:
+            blocker = svc.work.submit(release.wait)
+            status, body = svc.handle("/test", {"n": 1})
+            assert status == 504 and "0.05s" in body["error"]
+            release.set()
+            blocker.result(timeout=5)
+        finally:
+            release.set()
+            svc.close()
+        assert ran == []  # Cancelled before a worker picked it up
+
+    def test_started_jira_create_is_waited_for(self, monkeypatch):
+        svc = service.TriageService(workers=1, max_queue=2, timeout_s=0.05)
+        started, created = threading.Event(), []
+
+        def create(payload):
+            started.set()
+            time.sleep(0.2)
+            created.append(payload)
+            return JiraCreateResult(success=True, key="ENG-1")
+
+        monkeypatch.setattr(service, "create_jira_ticket", create)
+        try:
+            status, body = svc.handle("/jira/create", {"jira_payload": {"fields": {}}})
+        finally:
+            svc.close()
+        assert started.is_set()
+        assert (status, body["key"]) == (200, "ENG-1")
+        assert len(created) == 1
+
+    def test_queued_jira_create_times_out(self, monkeypatch):
+        svc = service.TriageService(workers=1, max_queue=2, timeout_s=0.05)
+        release, created = threading.Event(), []
+        monkeypatch.setattr(service, "create_jira_ticket", created.append)
+        try:
+            blocker = svc.work.submit(release.wait)
+            status, _ = svc.handle("/jira/create", {"jira_payload": {"fields": {}}})
+            release.set()
+            blocker.result(timeout=5)
+        finally:
+            release.set()
+            svc.close()
+        assert status == 504
+        assert created == []
+
+
+class TestEndpoints:
+    def test_triage(self, server):
+        url, _, _ = server
+        status, body = post(f"{url}/triage", {"text": CLEAR_BUG})
+        assert status == 200
+        assert body["decision"] == "create_ticket"
+        assert body["jira_payload"]["fields"]["summary"]
+        assert body["trace"][0].startswith("INTAKE:")
+        assert set(body) == set(TriageResult.__slots__) - {"spans"}
+
+    def test_triage_gate_opt_in(self, server):
+        url, _, _ = server
+        assert not post(f"{url}/triage", {"text": "it's broken"})[1]["trace"][0].startswith("GATE:")
+        status, body = post(f"{url}/triage", {"text": "it's broken", "gate": True})
+        assert status == 200
+        assert body["trace"][0].startswith("GATE:")
+
+    def test_batch(self, server):
+        url, _, _ = server
+        status, body = post(f"{url}/triage/batch", {"texts": [CLEAR_BUG, "help"], "gate": True})
+        assert status == 200
+        assert [r["decision"] for r in body["results"]] == ["create_ticket", "needs_clarification"]
+
+    def test_jira_create_from_triage_result(self, server):
+        url, _, jira = server
+        _, triaged = post(f"{url}/triage", {"text": CLEAR_BUG})
+        status, body = post(f"{url}/jira/create", triaged)
+        assert status == 200
+        assert body == {"success": True, "key": "ENG-1", "url": "https://jira.example/browse/ENG-1", "error": None}
+        assert jira.created == [triaged["jira_payload"]]
+
+    @pytest.mark.parametrize("path,body", [
+        ("/triage", {}),
+        ("/triage", {"text": CLEAR_BUG, "mode": "turbo"}),
+        ("/triage/batch", {"texts": "not a list"}),
+        ("/jira/create", {"jira_payload": {}}),
+    ])
+    def test_bad_requests(self, server, path, body):
+        url, _, _ = server
+        assert post(f"{url}{path}", body)[0] == 400
+
+    def test_unknown_endpoint(self, server):
+        url, _, _ = server
+        assert post(f"{url}/nope", {})[0] == 404
+
+    def test_metrics(self, server):
+        url, _, _ = server
+        post(f"{url}/triage", {"text": CLEAR_BUG})
+        text = _get(f"{url}/metrics")
+        assert 'sentinel_http_requests_total{endpoint="/triage",status="200"} 1' in text
+        assert "sentinel_queue_capacity 4" in text
+        assert 'sentinel_node_latency_seconds_count{node="intake"}' in text
+
+
+class TestBackpressure:
+    def test_overload_answers_429(self):
+        with ExitStack() as stack:
+            url, server, _ = serve_offline(stack, llm_delay=0.2, workers=1, max_queue=1, timeout_s=30)
+            summary = run_load(url, requests=8, clients=8)
+            assert summary["statuses"].get(429, 0) > 0
+            assert summary["statuses"].get(200, 0) >= 1
+            assert server.service.metrics.count("/triage", 429) == summary["statuses"][429]
+
+    def test_slow_request_answers_504(self):
+        with ExitStack() as stack:
+            url, _, _ = serve_offline(stack, llm_delay=0.3, workers=1, max_queue=4, timeout_s=0.05)
+            status, body = post(f"{url}/triage", {"text": CLEAR_BUG})
+            assert status == 504
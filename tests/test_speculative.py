@@ -0,0 +1,85 @@
+import asyncio
+import json
+import time
+from graph.pipeline import build_pipeline, run_triage, _initial_state
+from eval.metrics import compute_metrics
+from tests.conftest import CLEAR_BUG
+
+
+def _seed_text(i=0):
+    with open("data/seed_tickets.json") as f:
+        t = json.load(f)[i]
+    return f"{t['title']}. {t['description']}"
+
+
+class TestSpeculativePipeline:
+    def test_matches_sequential_result(self, offline):
+        spec = run_triage(CLEAR_BUG, speculative=True)
+        seq = run_triage(CLEAR_BUG)
+        assert spec["decision"] == seq["decision"] == "create_ticket"
+        assert spec["labeled_ticket"] == seq["labeled_ticket"]
+        assert spec["team_assignment"] == seq["team_assignment"]
+        assert [t for t in spec["trace"] if not t.startswith("SPECULATIVE")] == seq["trace"]
+
+    def test_duplicate_discards_label(self, offline):
+        client, _ = offline
+        result = run_triage(_seed_text(), speculative=True)
+        assert result["decision"] == "duplicate"
+        assert result["labeled_ticket"] is None
+        assert result["team_assignment"] is None
+        assert result["speculation"]["discarded"] is True
+        assert client.calls == 2  # The labeler call was paid for and thrown away
+        assert result["trace"][-1].startswith("SPECULATIVE: Discarded")
+
+    def test_clarification_skips_both_branches(self, offline):
+        client, _ = offline
+        result = run_triage("it's broken", speculative=True)
+        assert result["decision"] == "needs_clarification"
+        assert result["speculation"] is None
+        assert client.calls == 1
+
+    def test_labeler_overlaps_dedup(self, offline, monkeypatch):
+        client, collection = offline
+        client.delay = 0.2
+        original = collection.query
+
+        def slow_query(*args, **kwargs):
+            time.sleep(0.2)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(collection, "query", slow_query)
+        start = time.perf_counter()
+        result = run_triage(CLEAR_BUG, speculative=True)
+        elapsed = time.perf_counter() - start
+        assert result["speculation"]["saved_s"] >= 0.15
+        assert elapsed < 0.55  # Sequential: intake + dedup + labeler = 0.6s
+
+    def test_async_speculative_graph(self, offline):
+        graph = build_pipeline(use_async=True, speculative=True)
+        result = asyncio.run(graph.ainvoke(_initial_state(CLEAR_BUG)))
+        assert result["decision"] == "create_ticket"
+        assert result["labeled_ticket"] is not None
+
+
+class TestSpeculationMetrics:
+    def _result(self, speculation=None):
+        r = {"id": "x", "category": "c", "scores": {}, "all_passed": True, "latency_s": 1.0}
+        if speculation:
+            r["speculation"] = speculation
+        return r
+
+    def test_aggregates_saved_and_wasted(self):
+        metrics = compute_metrics([
+            self._result({"discarded": False, "saved_s": 0.4, "wasted_s": 0.0}),
+            self._result({"discarded": True, "saved_s": 0.0, "wasted_s": 0.8}),
+        ])
+        assert metrics["speculation"] == {
+            "tickets": 2,
+            "latency_saved_s": 0.4,
+            "avg_latency_saved_s": 0.2,
+            "discarded_labels": 1,
+            "wasted_labeler_s": 0.8,
+        }
+
+    def test_absent_for_sequential_runs(self):
+        assert "speculation" not in compute_metrics([self._result()])
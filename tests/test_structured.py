@@ -0,0 +1,102 @@
+import asyncio
+import json
+import pytest
+from pydantic import ValidationError
+import agents.labeler
+from agents import structured
+from agents.labeler import LABELER_PROMPT, labeler_agent
+from agents.structured import agenerate_structured, generate_structured, strip_code_fences
+from bench._stubs import ScriptedGenAIClient
+from bench.structured_output import legacy_replay, load_fixtures, structured_replay
+from schema.ticket import FusedTicket, LabeledTicket
+
+LABELS = {"severity": "high", "priority": "P1", "issue_type": "bug", "labels": ["safari"], "confidence": 0.9}
+TICKET = "Title: Login button unresponsive\nDescription: Nothing happens on Safari."
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    structured.stats.reset()
+    yield
+    structured.stats.reset()
+
+
+def _generate(responses, model=LabeledTicket, **kwargs):
+    client = ScriptedGenAIClient(responses)
+    text = generate_structured(client, model, f"{LABELER_PROMPT}\n\n{TICKET}", context=TICKET, **kwargs)
+    return client, text
+
+
+class TestStripCodeFences:
+    def test_strips_json_fence(self):
+        assert strip_code_fences('```json\n{"a": 1}\n```') == '{"a": 1}'
+
+    def test_plain_text_untouched(self):
+        assert strip_code_fences(' {"a": 1} ') == '{"a": 1}'
+
+
+class TestGenerateStructured:
+    def test_passes_response_schema(self):
+        client, text = _generate([json.dumps(LABELS)])
+        _, config = client.requests[0]
+        assert config.response_mime_type == "application/json"
+        assert config.response_json_schema == LabeledTicket.model_json_schema()
+        assert LabeledTicket.model_validate_json(text).severity.value == "high"
+        assert structured.stats.stats()["repair_rate"] == 0.0
+
+    def test_repairs_only_failed_field(self):
+        bad = dict(LABELS, severity="urgent")
+        client, text = _generate([json.dumps(bad), '{"severity": "critical"}'])
+        assert len(client.requests) == 2
+        repair_contents, repair_config = client.requests[1]
+        assert LABELER_PROMPT not in repair_contents  # Compact: no system prompt resent
+        assert "- severity:" in repair_contents and '"urgent"' in repair_contents
+        assert "- priority:" not in repair_contents
+        assert list(repair_config.response_json_schema["properties"]) == ["severity"]
+        labeled = LabeledTicket.model_validate_json(text)
+        assert labeled.severity.value == "critical"
+        assert labeled.labels == ["safari"]
+        assert structured.stats.stats()["repaired"] == 1
+
+    def test_non_json_repairs_every_field(self):
+        client, text = _generate(["Sorry, I can't help with that.", json.dumps(LABELS)])
+        assert all(f"- {name}:" in client.requests[1][0] for name in LabeledTicket.model_fields)
+        assert LabeledTicket.model_validate_json(text).confidence == 0.9
+
+    def test_gives_up_after_max_repairs(self):
+        bad = json.dumps(dict(LABELS, confidence=1.5))
+        with pytest.raises(ValidationError):
+            _generate([bad, '{"confidence": 2.0}'])
+        assert structured.stats.stats()["failures"] == 1
+
+    def test_cross_field_error_not_repaired(self):
+        fused = {"parsed": {"title": "t", "description": "d", "is_valid": True}, "labeled": None}
+        client = ScriptedGenAIClient([json.dumps(fused)])
+        with pytest.raises(ValidationError):
+            generate_structured(client, FusedTicket, "x", context="x")
+        assert len(client.requests) == 1
+
+    def test_async_repair(self):
+        client = ScriptedGenAIClient([json.dumps(dict(LABELS, priority="P9")), '{"priority": "P2"}'])
+        text = asyncio.run(agenerate_structured(client, LabeledTicket, "x", context=TICKET))
+        assert LabeledTicket.model_validate_json(text).priority.value == "P2"
+
+
+class TestLabelerRepair:
+    def test_malformed_field_no_longer_kills_ticket(self, sample_state_valid, monkeypatch):
+        client = ScriptedGenAIClient([json.dumps(dict(LABELS, issue_type="defect")), '{"issue_type": "bug"}'])
+        monkeypatch.setattr(agents.labeler, "client", client)
+        monkeypatch.setattr("agents.llm_cache._cache", None)
+        result = labeler_agent(sample_state_valid)
+        assert result.get("error") is None
+        assert result["labeled_ticket"].issue_type.value == "bug"
+
+
+class TestFixtureReplay:
+    def test_structured_output_smaller_and_fewer_failures(self):
+        fixtures = load_fixtures()
+        legacy = legacy_replay(fixtures)
+        new = structured_replay(fixtures)
+        assert new["avg_response_bytes"] < legacy["avg_response_bytes"]
+        assert new["failures"] < legacy["failures"]
+        assert new["avg_retry_request_bytes"] < legacy["avg_retry_request_bytes"]
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import pytest
+from agents import telemetry
+from agents.llm_cache import MemoryCache
+from agents.telemetry import SpanRecorder, instrument_node, record, timed
+from eval.metrics import compute_metrics, percentile
+from graph.pipeline import build_pipeline, run_triage, _initial_state
+from tests.conftest import CLEAR_BUG
+
+
+@pytest.fixture(autouse=True)
+def clear_recorder():
+    telemetry.recorder.clear()
+    yield
+    telemetry.recorder.clear()
+
+
+def _by_node(spans):
+    return {span["node"]: span for span in spans}
+
+
+class TestPipelineSpans:
+    def test_span_per_node_in_order(self, offline):
+        result = run_triage(CLEAR_BUG)
+        assert [s["node"] for s in result["spans"]] == ["intake", "dedup", "labeler", "router"]
+        assert all(s["wall_s"] >= 0 for s in result["spans"])
+
+    def test_llm_tokens_recorded(self, offline):
+        spans = _by_node(run_triage(CLEAR_BUG)["spans"])
+        for node in ("intake", "labeler"):
+            assert spans[node]["prompt_tokens"] > 0
+            assert spans[node]["response_tokens"] > 0
+        assert "prompt_tokens" not in spans["router"]
+
+    def test_dedup_embed_and_query_time(self, offline):
+        spans = _by_node(run_triage(CLEAR_BUG)["spans"])
+        assert spans["dedup"]["embed_s"] > 0
+        assert spans["dedup"]["query_s"] > 0
+        assert spans["dedup"]["embed_s"] + spans["dedup"]["query_s"] <= spans["dedup"]["wall_s"]
+
+    def test_async_dedup_records_into_its_span(self, offline):
+        graph = build_pipeline(use_async=True)
+        result = asyncio.run(graph.ainvoke(_initial_state(CLEAR_BUG)))
+        spans = _by_node(result["spans"])
+        assert spans["dedup"]["query_s"] > 0
+        assert spans["intake"]["prompt_tokens"] > 0
+
+    def test_speculative_pipeline_spans(self, offline):
+        result = run_triage(CLEAR_BUG, speculative=True)
+        assert {s["node"] for s in result["spans"]} == {"intake", "dedup", "labeler", "join", "router"}
+
+    def test_cache_hits_counted(self, offline, monkeypatch):
+        monkeypatch.setattr("agents.llm_cache._cache", MemoryCache())
+        run_triage(CLEAR_BUG)
+        spans = _by_node(run_triage(CLEAR_BUG)["spans"])
+        assert spans["intake"]["llm_cache_hits"] == 1
+        assert "prompt_tokens" not in spans["intake"]
+
+    def test_spans_reach_recorder(self, offline):
+        run_triage(CLEAR_BUG)
+        run_triage("it's broken")
+        nodes = [s["node"] for s in telemetry.recorder.spans()]
+        assert nodes == ["intake", "dedup", "labeler", "router", "intake"]
+
+
+class TestInstrumentNode:
+    def test_record_outside_span_is_noop(self):
+        record("prompt_tokens", 5)
+        with timed("embed_s"):
+            pass
+
+    def test_failed_node_recorded_as_error(self, monkeypatch):
+        recorder = SpanRecorder()
+        monkeypatch.setattr(telemetry, "recorder", recorder)
+
+        def boom(state):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            instrument_node("boom", boom)({})
+        assert recorder.spans()[0]["error"] is True
+        assert 'sentinel_node_errors_total{node="boom"} 1' in recorder.prometheus_text()
+
+
+class TestExport:
+    def _recorder(self):
+        recorder = SpanRecorder()
+        recorder.add({"node": "intake", "wall_s": 0.3, "prompt_tokens": 120, "response_tokens": 40})
+        recorder.add({"node": "intake", "wall_s": 0.02, "prompt_tokens": 80, "response_tokens": 30})
+        recorder.add({"node": "dedup", "wall_s": 0.004, "embed_s": 0.003, "query_s": 0.001})
+        return recorder
+
+    def test_prometheus_text(self):
+        text = self._recorder().prometheus_text()
+        assert "# TYPE sentinel_node_latency_seconds histogram" in text
+        assert 'sentinel_node_latency_seconds_bucket{node="intake",le="0.025"} 1' in text
+        assert 'sentinel_node_latency_seconds_bucket{node="intake",le="+Inf"} 2' in text
+        assert 'sentinel_node_latency_seconds_count{node="dedup"} 1' in text
+        assert 'sentinel_llm_prompt_tokens_total{node="intake"} 200' in text
+        assert 'sentinel_vector_query_seconds_total{node="dedup"} 0.001' in text
+
+    def test_export_jsonl(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        self._recorder().export_jsonl(str(path))
+        rows = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [r["node"] for r in rows] == ["intake", "intake", "dedup"]
+        assert rows[0]["prompt_tokens"] == 120
+
+
+class TestNodeLatencyMetrics:
+    def test_percentiles(self):
+        assert percentile([3, 1, 2], 50) == 2
+        assert percentile(list(range(1, 101)), 95) == 95
+        assert percentile([7], 99) == 7
+
+    def test_per_node_percentiles(self):
+        results = [
+            {"category": "c", "scores": {}, "all_passed": True, "latency_s": 0.0,
+             "node_latency_s": {"intake": i / 100, "dedup": 0.01}}
+            for i in range(1, 101)
+        ]
+        metrics = compute_metrics(results)
+        assert metrics["node_latency"]["intake"] == {"count": 100, "p50_s": 0.5, "p95_s": 0.95, "p99_s": 0.99}
+        assert metrics["node_latency"]["dedup"]["p99_s"] == 0.01
+
+    def test_absent_without_spans(self):
+        results = [{"category": "c", "scores": {}, "all_passed": True, "latency_s": 0.0}]
+        assert "node_latency" not in compute_metrics(results)
@@ -0,0 +1,66 @@
+import pytest
+from schema.state import TriageResult
+from schema.trace import Trace, TraceEvent, append_trace
+from graph.pipeline import run_triage, run_triage_many
+from tests.conftest import CLEAR_BUG
+
+
+class TestTrace:
+    def test_reads_like_a_list_of_strings(self):
+        trace = Trace().extend(["INTAKE: Parsed as 'x'", "DEDUP: No similar tickets found"])
+        assert len(trace) == 2
+        assert trace[0] == "INTAKE: Parsed as 'x'"
+        assert trace[-1].startswith("DEDUP")
+        assert list(trace) == ["INTAKE: Parsed as 'x'", "DEDUP: No similar tickets found"]
+        assert trace == ["INTAKE: Parsed as 'x'", "DEDUP: No similar tickets found"]
+        assert trace[1:] == ["DEDUP: No similar tickets found"]
+
+    def test_events_are_structured(self):
+        event = Trace().extend(["ROUTER: Assigned to payments"]).events()[0]
+        assert isinstance(event, TraceEvent)
+        assert event.source == "ROUTER"
+        assert event.to_dict()["message"] == "ROUTER: Assigned to payments"
+        with pytest.raises(AttributeError):
+            event.extra = 1  # __slots__: no per-event dict
+
+    def test_append_shares_storage(self):
+        first = Trace().extend(["A: 1"])
+        second = first.extend(["B: 2"])
+        assert second._events is first._events
+        assert len(first) == 1  # Older views don't see later events
+        assert list(first) == ["A: 1"]
+
+    def test_branching_from_older_view_copies(self):
+        base = Trace().extend(["A: 1"])
+        left = base.extend(["B: 2"])
+        right = base.extend(["C: 3"])
+        assert list(left) == ["A: 1", "B: 2"]
+        assert list(right) == ["A: 1", "C: 3"]
+
+    def test_reducer_accepts_plain_lists(self):
+        trace = append_trace(["PREVIOUS_STEP"], ["ROUTER: x"])
+        assert isinstance(trace, Trace)
+        assert trace == ["PREVIOUS_STEP", "ROUTER: x"]
+        assert append_trace(None, None) == []
+
+
+class TestTriageResult:
+    def test_mapping_access(self):
+        result = TriageResult({"decision": "duplicate", "trace": Trace(), "raw_input": "x", "internal": 1})
+        assert result["decision"] == "duplicate"
+        assert result.get("labeled_ticket") is None
+        assert result.get("labeled_ticket", "missing") == "missing"
+        assert "decision" in result
+        with pytest.raises(KeyError):
+            result["internal"]
+
+    def test_run_triage_returns_result(self, stub_llm, stub_vector_store):
+        result = run_triage(CLEAR_BUG)
+        assert isinstance(result, TriageResult)
+        assert result["decision"] == "create_ticket"
+        assert [e.source for e in result.trace.events()] == ["INTAKE", "DEDUP", "LABELER", "ROUTER"]
+
+    def test_batch_trace_matches_graph(self, stub_llm, stub_vector_store):
+        batch = run_triage_many([CLEAR_BUG, "it's broken"])
+        assert batch[0]["trace"] == run_triage(CLEAR_BUG)["trace"]
+        assert len(batch[1]["trace"]) == 1
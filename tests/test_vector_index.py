@@ -0,0 +1,264 @@
+import json
+import numpy as np
+import pytest
+from agents import dedup
+from agents.dedup import dedup_agent, hnsw_metadata, init_vector_store
+from agents.vector_index import ExactCollection, QuantizedCollection
+from bench._stubs import HashEmbeddingFunction
+from bench.ann_recall import near_duplicates, synthetic_corpus
+from schema.ticket import ParsedTicket
+
+
+@pytest.fixture
+def corpus():
+    return synthetic_corpus(500, dim=32)
+
+
+def _fill(collection, corpus):
+    collection.upsert(
+        ids=[f"T-{i}" for i in range(len(corpus))],
+        embeddings=corpus,
+        documents=[f"doc {i}" for i in range(len(corpus))],
+        metadatas=[{"title": f"title {i}"} for i in range(len(corpus))],
+    )
+
+
+class TestExactCollection:
+    def test_matches_brute_force(self, tmp_path, corpus):
+        collection = ExactCollection(str(tmp_path))
+        _fill(collection, corpus)
+        queries = near_duplicates(corpus, 20)
+        result = collection.query(query_embeddings=queries, n_results=3, include=["metadatas", "distances"])
+        expected = np.argsort(-(queries @ corpus.T), axis=1)[:, :3]
+        assert result["ids"] == [[f"T-{i}" for i in row] for row in expected]
+        assert result["metadatas"][0][0] == {"title": f"title {expected[0][0]}"}
+        assert result["documents"] is None
+        distances = np.array(result["distances"])
+        assert (np.diff(distances, axis=1) >= 0).all()
+        assert distances[0][0] == pytest.approx(1 - float(queries[0] @ corpus[expected[0][0]]), abs=1e-5)
+
+    def test_reload_keeps_latest_upsert_and_deletes(self, tmp_path, corpus):
+        collection = ExactCollection(str(tmp_path))
+        _fill(collection, corpus)
+        collection.upsert(ids=["T-0"], embeddings=[corpus[1]], documents=["replaced"])
+        collection.delete(["T-2"])
+
+        reopened = ExactCollection(str(tmp_path))
+        assert reopened.count() == len(corpus) - 1
+        assert reopened.get(ids=["T-0", "T-2"], include=["documents"]) == {
+            "ids": ["T-0"], "documents": ["replaced"], "metadatas": None, "embeddings": None,
+        }
+        top = reopened.query(query_embeddings=[corpus[2]], n_results=1, include=["distances"])
+        assert top["ids"][0][0] != "T-2"
+
+    def test_where_filter(self, tmp_path, corpus):
+        collection = ExactCollection(str(tmp_path))
+        collection.upsert(
+            ids=["A", "B"], embeddings=corpus[:2],
+            metadatas=[{"component": "billing"}, {"component": "checkout"}],
+        )
+        result = collection.query(query_embeddings=[corpus[0]], n_results=2, where={"component": "checkout"})
+        assert result["ids"] == [["B"]]
+
+    def test_where_operators(self, tmp_path, corpus):
+        collection = ExactCollection(str(tmp_path))
+        collection.upsert(
+            ids=["A", "B", "C"], embeddings=corpus[:3],
+            metadatas=[{"created_at": 100, "status": "open"}, {"created_at": 200, "status": "resolved"}, {}],
+        )
+
+        def ids(where):
+            return sorted(collection.get(where=where, include=[])["ids"])
+
+        assert ids({"created_at": {"$gte": 150}}) == ["B"]
+        assert ids({"status": {"$ne": "resolved"}}) == ["A", "C"]  # Missing fields match $ne, as in Chroma
+        assert ids({"$and": [{"created_at": {"$lt": 300}}, {"status": {"$in": ["open"]}}]}) == ["A"]
+        assert ids({"$or": [{"created_at": {"$gt": 150}}, {"status": "open"}]}) == ["A", "B"]
+        with pytest.raises(ValueError):
+            ids({"status": {"$like": "o%"}})
+
+    def test_vacuum(self, tmp_path, corpus):
+        collection = ExactCollection(str(tmp_path))
+        _fill(collection, corpus[:10])
+        collection.upsert(ids=["T-0"], embeddings=[corpus[0]], documents=["replaced"])
+        collection.delete(["T-1", "T-2"])
+        assert collection.vacuum() == 3
+        assert collection.vacuum() == 0
+        reopened = ExactCollection(str(tmp_path))
+        assert reopened._size == reopened.count() == 8
+        assert reopened.get(ids=["T-0"], include=["documents"])["documents"] == ["replaced"]
+        top = reopened.query(query_embeddings=[corpus[5]], n_results=1, include=["distances"])
+        assert top["ids"] == [["T-5"]]
+
+    def test_recovers_interrupted_vacuum(self, tmp_path, corpus):
+        path = tmp_path / "store"
+        _fill(ExactCollection(str(path)), corpus[:4])
+        path.rename(tmp_path / "store.vacuum")  # Crash after moving the old store aside
+        assert ExactCollection(str(path)).count() == 4
+
+    def test_get_pages(self, tmp_path, corpus):
+        collection = ExactCollection(str(tmp_path))
+        _fill(collection, corpus[:5])
+        assert collection.get(limit=2, offset=3, include=[])["ids"] == ["T-3", "T-4"]
+
+    def test_reupsert_after_delete(self, tmp_path, corpus):
+        collection = ExactCollection(str(tmp_path))
+        _fill(collection, corpus[:5])
+        collection.delete(["T-1"])
+        collection.upsert(ids=["T-1"], embeddings=[corpus[1]])
+        assert ExactCollection(str(tmp_path)).count() == 5
+
+    def test_handles_sharing_a_store(self, tmp_path, corpus):
+        first, second = ExactCollection(str(tmp_path)), ExactCollection(str(tmp_path))
+        first.upsert(ids=["A"], embeddings=corpus[:1])
+        second.upsert(ids=["B"], embeddings=corpus[1:2])
+        first.upsert(ids=["C"], embeddings=corpus[2:3])
+        second.delete(["A"])
+
+        reopened = ExactCollection(str(tmp_path))
+        assert reopened.count() == first.count() == 2
+        for i, id_ in ((1, "B"), (2, "C")):
+            top = reopened.query(query_embeddings=[corpus[i]], n_results=1, include=["distances"])
+            assert top["ids"] == [[id_]]
+            assert top["distances"][0][0] == pytest.approx(0, abs=1e-5)
+
+    def test_vacuum_by_another_handle(self, tmp_path, corpus):
+        first, second = ExactCollection(str(tmp_path)), ExactCollection(str(tmp_path))
+        _fill(first, corpus[:10])
+        first.delete(["T-1", "T-2"])
+        assert second.vacuum() == 2
+        first.upsert(ids=["T-10"], embeddings=corpus[10:11])
+        reopened = ExactCollection(str(tmp_path))
+        assert reopened._size == reopened.count() == 9
+        top = reopened.query(query_embeddings=[corpus[10]], n_results=1)
+        assert top["ids"] == [["T-10"]]
+
+    def test_empty_query(self, tmp_path):
+        result = ExactCollection(str(tmp_path), dim=8).query(query_embeddings=[np.ones(8)], n_results=3)
+        assert result["ids"] == [[]]
+        assert result["distances"] == [[]]
+
+
+@pytest.mark.parametrize("quantization", ["int8", "binary"])
+class TestQuantizedCollection:
+    def test_reranked_matches_exact(self, tmp_path, quantization):
+        # Sign bits need realistic dimensions to rank near-duplicates well
+        corpus = synthetic_corpus(2000, dim=384)
+        collection = QuantizedCollection(str(tmp_path), quantization=quantization)
+        _fill(collection, corpus)
+        queries = near_duplicates(corpus, 20)
+        result = collection.query(query_embeddings=queries, n_results=1, include=["documents", "distances"])
+        expected = np.argmax(queries @ corpus.T, axis=1)
+        assert result["ids"] == [[f"T-{i}"] for i in expected]
+        assert result["documents"][0] == [f"doc {expected[0]}"]
+        # Distances come from the float32 rerank, not the quantized scan
+        assert result["distances"][0][0] == pytest.approx(1 - float(queries[0] @ corpus[expected[0]]), abs=1e-5)
+
+    def test_reload_rebuilds_missing_codes(self, tmp_path, corpus, quantization):
+        collection = QuantizedCollection(str(tmp_path), quantization=quantization)
+        _fill(collection, corpus[:50])
+        collection.delete(["T-3"])
+        (tmp_path / f"codes.{quantization}").unlink()
+        reopened = QuantizedCollection(str(tmp_path), quantization=quantization)
+        assert reopened.count() == 49
+        top = reopened.query(query_embeddings=[corpus[7]], n_results=1, include=["metadatas"])
+        assert (top["ids"], top["metadatas"]) == ([["T-7"]], [[{"title": "title 7"}]])
+
+    def test_vacuum_and_where(self, tmp_path, corpus, quantization):
+        collection = QuantizedCollection(str(tmp_path), quantization=quantization)
+        collection.upsert(
+            ids=["A", "B", "C"], embeddings=corpus[:3],
+            metadatas=[{"component": "billing"}, {"component": "checkout"}, {"component": "checkout"}],
+        )
+        collection.delete(["C"])
+        assert collection.vacuum() == 1
+        result = collection.query(query_embeddings=[corpus[0]], n_results=2, where={"component": "checkout"})
+        assert result["ids"] == [["B"]]
+        embeddings = collection.get(ids=["A"], include=["embeddings"])["embeddings"]
+        assert embeddings[0] @ corpus[0] == pytest.approx(1.0, abs=1e-5)
+
+    def test_handles_sharing_a_store(self, tmp_path, corpus, quantization):
+        first = QuantizedCollection(str(tmp_path), quantization=quantization)
+        second = QuantizedCollection(str(tmp_path), quantization=quantization)
+        _fill(first, corpus[:100])
+        second.upsert(ids=["B"], embeddings=corpus[100:101], documents=["b"])
+        first.upsert(ids=["C"], embeddings=corpus[101:102], documents=["c"])
+
+        reopened = QuantizedCollection(str(tmp_path), quantization=quantization)
+        assert reopened.count() == second.count() == 102
+        for i, id_ in ((100, "B"), (101, "C")):
+            top = second.query(query_embeddings=[corpus[i]], n_results=1, include=["documents", "distances"])
+            assert (top["ids"], top["documents"]) == ([[id_]], [[id_.lower()]])
+            assert top["distances"][0][0] == pytest.approx(0, abs=1e-5)
+
+    def test_popcount_without_numpy_2(self, tmp_path, corpus, quantization, monkeypatch):
+        collection = QuantizedCollection(str(tmp_path), quantization=quantization)
+        _fill(collection, corpus)
+        expected = collection.query(query_embeddings=corpus[:5], n_results=3, include=["distances"])
+        if hasattr(np, "bitwise_count"):
+            monkeypatch.delattr(np, "bitwise_count")
+        assert collection.query(query_embeddings=corpus[:5], n_results=3, include=["distances"]) == expected
+
+    def test_empty_query(self, tmp_path, quantization):
+        result = QuantizedCollection(str(tmp_path), dim=8, quantization=quantization).query(
+            query_embeddings=[np.ones(8)], n_results=3
+        )
+        assert result["ids"] == [[]]
+
+
+class TestInitVectorStore:
+    def test_hnsw_parameters(self, tmp_path):
+        collection = init_vector_store(
+            str(tmp_path), "hnsw-params", HashEmbeddingFunction(), index="hnsw",
+            hnsw={"m": 32, "ef_construction": 200, "ef_search": 150},
+        )
+        config = collection.configuration_json["hnsw"]
+        assert (config["max_neighbors"], config["ef_construction"], config["ef_search"]) == (32, 200, 150)
+        assert config["space"] == "cosine"
+
+    def test_ef_search_saved_on_existing_collection(self, tmp_path):
+        init_vector_store(str(tmp_path), "hnsw-reopen", HashEmbeddingFunction(), index="hnsw", hnsw={"ef_search": 50})
+        reopened = init_vector_store(
+            str(tmp_path), "hnsw-reopen", HashEmbeddingFunction(), index="hnsw", hnsw={"ef_search": 300}
+        )
+        assert reopened.configuration_json["hnsw"]["ef_search"] == 300
+
+    def test_metadata_defaults(self):
+        assert hnsw_metadata()["hnsw:M"] == dedup.HNSW_M
+        assert hnsw_metadata(m=8)["hnsw:M"] == 8
+
+    def test_unknown_index(self, tmp_path):
+        with pytest.raises(ValueError):
+            init_vector_store(str(tmp_path), index="annoy")
+
+    def test_quantized_index(self, tmp_path):
+        collection = init_vector_store(str(tmp_path), "tickets", index="binary")
+        assert isinstance(collection, QuantizedCollection)
+        assert (collection.quantization, collection.dim) == ("binary", dedup.EMBEDDING_DIM)
+        assert (tmp_path / "tickets.binary").is_dir()
+        with pytest.raises(ValueError):
+            QuantizedCollection(str(tmp_path / "other"), quantization="pq")
+
+
+class TestExactDedup:
+    @pytest.mark.parametrize("index", ["exact", "int8"])
+    def test_dedup_agent_on_exact_index(self, monkeypatch, tmp_path, index):
+        with open("data/seed_tickets.json") as f:
+            seed_tickets = json.load(f)
+        monkeypatch.setattr(dedup, "DEDUP_INDEX", index)
+        monkeypatch.setattr(dedup, "_embedding_fn", HashEmbeddingFunction())
+        monkeypatch.setattr(dedup, "_default_persist_dir", lambda: str(tmp_path))
+        collection = dedup.get_collection()
+        assert isinstance(collection, ExactCollection)
+        dedup.seed_vector_store(collection)
+        dedup.seed_vector_store(collection)  # Idempotent, as with Chroma
+        try:
+            assert collection.count() == len(seed_tickets)
+            seed = seed_tickets[0]
+            state = {"parsed_ticket": ParsedTicket(title=seed["title"], description=seed["description"], is_valid=True)}
+            update = dedup_agent(state)
+            assert update["dedup_result"].is_duplicate
+            assert update["dedup_result"].similar_ticket_id == seed["id"]
+            assert update["dedup_result"].similar_ticket_title == seed["title"]
+        finally:
+            dedup.close_vector_store(str(tmp_path))